@@ -0,0 +1,92 @@
+"""
+Item lookups against a large catalog: linear scans versus ItemCatalog indexes.
+
+A synthetic catalog of N items spread over the game's locations is built and
+each lookup the handlers make is timed both ways:
+  location   /explore item pool (filter_items_by_location)
+  rarity     /items <place> c|r
+  name       /items <name> and use_item
+  summary    /items per-location counts
+
+Usage: python benchmarks/bench_catalog_lookup.py [items] [lookups]
+"""
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.item_catalog import ItemCatalog, item_id_for_name  # noqa: E402
+
+LOCATIONS = ["beach", "mountain", "caves", "dark forest", "desert"]
+
+
+def build_items(count: int) -> list:
+    items = []
+    for index in range(count):
+        name = f"Item {index}"
+        items.append({
+            "id": item_id_for_name(name),
+            "name": name,
+            "category": random.choice(["food", "non-food"]),
+            "type": random.choices(["common", "rare"], weights=[0.8, 0.2])[0],
+            "space_per_item": random.randint(1, 8),
+            "location": random.choice(LOCATIONS),
+        })
+    return items
+
+
+def timed(function, arguments) -> float:
+    start = time.perf_counter()
+    for argument in arguments:
+        function(argument)
+    return (time.perf_counter() - start) / len(arguments) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    random.seed(3)
+
+    items = build_items(count)
+    start = time.perf_counter()
+    catalog = ItemCatalog(items)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    locations = [random.choice(LOCATIONS).title() for _ in range(lookups)]
+    names = [random.choice(items)["name"].upper() for _ in range(lookups)]
+
+    cases = {
+        "location": (
+            lambda location: [item for item in items if item["location"].lower() == location.lower()],
+            lambda location: catalog.in_location(location),
+            locations,
+        ),
+        "rarity": (
+            lambda location: [item for item in items if item["location"] == location.lower() and item["type"] == "rare"],
+            lambda location: catalog.in_location(location, "rare"),
+            locations,
+        ),
+        "name": (
+            lambda name: next((item for item in items if item["name"].lower() == name.lower()), None),
+            lambda name: catalog.find(name),
+            names,
+        ),
+        "summary": (
+            lambda _: (Counter(item["type"] for item in items), Counter(item["location"] for item in items)),
+            lambda _: (catalog.rarity_counts, catalog.location_counts),
+            locations,
+        ),
+    }
+
+    print(f"{count} items, {lookups} lookups per case, indexes built in {build_ms:.1f} ms")
+    for case, (scan, indexed, arguments) in cases.items():
+        scan_us = timed(scan, arguments)
+        index_us = timed(indexed, arguments)
+        print(f"{case:>9}: scan {scan_us:10.2f} us  index {index_us:7.3f} us  ({scan_us / index_us:8.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
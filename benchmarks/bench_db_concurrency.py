@@ -0,0 +1,91 @@
+"""
+Updates per second with many concurrent users hitting the persistence layer.
+
+Each simulated user handles a stream of updates; every update does one
+load_player and one save_player, like /explore or /rest. Storage is the
+in-memory backend with a fixed sleep per call standing in for the Mongo
+round-trip, so the numbers show how much the event loop is blocked, not
+Atlas speed.
+
+"before" calls the storage inline on the event loop (the old behaviour),
+"after" goes through utils.db_utils and its thread pool.
+
+Usage: python benchmarks/bench_db_concurrency.py [users] [updates_per_user] [latency_ms]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("WRITE_BEHIND_ENABLED", "false")
+os.environ.setdefault("PLAYER_CACHE_SIZE", "1")  # Measure storage round-trips, not cache hits
+
+from utils import db_utils  # noqa: E402
+from utils.storage_backends import MemoryBackend  # noqa: E402
+from models.player import Player  # noqa: E402
+
+
+class LatencyBackend(MemoryBackend):
+    """In-memory backend that sleeps like a network round-trip on every call."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def find_player(self, user_id, fields=None):
+        time.sleep(self.latency)
+        return super().find_player(user_id, fields)
+
+    def update_player(self, user_id, update):
+        time.sleep(self.latency)
+        return super().update_player(user_id, update)
+
+
+async def legacy_update(storage, user_id: int):
+    # The old code path: blocking calls straight on the event loop
+    player = Player.from_dict(storage.find_player(user_id))
+    player.stats["stamina"] = max(0, player.stats["stamina"] - 1)
+    storage.update_player(user_id, {"$set": player.to_dict()})
+
+
+async def async_update(user_id: int):
+    player = await db_utils.load_player(user_id)
+    player.stats["stamina"] = max(0, player.stats["stamina"] - 1)
+    await db_utils.save_player(user_id, player)
+
+
+async def run(mode: str, storage, users: int, updates: int) -> float:
+    async def user_session(user_id: int):
+        for _ in range(updates):
+            if mode == "before":
+                await legacy_update(storage, user_id)
+            else:
+                await async_update(user_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_session(user_id) for user_id in range(users)))
+    elapsed = time.perf_counter() - start
+    return users * updates / elapsed
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency = (float(sys.argv[3]) if len(sys.argv) > 3 else 5.0) / 1000
+
+    storage = LatencyBackend(latency)
+    for user_id in range(users):
+        storage.update_player(user_id, {"$set": Player(user_id=user_id, name=f"user{user_id}").to_dict()})
+    db_utils.storage = storage
+
+    for mode in ("before", "after"):
+        rate = asyncio.run(run(mode, storage, users, updates))
+        print(f"{mode:>6}: {rate:8.1f} updates/s ({users} users, {updates} updates each, {latency * 1000:.1f} ms latency)")
+    db_utils.shutdown_db_executor()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Document size of the players collection with legacy and compact inventories.
+
+Builds a synthetic population where each player carries a random number of
+item units drawn from items.json, then compares the BSON size of every
+document with the old inventory (one full item dict per unit) and the new
+{item_id: count} form.
+
+Usage: python benchmarks/bench_inventory_size.py [players] [max_items_per_player]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+import bson  # noqa: E402  (ships with pymongo)
+from models.player import Player  # noqa: E402
+from utils.game_data import get_game_data  # noqa: E402
+from utils.item_catalog import compact_inventory  # noqa: E402
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    max_items = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    random.seed(11)
+
+    items = get_game_data().catalog.items
+    # Legacy documents stored the item definition without an id
+    legacy_items = [{key: value for key, value in item.items() if key != "id"} for item in items]
+
+    legacy_bytes = compact_bytes = 0
+    for user_id in range(players):
+        carried = [random.choice(legacy_items) for _ in range(random.randint(0, max_items))]
+        document = Player(user_id=user_id, name=f"Player{user_id}").to_dict()
+
+        document["inventory"] = carried
+        legacy_bytes += len(bson.encode(document))
+        document["inventory"] = compact_inventory(carried)
+        compact_bytes += len(bson.encode(document))
+
+    print(f"{players} players, up to {max_items} item units each")
+    print(f"legacy  : {legacy_bytes / 1024 / 1024:8.2f} MiB ({legacy_bytes / players:8.1f} bytes/doc)")
+    print(f"compact : {compact_bytes / 1024 / 1024:8.2f} MiB ({compact_bytes / players:8.1f} bytes/doc)")
+    print(f"saved   : {100 * (1 - compact_bytes / legacy_bytes):8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Render time per response: inline f-strings versus the template layer.
+
+Each card the handlers send is rendered three ways for a set of random
+player states:
+  inline    the previous code (f-strings with float-math bars)
+  template  utils.templates (format strings, lookup-table bars)
+  cached    CardCache hit for an unchanged state version (profile, bag)
+
+Usage: python benchmarks/bench_render.py [renders] [bag_items]
+"""
+import math
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import templates  # noqa: E402
+from utils.templates import CardCache  # noqa: E402
+
+
+def inline_health_bar(health: int, max_health: int) -> str:
+    filled_blocks = math.floor(health / max_health * 10)
+    return "█" * filled_blocks + "▒" * (10 - filled_blocks)
+
+
+def inline_stamina_bar(stamina: int, max_stamina: int) -> str:
+    filled_blocks = math.floor(stamina / max_stamina * 7)
+    return "▮" * filled_blocks + "▯" * (7 - filled_blocks)
+
+
+def inline_exploration(player, location, item_message, xp_gained):
+    health_bar = inline_health_bar(player.stats["health"], player.stats["max_health"])
+    stamina_bar = inline_stamina_bar(player.stats["stamina"], player.stats["max_stamina"])
+    return (
+        f"<b>•HP•</b>\n<b>| {health_bar} |</b>\n"
+        f"              <b>(|{player.stats['health']}/{player.stats['max_health']}|)</b>\n"
+        f"<b>•Stamina•</b>\n<b>| {stamina_bar} |</b>\n"
+        f"                   <b>(|{player.stats['stamina']}/{player.stats['max_stamina']}|)</b>\n\n"
+        f"<b>You explored the {location}</b>\n"
+        f"<b>Items found:</b>\n{item_message}\n\n"
+        f"<b>Total XP gained: {xp_gained} ✨</b>\n"
+    )
+
+
+def inline_profile(player, next_level_experience):
+    health_bar = inline_health_bar(player.stats["health"], player.stats["max_health"])
+    stamina_bar = inline_stamina_bar(player.stats["stamina"], player.stats["max_stamina"])
+    return (
+        f"━━━━━━━━━━━━━━━━━\n"
+        f"<b>{player.name}</b>\n"
+        f"━━━━━━━━━━━━━━━━━\n"
+        f"<b>• HP:</b>\n"
+        f"{health_bar}\n"
+        f"    <b>[{player.stats['health']}/{player.stats['max_health']}]</b>\n"
+        f"<b>• Stamina:</b>\n"
+        f"{stamina_bar}\n"
+        f"    <b>[{player.stats['stamina']}/{player.stats['max_stamina']}]</b>\n"
+        f"━━━━━━━━━━━━━━━━━\n"
+        f"📍 <b>Location:</b> {player.location}\n"
+        f"🏆 <b>Level:</b> {player.level} | <b>XP:</b> ({player.experience}/{next_level_experience})\n"
+        f"━━━━━━━━━━━━━━━━━"
+    )
+
+
+def inline_bag(player, used_space, total_capacity, item_counts):
+    inventory_items = "\n".join([f"{item} : {count}" for item, count in item_counts.items()])
+    return (
+        f"━━━━━━━━━━━━━━━━━\n"
+        f"<b>{player.name}'s Inventory</b>\n"
+        f"━━━━━━━━━━━━━━━━━\n"
+        f"<b>Inventory Space: {used_space}/{total_capacity}</b>\n\n"
+        f"{inventory_items}\n"
+        f"━━━━━━━━━━━━━━━━━"
+    )
+
+
+def build_players(count: int, bag_items: int) -> list:
+    players = []
+    for user_id in range(count):
+        max_health, max_stamina = random.randint(60, 250), random.randint(50, 110)
+        players.append(SimpleNamespace(
+            user_id=user_id,
+            name=f"Player {user_id}",
+            level=random.randint(1, 20),
+            experience=random.randint(0, 500),
+            location=random.choice(["Beach", "Mountain", "Caves"]),
+            state_version=random.randint(1, 1000),
+            stats={
+                "health": random.randint(1, max_health), "max_health": max_health,
+                "stamina": random.randint(0, max_stamina), "max_stamina": max_stamina,
+            },
+            items={f"Item {index}": random.randint(1, 9) for index in random.sample(range(200), bag_items)},
+        ))
+    return players
+
+
+def timed(render, players) -> float:
+    start = time.perf_counter()
+    for player in players:
+        render(player)
+    return (time.perf_counter() - start) / len(players) * 1e6
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    bag_items = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    random.seed(5)
+    players = build_players(renders, bag_items)
+    item_message = "Coconut\nDriftwood\nSea Shell"
+
+    # Every bar fill level must render the same either way
+    for player in players:
+        stats = player.stats
+        assert templates.health_bar(stats["health"], stats["max_health"]) == inline_health_bar(stats["health"], stats["max_health"])
+        assert templates.stamina_bar(stats["stamina"], stats["max_stamina"]) == inline_stamina_bar(stats["stamina"], stats["max_stamina"])
+        assert templates.render_profile(player, 150) == inline_profile(player, 150)
+        assert templates.render_bag(player.name, 40, 90, player.items) == inline_bag(player, 40, 90, player.items)
+        assert templates.render_exploration(stats, player.location, item_message, 12.5) == inline_exploration(player, player.location, item_message, 12.5)
+
+    cards = CardCache(renders * 2, 300)
+    for player in players:
+        cards.set(player.user_id, "profile", (player.state_version, 1), templates.render_profile(player, 150))
+        cards.set(player.user_id, "bag", (player.state_version, 1), templates.render_bag(player.name, 40, 90, player.items))
+
+    cases = {
+        "bars": (
+            lambda p: (inline_health_bar(p.stats["health"], p.stats["max_health"]), inline_stamina_bar(p.stats["stamina"], p.stats["max_stamina"])),
+            lambda p: (templates.health_bar(p.stats["health"], p.stats["max_health"]), templates.stamina_bar(p.stats["stamina"], p.stats["max_stamina"])),
+            None,
+        ),
+        "explore": (
+            lambda p: inline_exploration(p, p.location, item_message, 12.5),
+            lambda p: templates.render_exploration(p.stats, p.location, item_message, 12.5),
+            None,
+        ),
+        "profile": (
+            lambda p: inline_profile(p, 150),
+            lambda p: templates.render_profile(p, 150),
+            lambda p: cards.get(p.user_id, "profile", (p.state_version, 1)),
+        ),
+        "bag": (
+            lambda p: inline_bag(p, 40, 90, p.items),
+            lambda p: templates.render_bag(p.name, 40, 90, p.items),
+            lambda p: cards.get(p.user_id, "bag", (p.state_version, 1)),
+        ),
+    }
+
+    print(f"{renders} renders per case, {bag_items} items per bag (outputs checked identical)")
+    for case, (inline, template, cached) in cases.items():
+        inline_us = timed(inline, players)
+        template_us = timed(template, players)
+        line = f"{case:>8}: inline {inline_us:6.2f} us  template {template_us:6.2f} us"
+        if cached is not None:
+            line += f"  cached {timed(cached, players):6.2f} us"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Bytes on the wire per /explore save: full-document $set versus delta updates.
+
+A player is given a starting inventory, then a series of explore rounds is
+replayed on it (stamina/health change, a few items picked up, XP gained).
+For each round the BSON size of the update document is measured for the old
+full $set of Player.to_dict() and for Player.get_changes().
+
+Usage: python benchmarks/bench_save_payload.py [starting_items] [explores]
+"""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"))
+
+import bson  # noqa: E402  (ships with pymongo)
+from models.player import Player  # noqa: E402
+from utils.game_data import get_game_data  # noqa: E402
+
+
+def simulate_explore(player: Player, items: list):
+    player.stats["stamina"] = max(0, player.stats["stamina"] - random.randint(2, 8))
+    if player.stats["stamina"] == 0:
+        player.stats["health"] = max(0, player.stats["health"] - random.randint(5, 12))
+    for item in random.sample(items, k=random.choice([1, 2, 3, 4])):
+        player.add_item(item["id"])
+    player.experience += 9
+
+
+def main():
+    starting_items = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    explores = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    random.seed(7)
+
+    items = get_game_data().catalog.items
+
+    player = Player(user_id=1, name="Bench")
+    for _ in range(starting_items):
+        player.add_item(random.choice(items)["id"])
+    player.mark_saved()
+
+    full_bytes = delta_bytes = 0
+    for _ in range(explores):
+        simulate_explore(player, items)
+        full_bytes += len(bson.encode({"$set": player.to_dict()}))
+        update, state = player.get_changes()
+        delta_bytes += len(bson.encode(update)) if update else 0
+        player.mark_saved(state)
+
+    # A save with nothing changed is skipped entirely
+    noop_update, _ = player.get_changes()
+
+    print(f"starting inventory: {starting_items} items, {explores} explores")
+    print(f"full $set : {full_bytes / explores:10.1f} bytes/explore")
+    print(f"delta     : {delta_bytes / explores:10.1f} bytes/explore")
+    print(f"reduction : {full_bytes / max(delta_bytes, 1):10.1f}x")
+    print(f"no-op save: {noop_update or 'skipped'}")
+
+
+if __name__ == "__main__":
+    main()
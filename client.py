@@ -1,7 +1,8 @@
 import logging
-from pymongo import MongoClient, errors
+from pymongo import errors
 from pyrogram import Client
-from config import API_ID, API_HASH, BOT_TOKEN, MONGO_URI
+from config import API_ID, API_HASH, BOT_TOKEN
+from utils.mongo_pool import get_mongo_client, close_mongo_client
 import time
 
 # Set up logging
@@ -14,16 +15,13 @@ logger = logging.getLogger(__name__)
 # Initialize Pyrogram client
 app = Client("Island", api_id=API_ID, api_hash=API_HASH, bot_token=BOT_TOKEN)
 
-# MongoDB Setup
-mongo_client = None
-
+# MongoDB Setup: the client itself is shared process-wide through utils.mongo_pool
 def setup_mongo(retries: int = 3, delay: int = 5):
-    global mongo_client
     attempt = 0
     
     while attempt < retries:
         try:
-            mongo_client = MongoClient(MONGO_URI)
+            mongo_client = get_mongo_client()
             mongo_client.get_database()  # Check if connection is valid
             mongo_client.admin.command("ping")  # Ensure connection is active
             logger.info("MongoDB connected successfully.")
@@ -43,15 +41,11 @@ def setup_mongo(retries: int = 3, delay: int = 5):
 
 def close_mongo_connection():
     """Close MongoDB connection gracefully."""
-    global mongo_client
-    if mongo_client:
-        try:
-            mongo_client.close()
-            logger.info("MongoDB connection closed.")
-        except Exception as e:
-            logger.error(f"Error closing MongoDB connection: {e}")
+    try:
+        close_mongo_client()
+    except Exception as e:
+        logger.error(f"Error closing MongoDB connection: {e}")
 
 # Set up cleanup when the bot shuts down
 import atexit
 atexit.register(close_mongo_connection)
-
@@ -19,6 +19,53 @@ API_HASH = os.getenv("API_HASH", "3e0e31273667bfe888b1d140024aabdb")
 BOT_TOKEN = os.getenv("BOT_TOKEN", "7882763921:AAFgi6VZWbCNDK8A2XA5YodN-ljAKMeOHAI")
 OWNER_ID = os.getenv("OWNER_ID", "-1002201661092")
 
+# Static game data (config, items, events, areas, resources JSON files)
+DATA_DIR = os.getenv("DATA_DIR", "/workspaces/island_gamebot/data")
+CONFIG_HISTORY_SIZE = int(os.getenv("CONFIG_HISTORY_SIZE", "20"))  # Config versions kept for /config_rollback
+INVENTORY_DEBUG_CHECKS = os.getenv("INVENTORY_DEBUG_CHECKS", "false").lower() == "true"  # Recount inventories after every change
+
+# Player storage backend: "mongo" (production), "memory" or "sqlite" (local runs, no network)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+SQLITE_PATH = os.getenv("SQLITE_PATH", "island.sqlite3")
+
+# Shared MongoClient pool (one per process)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "32"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "4"))  # Warm connections kept open
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))  # Max wait for a free connection
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "10000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "10000"))
+
+# Database tuning
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "16"))  # Threads available for blocking Mongo calls
+PLAYER_CACHE_SIZE = int(os.getenv("PLAYER_CACHE_SIZE", "10000"))  # Max players kept in memory
+PLAYER_CACHE_TTL = float(os.getenv("PLAYER_CACHE_TTL", "300"))  # Seconds before a cached player is re-read
+CARD_CACHE_SIZE = int(os.getenv("CARD_CACHE_SIZE", "10000"))  # Players whose rendered profile/bag cards are kept
+EXPLORE_BATCH_MAX = int(os.getenv("EXPLORE_BATCH_MAX", "10"))  # Most rounds a single /explore <n> may run
+
+# Outbound Telegram calls (Bot API limits: about 30 messages/s overall, 1/s per chat)
+SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", "25"))  # Calls per second across all chats
+SEND_CHAT_RATE = float(os.getenv("SEND_CHAT_RATE", "1"))  # Calls per second to one chat
+SEND_CHAT_BURST = float(os.getenv("SEND_CHAT_BURST", "3"))  # Calls one chat may get back to back
+SEND_QUEUE_MAX = int(os.getenv("SEND_QUEUE_MAX", "2000"))  # Queued calls past which new edits are dropped
+SEND_CONCURRENCY = int(os.getenv("SEND_CONCURRENCY", "16"))  # Calls in flight at once (one per chat)
+SEND_FLOOD_RETRIES = int(os.getenv("SEND_FLOOD_RETRIES", "3"))  # Retries of one call after FloodWait
+
+# Typing animations (/start, start_adventure)
+ANIMATION_MAX_EDITS = int(os.getenv("ANIMATION_MAX_EDITS", "6"))  # Frames per animation, the final text included
+ANIMATION_MAX_SECONDS = float(os.getenv("ANIMATION_MAX_SECONDS", "3"))  # Time one animation may take
+ANIMATION_SKIP_DEPTH = int(os.getenv("ANIMATION_SKIP_DEPTH", "200"))  # Outbound queue depth past which frames are skipped
+
+# Deferred jobs (delete-after, expiring buttons, reminders)
+JOBS_FILE = os.getenv("JOBS_FILE", "")  # JSON file keeping pending jobs across restarts; empty disables it
+JOBS_PERSIST_INTERVAL = float(os.getenv("JOBS_PERSIST_INTERVAL", "5"))  # Seconds between writes of the jobs file
+JOBS_CONCURRENCY = int(os.getenv("JOBS_CONCURRENCY", "8"))  # Jobs running at once
+MEDIA_FILE = os.getenv("MEDIA_FILE", "media_ids.json")  # JSON file keeping uploaded media file_ids; empty keeps them in memory only
+INVENTORY_LOADING_TTL = float(os.getenv("INVENTORY_LOADING_TTL", "10"))  # Seconds before the "Loading your inventory" message is deleted
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_BEHIND_MAX_STALENESS = float(os.getenv("WRITE_BEHIND_MAX_STALENESS", "2.0"))  # Seconds a save may sit in memory
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))  # Dirty players that trigger an early flush
+
 # MongoDB Connection
 def validate_mongo_uri():
     if not MONGO_URI.startswith("mongodb+srv://"):
@@ -1,16 +1,20 @@
 import random
 import logging
-import json
-import asyncio
 from pyrogram.handlers import MessageHandler
 from pyrogram import Client, filters
-from pyrogram.types import InlineKeyboardMarkup, InlineKeyboardButton, Message
+from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, Message
 from pyrogram.enums import ParseMode
 from utils.db_utils import load_player, save_player
-from utils.decorators import maintenance_mode_only
-from utils.shared_utils import get_health_bar, get_stamina_bar
+from utils import exploration_rules, regeneration
+from utils.decorators import maintenance_mode_only, player_locked
+from utils.game_data import get_game_data
+from utils.loot import get_loot_tables
+from utils.shared_utils import get_stamina_bar
+from utils.templates import render_exploration, render_exploration_summary
+from config import EXPLORE_BATCH_MAX
 from handlers.inventory_handler import get_inventory_capacity
 from handlers.error_handler import error_handler_decorator
+from utils.outbound import reply
 
 # Configure logger
 logger = logging.getLogger(__name__)
@@ -20,85 +24,51 @@ formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(messag
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
-### --- Configuration Loader --- ###
-def load_json_file(filepath):
-    """Load JSON data from the specified file."""
-    with open(filepath, "r") as f:
-        return json.load(f)
-
-# Load configuration and data files
-CONFIG_PATHS = {
-    "events": "/workspaces/island_gamebot/data/events.json",
-    "items": "/workspaces/island_gamebot/data/items.json",
-    "config": "/workspaces/island_gamebot/data/config.json",
-}
-
-config = {
-    key: load_json_file(path) for key, path in CONFIG_PATHS.items()
-}
-
-events = config["events"]
-items_data = config["items"]["items"]
-
 ### --- Helper Functions --- ###
 @error_handler_decorator
 async def get_location_based_on_progress(progress, message):
     """Determine the player's current location based on their exploration progress."""
-    if progress < 10:
-        return "Beach"
-    elif progress < 20:
-        return "Mountain"
-    elif progress < 30:
-        return "Caves"
-    elif progress < 40:
-        return "Dark Forest"
-    return "Desert"
-
-
-@error_handler_decorator
-async def filter_items_by_location(location, message):
-    """Filter items available in the specified location."""
-    return [item for item in items_data if item["location"].lower() == location.lower()]
+    return exploration_rules.location_for_progress(progress)
 
 
 @error_handler_decorator
 async def calculate_exploration_rewards(player, current_location):
-    """Determine the rewards (items, XP, encounter message, and effects) for an exploration, including biome effects and endurance penalties."""
-    
-    # Apply biome effects based on the player's location
-    player.apply_biome_effect()
+    """Determine the rewards (items, XP, encounter message, and effects) for an exploration, including endurance penalties."""
     
+    game_data = get_game_data()
+    settings = game_data.config
+
     # Apply endurance penalties based on player's stamina and health
     player.apply_endurance_penalties()
 
-    # Get items based on current location
-    location_items = await filter_items_by_location(current_location, None)
-    if not location_items:
+    # Loot table of the current location, weighted by rarity
+    loot_table = get_loot_tables().for_location(current_location)
+    if loot_table is None:
         logger.warning(f"No items found in {current_location}.")
         return "None", [], 0, ""
 
     # Randomly collect items based on configured probabilities
-    num_items_to_collect = random.choices([1, 2, 3, 4], weights=[0.1, 0.2, 0.3, 0.4])[0]
-    collected_items = random.sample(location_items, k=min(num_items_to_collect, len(location_items)))
+    num_items_to_collect = exploration_rules.roll_item_count()
+    found_items = loot_table.sample_many(num_items_to_collect)
 
-    # Add items to inventory and calculate XP gain
+    # Add items to inventory until it is full and calculate XP gain
     item_counts = {}
-    total_xp_gain = 0
-    for item in collected_items:
-        if len(player.inventory) < get_inventory_capacity(player, current_location, config["config"], items_data):
-            player.inventory.append(item)
+    collected_items = []
+    inventory_capacity = get_inventory_capacity(player, current_location, settings)
+    for item in found_items:
+        if player.used_space < inventory_capacity:
+            player.add_item(item["id"])
             item_counts[item["name"]] = item_counts.get(item["name"], 0) + 1
-            # Reduced XP gain to make progression harder
-            total_xp_gain += config["config"]["xp_gain"]["per_item"] * 0.75  # Less XP for hardcore
+            collected_items.append(item)
 
-    # Apply XP scaling based on player's level with the new hardcore multiplier
-    total_xp_gain *= config["config"]["xp_gain"]["level_multiplier"] * 0.5  # Harder scaling
+    # Reduced, level-multiplier scaled XP per item to make progression harder
+    total_xp_gain = exploration_rules.xp_for_items(len(collected_items), settings)
 
     # Build item message
     item_message = "\n".join(f"{name} (x{count})" for name, count in item_counts.items()) or "None"
 
     # Generate encounter message based on the current location and random events
-    encounter_message = random.choice(events[current_location]) if current_location in events else ""
+    encounter_message = random.choice(game_data.events[current_location])["event"] if current_location in game_data.events else ""
 
     # Include any additional effects (like environmental effects or random events)
     special_effect_message = ""
@@ -119,130 +89,196 @@ async def calculate_exploration_rewards(player, current_location):
 @error_handler_decorator
 async def update_player_stats(player, stamina_deduction):
     """Update the player's stamina and health after exploration."""
-    player.stats["stamina"] = max(0, player.stats["stamina"] - stamina_deduction)
-    if player.stats["stamina"] == 0:
-        health_deduction = random.randint(5, 12)
-        player.stats["health"] = max(0, player.stats["health"] - health_deduction)
+    exploration_rules.apply_exploration_cost(player.stats, stamina_deduction)
     return player
 
-@error_handler_decorator
-async def handle_player_death(player, message):
-    """Handle the player's death by resetting stats and clearing inventory."""
-    player.stamina = config["config"]["max_stamina"]["base"] + (player.level * config["config"]["max_stamina"]["per_level"])
-    player.inventory.clear()
-    await save_player(player)
-    await message.reply(
+def revive_player(player):
+    """Death: every item is lost, health and stamina are restored."""
+    player.health = player.progression.max_health(player.level)
+    player.stamina = player.progression.max_stamina(player.level)
+    player.clear_inventory()
+
+def death_message(player) -> str:
+    return (
         f"{player.name} has died.\n"
         "💔 You lost all your items, but your health and stamina have been restored.\n"
         "Explore carefully next time!"
     )
 
-def build_exploration_response(player, current_location, item_message, xp_gained):
+@error_handler_decorator
+async def handle_player_death(player, message):
+    """Handle the player's death by resetting stats and clearing inventory."""
+    revive_player(player)
+    await save_player(player.user_id, player)
+    await reply(message, death_message(player))
+
+def parse_explore_rounds(message) -> int:
+    """Rounds asked for with /explore <n>, capped at EXPLORE_BATCH_MAX; 1 for a plain /explore or the button."""
+    args = (getattr(message, "text", None) or "").split()
+    if len(args) < 2 or not args[0].startswith("/explore") or not args[1].isdigit():
+        return 1
+    return max(1, min(int(args[1]), EXPLORE_BATCH_MAX))
+
+def build_exploration_response(player, current_location, item_message, xp_gained, encounter_message=""):
     """Construct the response message for the exploration result."""
-    health_bar = get_health_bar(player.stats["health"], player.stats["max_health"])
-    stamina_bar = get_stamina_bar(player.stats["stamina"], player.stats["max_stamina"])
-    return (
-        f"<b>•HP•</b>\n<b>| {health_bar} |</b>\n"
-        f"              <b>(|{player.stats['health']}/{player.stats['max_health']}|)</b>\n"
-        f"<b>•Stamina•</b>\n<b>| {stamina_bar} |</b>\n"
-        f"                   <b>(|{player.stats['stamina']}/{player.stats['max_stamina']}|)</b>\n\n"
-        f"<b>You explored the {current_location}</b>\n"
-        f"<b>Items found:</b>\n{item_message}\n\n"
-        f"<b>Total XP gained: {xp_gained} ✨</b>\n"
-    )
+    return render_exploration(player.stats, current_location, item_message, xp_gained, encounter_message)
 
 ### --- Command Handlers --- ###
 @maintenance_mode_only
 @error_handler_decorator
+@player_locked
 async def explore(client: Client, message: Message):
-    user_id = message.from_user.id
+    """/explore and /explore <n>."""
+    await run_explore(message.from_user.id, message, parse_explore_rounds(message))
+
+@maintenance_mode_only
+@error_handler_decorator
+@player_locked
+async def explore_button(client: Client, query: CallbackQuery):
+    """The Explore button (route explore): one round for whoever pressed it, answered in the button's chat."""
+    await query.answer()
+    await run_explore(query.from_user.id, query.message, 1)
+
+async def run_explore(user_id: int, message: Message, rounds: int):
+    """Explore for `user_id`, replying to `message`; the caller holds the user's player_lock."""
     player = await load_player(user_id)
 
     if not player:
-        await message.reply("Player data could not be loaded. Please try again later.")
+        await reply(message, "Player data could not be loaded. Please try again later.")
+        return
+
+    # Exploring ends a rest; what was regained so far is kept
+    player.set_resting(False)
+
+    if rounds > 1:
+        await explore_batch(player, message, rounds)
         return
 
     if not player.started_adventure:
         player.started_adventure = True
         await save_player(player.user_id, player)
 
+    game_data = get_game_data()
+    settings = game_data.config
     current_location = await get_location_based_on_progress(player.exploration_progress, message)
-    inventory_capacity = get_inventory_capacity(player, current_location, config["config"], items_data)
+    inventory_capacity = get_inventory_capacity(player, current_location, settings)
 
-    if len(player.inventory) >= inventory_capacity:
-        await message.reply("Your inventory is full. You need to make space before you can explore further.")
+    if player.used_space >= inventory_capacity:
+        await reply(message, "Your inventory is full. You need to make space before you can explore further.")
         return
 
     item_message, _, xp_gained, encounter_message = await calculate_exploration_rewards(player, current_location)
     
-    stamina_deduction = random.randint(config["config"]["stamina_usage"]["min"], config["config"]["stamina_usage"]["max"])
+    stamina_deduction = exploration_rules.roll_stamina_cost(settings)
     player = await update_player_stats(player, stamina_deduction)
 
     if player.stats['health'] <= 0:
         await handle_player_death(player, message)
         return
 
-    player.experience += xp_gained
-    level_up_xp = player.level * config["config"]["level_requirements"]["xp_per_level"]
-    if player.experience >= level_up_xp:
-        player.level += 1
-        player.experience = 0
+    player.gain_experience(xp_gained)
 
     await save_player(player.user_id, player)
 
     response_message = build_exploration_response(player, current_location, item_message, xp_gained, encounter_message)
     if not response_message.strip():
         logger.error("Response message is empty!")
-        await message.reply("An error occurred while generating the response. Please try again later.")
+        await reply(message, "An error occurred while generating the response. Please try again later.")
+        return
+
+    reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton("Show Inventory", callback_data="show_inventory")]])
+    await reply(message, response_message, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
+
+async def explore_batch(player, message: Message, rounds: int):
+    """
+    Run up to `rounds` explores on the loaded player, then save once and reply once.
+
+    Stops early when the inventory is full, when the player ends a round
+    exhausted (no stamina left) or when the player dies.
+    """
+    player.started_adventure = True
+    settings = get_game_data().config
+    current_location = exploration_rules.location_for_progress(player.exploration_progress)
+
+    item_counts = {}
+    total_xp = 0
+    completed = 0
+    encounter_message = ""
+    stop_reason = None
+    start_level = player.level
+    for _ in range(rounds):
+        if player.used_space >= get_inventory_capacity(player, current_location, settings):
+            stop_reason = "full"
+            break
+
+        _, collected_items, xp_gained, encounter_message = await calculate_exploration_rewards(player, current_location)
+        exploration_rules.apply_exploration_cost(player.stats, exploration_rules.roll_stamina_cost(settings))
+        completed += 1
+        if player.stats["health"] <= 0:
+            stop_reason = "died"
+            break
+
+        player.gain_experience(xp_gained)
+        total_xp += xp_gained
+        for item in collected_items:
+            item_counts[item["name"]] = item_counts.get(item["name"], 0) + 1
+        if player.stats["stamina"] <= 0:
+            stop_reason = "exhausted"
+            break
+
+    if stop_reason == "died":
+        revive_player(player)
+    await save_player(player.user_id, player)
+
+    if completed == 0:
+        await reply(message, "Your inventory is full. You need to make space before you can explore further.")
+        return
+    if stop_reason == "died":
+        await reply(message, f"You explored the {current_location} {completed} time(s).\n\n{death_message(player)}")
         return
 
+    response_message = render_exploration_summary(
+        player.stats, current_location, completed, rounds, item_counts, round(total_xp, 2),
+        level_ups=player.level - start_level, stop_reason=stop_reason, encounter=encounter_message,
+    )
     reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton("Show Inventory", callback_data="show_inventory")]])
-    await message.reply(response_message, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+    await reply(message, response_message, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+
 
+def format_duration(seconds: float) -> str:
+    minutes = max(1, round(seconds / 60))
+    return f"{minutes} min" if minutes < 60 else f"{minutes // 60} h {minutes % 60} min"
 
 @maintenance_mode_only
 @error_handler_decorator
+@player_locked
 async def rest(client: Client, message: Message):
+    """Start resting: stamina and health come back faster until the next explore."""
     user_id = message.from_user.id
     player = await load_player(user_id)
 
     if not player:
-        await message.reply("Player data could not be loaded. Please try again later.")
+        await reply(message, "Player data could not be loaded. Please try again later.")
         return
 
-    # Send an initial loading message
-    loading_message = await message.reply("Resting... [▒▒▒▒▒▒▒▒▒▒] 0%")
-
-    # Define progress steps for the animation
-    progress_steps = [
-        "[█▒▒▒▒▒▒▒▒▒] 10%",
-        "[██▒▒▒▒▒▒▒▒] 20%",
-        "[███▒▒▒▒▒▒▒] 30%",
-        "[████▒▒▒▒▒▒] 40%",
-        "[█████▒▒▒▒▒] 50%",
-        "[██████▒▒▒▒] 60%",
-        "[███████▒▒▒] 70%",
-        "[████████▒▒] 80%",
-        "[█████████▒] 90%",
-        "[██████████] 100%"
-    ]
-
-    # Simulate the progress animation
-    for step in progress_steps:
-        await asyncio.sleep(0.5)  # Adjust speed as necessary
-        await loading_message.edit_text(f"Resting... {step}")
-
-    # Final message
-    await loading_message.edit_text("Fully rested! 🌟")
-
-    # Restore player's stamina
-    player.stats["stamina"] = player.stats["max_stamina"]
-    await save_player(player.user_id, player)
+    stamina_bar = get_stamina_bar(player.stamina, player.stats["max_stamina"])
+    if player.stamina >= player.stats["max_stamina"] and player.health >= player.stats["max_health"]:
+        await reply(message, f"{player.name} is already fully rested.\n{stamina_bar} ({player.stamina}/{player.stats['max_stamina']})")
+        return
+
+    # Regeneration is worked out when the player is next loaded; nothing runs in the meantime
+    was_resting = player.resting
+    player.set_resting(True)
+    if not was_resting:
+        await save_player(player.user_id, player)
 
-    # Send a message indicating that the player's stamina has been restored
-    await loading_message.edit_text(
-        f"{player.name} has fully rested.\n"
-        "✨ Your stamina has been restored to maximum!"
+    until_full = regeneration.seconds_until_full(player.stats, player.regen_rates(), player.regen_carry)
+    eta = f"Full stamina in about {format_duration(until_full)}." if until_full else "Your stamina will not recover here."
+    await reply(message,
+        f"{player.name} is {'still ' if was_resting else ''}resting. 🌙\n"
+        f"{stamina_bar} ({player.stamina}/{player.stats['max_stamina']})\n"
+        f"{eta} Exploring ends the rest."
     )
 
 
@@ -1,52 +1,39 @@
-from pyrogram import Client, filters
+from pyrogram import Client
 from pyrogram.enums import ParseMode
-from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, Message
-from pyrogram.handlers import CallbackQueryHandler
-from handlers.start_handler import show_game_brief, start_solo_arc, show_narrative_placeholder 
-from handlers.adventure_handler import explore
-from utils.db_utils import load_player, save_player
+from pyrogram.types import CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
+from handlers.adventure_handler import run_explore
+from utils.db_utils import load_player, load_player_fields, save_player
+from utils.decorators import player_locked
 from utils.shared_utils import get_health_bar, get_stamina_bar
-from handlers.inventory_handler import get_inventory_capacity
+from handlers.inventory_handler import get_inventory_capacity, get_used_space
 from handlers.error_handler import error_handler_decorator
 import logging
-import json
 from models.player import Player  # Adjust the import path as necessary
+from utils.game_data import get_game_data
+from utils.callback_router import router
+from utils.outbound import edit_text, reply
 
-# Load config and items data
-with open('/workspaces/island_gamebot/data/config.json') as f:
-    config = json.load(f)
-
-with open('/workspaces/island_gamebot/data/items.json') as f:
-    items_data = json.load(f)["items"]
+# Player fields read by the inventory check; use_item modifies the player and loads it in full
+CHECK_INVENTORY_FIELDS = ("inventory", "level", "location")
 
 #-----------------------------------------------------------------------------------#
 @error_handler_decorator
-async def start_adventure(_, message: Message):
-    """Handles the 'Start Adventure' button click."""
-    user_id = message.from_user.id
-    user_name = message.from_user.first_name
-
-    logging.info(f"User {user_name} ({user_id}) started a new adventure.")
-
-    # Show game brief with options to start Solo or Story Adventure
-    await show_game_brief(message)
-
-@error_handler_decorator
+@player_locked
 async def start_solo_arc(client: Client, query: CallbackQuery):
     """Starts a Solo Expedition adventure."""
     user_id = query.from_user.id
     user_name = query.from_user.first_name
 
     player = Player(user_id=user_id, name=user_name, arc_type='solo', started_adventure=True)
-    await save_player(player)
+    await save_player(player.user_id, player)
 
-    await query.message.edit_text("🧭 Starting Solo Expedition! Let’s see how you fare on your own.")
-    await explore(client, query.message)  # Replace 'explore' with solo adventure logic
+    await edit_text(query.message, "🧭 Starting Solo Expedition! Let’s see how you fare on your own.")
+    await run_explore(user_id, query.message, 1)  # Replace with solo adventure logic
 
 @error_handler_decorator
-async def show_narrative_placeholder(query: CallbackQuery):
+async def show_narrative_placeholder(_, query: CallbackQuery):
     """Starts the Narrative Adventure (story-driven)."""
-    await query.message.edit_text(
+    await edit_text(query.message,
         "📖 <b>Narrative Arc Coming Soon!</b>\n\n"
         "Get ready for a unique, story-driven adventure where your choices shape the journey.",
         parse_mode=ParseMode.HTML
@@ -59,37 +46,40 @@ async def check_inventory(client: Client, query: CallbackQuery):
     """Handler for checking inventory."""
     try:
         user_id = query.from_user.id
-        player = await load_player(user_id)
+        player = await load_player_fields(user_id, CHECK_INVENTORY_FIELDS)
         
         if not player:
             await query.answer("Player data not found. Please try again later.", show_alert=True)
             return
         
+        game_data = get_game_data()
         inventory = player.inventory
-        inventory_capacity = get_inventory_capacity(player, player.current_location, config, items_data)
+        inventory_capacity = get_inventory_capacity(player, player.location, game_data.config)
 
         if not inventory:
             await query.answer("Your inventory is empty.", show_alert=True)
             return
         
-        inventory_list = "\n".join(f"{item['name']} (x{item['quantity']})" for item in inventory)
+        catalog = game_data.catalog
+        inventory_list = "\n".join(f"{catalog.name(item_id)} (x{count})" for item_id, count in inventory.items())
         inventory_message = (
             f"<b>Your Inventory:</b>\n\n{inventory_list}\n\n"
-            f"Capacity: {len(inventory)} / {inventory_capacity}"
+            f"Capacity: {get_used_space(player, game_data.config)} / {inventory_capacity}"
         )
 
-        await query.message.edit_text(
+        await edit_text(query.message,
             inventory_message,
             parse_mode=ParseMode.HTML,
             reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("Close", callback_data="close_inventory")]]))
     except Exception as e:
         logging.error(f"Error in check_inventory: {e}")
-        await query.message.reply("An error occurred while checking your inventory. Please try again later.")
+        await reply(query.message, "An error occurred while checking your inventory. Please try again later.")
 
 # Use Item
 @error_handler_decorator
-async def use_item(client: Client, query: CallbackQuery):
-    """Handler for using items."""
+@player_locked
+async def use_item(client: Client, query: CallbackQuery, item_name: str):
+    """Handler for using items (route use_item:<item name>)."""
     try:
         user_id = query.from_user.id
         player = await load_player(user_id)
@@ -98,8 +88,9 @@ async def use_item(client: Client, query: CallbackQuery):
             await query.answer("Player data not found. Please try again later.", show_alert=True)
             return
 
-        item_name = query.data.split("_", 2)[-1]
-        item = next((i for i in player.inventory if i["name"] == item_name), None)
+        catalog = get_game_data().catalog
+        item_id = catalog.id_for_name(item_name)
+        item = catalog.get(item_id) if player.inventory.get(item_id) else None
 
         if not item:
             await query.answer(f"Item {item_name} not found in inventory.", show_alert=True)
@@ -118,8 +109,8 @@ async def use_item(client: Client, query: CallbackQuery):
         else:
             message = f"Used {item_name}."
 
-        player.inventory.remove(item)
-        await save_player(player)
+        player.remove_item(item_id)
+        await save_player(player.user_id, player)
         await query.answer(message)
         await check_inventory(client, query)  # Refresh inventory view
     except Exception as e:
@@ -129,8 +120,8 @@ async def use_item(client: Client, query: CallbackQuery):
 
 # Register Handlers
 def register(app: Client):
-    app.add_handler(CallbackQueryHandler(start_adventure, filters.regex('^start_adventure$')))
-    app.add_handler(CallbackQueryHandler(start_solo_arc, filters.regex('^solo_arc$')))
-    app.add_handler(CallbackQueryHandler(show_narrative_placeholder, filters.regex('^narrative_arc$')))
-    app.add_handler(CallbackQueryHandler(check_inventory, filters.regex("check_inventory")))
-    app.add_handler(CallbackQueryHandler(use_item, filters.regex("use_item_")))
+    router.add("solo_arc", start_solo_arc)
+    router.add("narrative_arc", show_narrative_placeholder)
+    router.add("check_inventory", check_inventory)
+    router.add("use_item", use_item, str)
+    router.add_legacy("use_item_", "use_item")
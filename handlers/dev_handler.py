@@ -1,15 +1,33 @@
+import asyncio
 import json
 import logging
 from functools import wraps
 from pyrogram import Client, filters
 from pyrogram.enums import ParseMode
 from pyrogram.types import Message, CallbackQuery
-from pyrogram.handlers import MessageHandler, CallbackQueryHandler
+from pyrogram.handlers import MessageHandler
 from datetime import datetime
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from config import STORAGE_BACKEND
+from utils.db_utils import (
+    count_players,
+    delete_player,
+    get_players_page,
+    migrate_inventories,
+    player_cache,
+    write_behind,
+)
+from utils.game_data import get_config_store, get_game_data
+from utils.loot import get_loot_tables
+from utils.job_scheduler import jobs
+from utils.media import media
+from utils.mongo_pool import pool_metrics
+from utils.animation import animator
+from utils.callback_router import router
+from utils.outbound import edit_text, outbound, reply
+from utils.templates import card_cache
 
 # Paths to JSON files
-CONFIG_FILE = "/workspaces/island_gamebot/data/config.json"
 ITEM_FILE = "/workspaces/island_gamebot/data/items.json"
 EXPLORATION_FILE = "/workspaces/island_gamebot/data/exploration.json"
 
@@ -40,7 +58,10 @@ def dev_only(func):
     @wraps(func)
     async def wrapper(client: Client, message: Message, *args, **kwargs):
         if message.from_user.id not in DEV_USER_IDS:
-            await message.reply_text("🚫 <b>You are not authorized to use this command.</b>", parse_mode=ParseMode.HTML)
+            if isinstance(message, CallbackQuery):
+                await message.answer("🚫 You are not authorized to use this command.", show_alert=True)
+            else:
+                await reply(message, "🚫 <b>You are not authorized to use this command.</b>", parse_mode=ParseMode.HTML)
             logging.warning(f"Unauthorized access attempt by user {message.from_user.id} at {datetime.now()}.")
             return
         return await func(client, message, *args, **kwargs)
@@ -54,45 +75,115 @@ def is_valid_numeric_input(args: list, count: int) -> bool:
     return all(arg.isdigit() for arg in args)
 
 
-# Mock functions for demonstration purposes
-async def get_all_players():
-    return []
+# Players shown per /dev page
+DEV_PAGE_SIZE = 20
+DEV_PAGE_FIELDS = ("name", "level")
 
-async def delete_player(user_id: int) -> bool:
-    return True
+async def build_player_page(after: int = None, before: int = None):
+    """Return the text and navigation keyboard for one page of players."""
+    # Fetch one extra row to know whether another page exists in that direction
+    players = await get_players_page(after=after, before=before, limit=DEV_PAGE_SIZE + 1, fields=DEV_PAGE_FIELDS)
+    has_more = len(players) > DEV_PAGE_SIZE
+    if has_more:
+        players = players[1:] if before is not None else players[:DEV_PAGE_SIZE]
+    if not players:
+        return None, None
+
+    if before is not None:
+        has_prev, has_next = has_more, True
+    else:
+        has_prev, has_next = after is not None, has_more
+
+    total = await count_players()
+    player_info = "\n".join(
+        f"• <b>Name</b>: {player.name}, <b>ID</b>: <code>{player.user_id}</code>, <b>Lvl</b>: {player.level}"
+        for player in players
+    )
+    buttons = []
+    if has_prev:
+        buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=router.data("dev_page", "prev", players[0].user_id)))
+    if has_next:
+        buttons.append(InlineKeyboardButton("Next ➡️", callback_data=router.data("dev_page", "next", players[-1].user_id)))
+    keyboard = InlineKeyboardMarkup([buttons]) if buttons else None
+    return f"📊 <b>Number of players:</b> {total}\n\n{player_info}", keyboard
 
 # Command: /dev - Display player information
 @dev_only
 async def dev(client: Client, message: Message):
-    """Display information about all players."""
-    players = await get_all_players()
-    if not players:
-        await message.reply_text("📭 <b>No players found.</b>", parse_mode=ParseMode.HTML)
+    """Display information about players, one page at a time."""
+    text, keyboard = await build_player_page()
+    if text is None:
+        await reply(message, "📭 <b>No players found.</b>", parse_mode=ParseMode.HTML)
         return
 
-    player_info = "\n".join(
-        [f"• <b>Name</b>: {player.name}, <b>ID</b>: <code>{player.user_id}</code>" for player in players]
-    )
-    await message.reply_text(f"📊 <b>Number of players:</b> {len(players)}\n\n{player_info}", parse_mode=ParseMode.HTML)
+    await reply(message, text, parse_mode=ParseMode.HTML, reply_markup=keyboard)
     logging.info(f"Developer {message.from_user.id} accessed player information at {datetime.now()}.")
 
+@dev_only
+async def dev_page(client: Client, callback_query: CallbackQuery, direction: str, cursor: int):
+    """Handle the Next/Prev buttons of the /dev player list (route dev_page:<next|prev>:<user_id>)."""
+    if direction == "next":
+        text, keyboard = await build_player_page(after=cursor)
+    else:
+        text, keyboard = await build_player_page(before=cursor)
+
+    if text is None:
+        await callback_query.answer("No more players.")
+        return
+    await edit_text(callback_query.message, text, parse_mode=ParseMode.HTML, reply_markup=keyboard)
+    await callback_query.answer()
+
+# Command: /dbstats - Show cache, write-behind, outbound queue, animation, job, callback route, media, connection pool and game data counters
+@dev_only
+async def db_stats(client: Client, message: Message):
+    """Display persistence layer statistics."""
+    sections = {
+        "Player cache": player_cache.stats(),
+        "Write-behind": write_behind.stats(),
+        "Card cache": card_cache.stats(),
+        "Outbound": outbound.stats(),
+        "Animations": animator.stats(),
+        "Jobs": jobs.stats(),
+        "Callbacks": router.stats(),
+        "Media": media.stats(),
+    }
+    if STORAGE_BACKEND == "mongo":
+        sections["Mongo pool"] = pool_metrics.stats()
+    sections["Game data"] = get_game_data().stats()
+    lines = []
+    for title, stats in sections.items():
+        lines.append(f"<b>{title}</b>")
+        lines.extend(f"• {name}: <code>{value}</code>" for name, value in stats.items())
+        lines.append("")
+    await reply(message, "\n".join(lines).strip(), parse_mode=ParseMode.HTML)
+    logging.info(f"Developer {message.from_user.id} accessed database stats at {datetime.now()}.")
+
+# Command: /migrate_inventories - Convert stored list inventories to item counts
+@dev_only
+async def migrate_player_inventories(client: Client, message: Message):
+    """Migrate every legacy inventory instead of waiting for players to load."""
+    status = await reply(message, "⏳ <b>Migrating inventories...</b>", parse_mode=ParseMode.HTML)
+    migrated = await migrate_inventories()
+    await edit_text(status, f"✅ <b>Migrated {migrated} player inventories.</b>", parse_mode=ParseMode.HTML)
+    logging.info(f"Developer {message.from_user.id} migrated {migrated} inventories at {datetime.now()}.")
+
 # Command: /delete_player <user_id> - Delete a specific player's data
 @dev_only
 async def delete_player_data(client: Client, message: Message):
     """Delete a specific player's data by user ID."""
     args = message.text.split()
     if not is_valid_numeric_input(args, 2):
-        await message.reply_text("❌ <b>Usage:</b> /delete_player <user_id> *(numeric)*", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ <b>Usage:</b> /delete_player <user_id> *(numeric)*", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
     user_id = int(args[1])
     success = await delete_player(user_id)
     if success:
-        await message.reply_text(f"✅ <b>Player data for user_id <code>{user_id}</code> has been deleted.</b>", parse_mode=ParseMode.HTML)
+        await reply(message, f"✅ <b>Player data for user_id <code>{user_id}</code> has been deleted.</b>", parse_mode=ParseMode.HTML)
         logging.info(f"Developer {message.from_user.id} deleted player data for user_id {user_id} at {datetime.now()}.")
     else:
-        await message.reply_text(f"⚠️ <b>No player found with user_id <code>{user_id}</code>.</b>", parse_mode=ParseMode.HTML)
+        await reply(message, f"⚠️ <b>No player found with user_id <code>{user_id}</code>.</b>", parse_mode=ParseMode.HTML)
         logging.warning(f"Attempted to delete non-existent player with user_id {user_id} at {datetime.now()}.")
 
 # Check if input values are valid numbers
@@ -104,7 +195,7 @@ def is_valid_numeric_input(args, expected_length):
 async def set_max_health(client: Client, message: Message):
     args = message.text.split()
     if not is_valid_numeric_input(args, 3):
-        await message.reply_text("❌ Invalid Syntax: /set_max_health <base> <per_level>", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ Invalid Syntax: /set_max_health <base> <per_level>", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
@@ -112,17 +203,15 @@ async def set_max_health(client: Client, message: Message):
         base = int(args[1]) if args[1] != '-' else None
         per_level = int(args[2]) if args[2] != '-' else None
         
-        config = load_json(CONFIG_FILE)
-        if base is not None:
-            config['max_health']['base'] = base
-        if per_level is not None:
-            config['max_health']['per_level'] = per_level
-
-        save_json(CONFIG_FILE, config)
-        await message.reply(f"<b>✅UPDATED</b>\n Max Health set: Base = {base if base else config['max_health']['base']} || Per Level = {per_level if per_level else config['max_health']['per_level']}.", parse_mode=ParseMode.HTML)
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "max_health.base": base,
+            "max_health.per_level": per_level,
+        }, author=message.from_user.id)
+        config = snapshot.data
+        await reply(message, f"<b>✅UPDATED</b>\n Max Health set: Base = {base if base else config['max_health']['base']} || Per Level = {per_level if per_level else config['max_health']['per_level']}.\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
         logging.info(f"Max Health updated by {message.from_user.id} at {datetime.now()}.")
     except Exception as e:
-        await message.reply_text("❌ An error occurred while setting max health.", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ An error occurred while setting max health.", parse_mode=ParseMode.HTML)
         logging.error(f"Error setting max health by {message.from_user.id} at {datetime.now()}: {e}")
 
 
@@ -131,7 +220,7 @@ async def set_max_health(client: Client, message: Message):
 async def set_max_stamina(client: Client, message: Message):
     args = message.text.split()
     if not is_valid_numeric_input(args, 3):
-        await message.reply_text("❌ Invalid Syntax: /set_max_stamina <base> <per_level>", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ Invalid Syntax: /set_max_stamina <base> <per_level>", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
@@ -139,17 +228,15 @@ async def set_max_stamina(client: Client, message: Message):
         base = int(args[1]) if args[1] != '-' else None
         per_level = int(args[2]) if args[2] != '-' else None
         
-        config = load_json(CONFIG_FILE)
-        if base is not None:
-            config['max_stamina']['base'] = base
-        if per_level is not None:
-            config['max_stamina']['per_level'] = per_level
-
-        save_json(CONFIG_FILE, config)
-        await message.reply(f"<b>✅UPDATED</b>\n Max Stamina set: Base = {base if base else config['max_stamina']['base']} || Per Level = {per_level if per_level else config['max_stamina']['per_level']}.", parse_mode=ParseMode.HTML)
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "max_stamina.base": base,
+            "max_stamina.per_level": per_level,
+        }, author=message.from_user.id)
+        config = snapshot.data
+        await reply(message, f"<b>✅UPDATED</b>\n Max Stamina set: Base = {base if base else config['max_stamina']['base']} || Per Level = {per_level if per_level else config['max_stamina']['per_level']}.\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
         logging.info(f"Max Stamina updated by {message.from_user.id} at {datetime.now()}.")
     except Exception as e:
-        await message.reply_text("❌ An error occurred while setting max stamina.", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ An error occurred while setting max stamina.", parse_mode=ParseMode.HTML)
         logging.error(f"Error setting max stamina by {message.from_user.id} at {datetime.now()}: {e}")
 
 
@@ -158,7 +245,7 @@ async def set_max_stamina(client: Client, message: Message):
 async def set_stamina_usage(client: Client, message: Message):
     args = message.text.split()
     if not is_valid_numeric_input(args, 3):
-        await message.reply_text("❌ Invalid Syntax: /set_stamina_usage <min> <max>", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ Invalid Syntax: /set_stamina_usage <min> <max>", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
@@ -166,17 +253,15 @@ async def set_stamina_usage(client: Client, message: Message):
         min_usage = int(args[1]) if args[1] != '-' else None
         max_usage = int(args[2]) if args[2] != '-' else None
         
-        config = load_json(CONFIG_FILE)
-        if min_usage is not None:
-            config['stamina_usage']['min'] = min_usage
-        if max_usage is not None:
-            config['stamina_usage']['max'] = max_usage
-
-        save_json(CONFIG_FILE, config)
-        await message.reply(f"<b>✅UPDATED</b>\n Stamina usage set: Min = {min_usage if min_usage else config['stamina_usage']['min']} || Max = {max_usage if max_usage else config['stamina_usage']['max']}.", parse_mode=ParseMode.HTML)
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "stamina_usage.min": min_usage,
+            "stamina_usage.max": max_usage,
+        }, author=message.from_user.id)
+        config = snapshot.data
+        await reply(message, f"<b>✅UPDATED</b>\n Stamina usage set: Min = {min_usage if min_usage else config['stamina_usage']['min']} || Max = {max_usage if max_usage else config['stamina_usage']['max']}.\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
         logging.info(f"Stamina usage updated by {message.from_user.id} at {datetime.now()}.")
     except Exception as e:
-        await message.reply_text("❌ An error occurred while setting stamina usage.", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ An error occurred while setting stamina usage.", parse_mode=ParseMode.HTML)
         logging.error(f"Error setting stamina usage by {message.from_user.id} at {datetime.now()}: {e}")
 
 
@@ -185,7 +270,7 @@ async def set_stamina_usage(client: Client, message: Message):
 async def set_xp_gain(client: Client, message: Message):
     args = message.text.split()
     if not is_valid_numeric_input(args, 4):
-        await message.reply_text("❌ Invalid Syntax: /set_xp_gain <per_item> <per_encounter> <level_multiplier>", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ Invalid Syntax: /set_xp_gain <per_item> <per_encounter> <level_multiplier>", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
@@ -194,19 +279,16 @@ async def set_xp_gain(client: Client, message: Message):
         per_encounter = int(args[2]) if args[2] != '-' else None
         level_multiplier = int(args[3]) if args[3] != '-' else None
         
-        config = load_json(CONFIG_FILE)
-        if per_item is not None:
-            config['xp_gain']['per_item'] = per_item
-        if per_encounter is not None:
-            config['xp_gain']['per_encounter'] = per_encounter
-        if level_multiplier is not None:
-            config['xp_gain']['level_multiplier'] = level_multiplier
-
-        save_json(CONFIG_FILE, config)
-        await message.reply(f"<b>✅UPDATED</b>\n XP Gain set: Per Item = {per_item if per_item else config['xp_gain']['per_item']}  Per Encounter = {per_encounter if per_encounter else config['xp_gain']['per_encounter']}, Level Multiplier = {level_multiplier if level_multiplier else config['xp_gain']['level_multiplier']}.", parse_mode=ParseMode.HTML)
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "xp_gain.per_item": per_item,
+            "xp_gain.per_encounter": per_encounter,
+            "xp_gain.level_multiplier": level_multiplier,
+        }, author=message.from_user.id)
+        config = snapshot.data
+        await reply(message, f"<b>✅UPDATED</b>\n XP Gain set: Per Item = {per_item if per_item else config['xp_gain']['per_item']}  Per Encounter = {per_encounter if per_encounter else config['xp_gain']['per_encounter']}, Level Multiplier = {level_multiplier if level_multiplier else config['xp_gain']['level_multiplier']}.\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
         logging.info(f"XP Gain updated by {message.from_user.id} at {datetime.now()}.")
     except Exception as e:
-        await message.reply_text("❌ An error occurred while setting XP gain.", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ An error occurred while setting XP gain.", parse_mode=ParseMode.HTML)
         logging.error(f"Error setting XP gain by {message.from_user.id} at {datetime.now()}: {e}")
 
 
@@ -215,7 +297,7 @@ async def set_xp_gain(client: Client, message: Message):
 async def set_level_requirements(client: Client, message: Message):
     args = message.text.split()
     if len(args) < 2 or len(args) > 4 or not all(arg.isdigit() or arg == '-' for arg in args[1:]):
-        await message.reply_text("❌ Invalid Syntax: /set_level_requirements <xp_per_level> <xp_increment_per_level> <level_cap>", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ Invalid Syntax: /set_level_requirements <xp_per_level> <xp_increment_per_level> <level_cap>", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
@@ -224,19 +306,16 @@ async def set_level_requirements(client: Client, message: Message):
         xp_increment_per_level = int(args[2]) if args[2] != '-' else None
         level_cap = int(args[3]) if args[3] != '-' else None
         
-        config = load_json(CONFIG_FILE)
-        if xp_per_level is not None:
-            config['level_requirements']['xp_per_level'] = xp_per_level
-        if xp_increment_per_level is not None:
-            config['level_requirements']['xp_increment_per_level'] = xp_increment_per_level
-        if level_cap is not None:
-            config['level_requirements']['level_cap'] = level_cap
-
-        save_json(CONFIG_FILE, config)
-        await message.reply(f"<b>✅UPDATED Level Requirements set</b>\n <b>XP per Level = {xp_per_level if xp_per_level else config['level_requirements']['xp_per_level']},\n XP Increment per Level = {xp_increment_per_level if xp_increment_per_level else config['level_requirements']['xp_increment_per_level']},\n Level Cap = {level_cap if level_cap else config['level_requirements']['level_cap']}.</b>", parse_mode=ParseMode.HTML)
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "level_requirements.xp_per_level": xp_per_level,
+            "level_requirements.xp_increment_per_level": xp_increment_per_level,
+            "level_requirements.level_cap": level_cap,
+        }, author=message.from_user.id)
+        config = snapshot.data
+        await reply(message, f"<b>✅UPDATED Level Requirements set</b>\n <b>XP per Level = {xp_per_level if xp_per_level else config['level_requirements']['xp_per_level']},\n XP Increment per Level = {xp_increment_per_level if xp_increment_per_level else config['level_requirements']['xp_increment_per_level']},\n Level Cap = {level_cap if level_cap else config['level_requirements']['level_cap']}.</b>\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
         logging.info(f"Level Requirements updated by {message.from_user.id} at {datetime.now()}.")
     except Exception as e:
-        await message.reply_text("❌ An error occurred while setting level requirements.", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ An error occurred while setting level requirements.", parse_mode=ParseMode.HTML)
         logging.error(f"Error setting level requirements by {message.from_user.id} at {datetime.now()}: {e}")
 
 
@@ -245,7 +324,7 @@ async def set_level_requirements(client: Client, message: Message):
 async def set_space_per_item(client: Client, message: Message):
     args = message.text.split()
     if not is_valid_numeric_input(args, 3):
-        await message.reply_text("❌ Invalid Syntax: /set_space_per_item <common> <rare>", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ Invalid Syntax: /set_space_per_item <common> <rare>", parse_mode=ParseMode.HTML)
         logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
         return
 
@@ -253,24 +332,97 @@ async def set_space_per_item(client: Client, message: Message):
         common = int(args[1]) if args[1] != '-' else None
         rare = int(args[2]) if args[2] != '-' else None
         
-        config = load_json(CONFIG_FILE)
-        if common is not None:
-            config['space_per_item']['common'] = common
-        if rare is not None:
-            config['space_per_item']['rare'] = rare
-
-        save_json(CONFIG_FILE, config)
-        await message.reply(f"<b>✅UPDATED</b>\n Space per Item set: Common = {common if common else config['space_per_item']['common']}, Rare = {rare if rare else config['space_per_item']['rare']}.", parse_mode=ParseMode.HTML)
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "space_per_item.common": common,
+            "space_per_item.rare": rare,
+        }, author=message.from_user.id)
+        config = snapshot.data
+        await reply(message, f"<b>✅UPDATED</b>\n Space per Item set: Common = {common if common else config['space_per_item']['common']}, Rare = {rare if rare else config['space_per_item']['rare']}.\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
         logging.info(f"Space per Item updated by {message.from_user.id} at {datetime.now()}.")
     except Exception as e:
-        await message.reply_text("❌ An error occurred while setting space per item.", parse_mode=ParseMode.HTML)
+        await reply(message, "❌ An error occurred while setting space per item.", parse_mode=ParseMode.HTML)
         logging.error(f"Error setting space per item by {message.from_user.id} at {datetime.now()}: {e}")
 
+# Command: /set_loot_weights <common> <rare> - Set drop weights per rarity
+@dev_only
+async def set_loot_weights(client: Client, message: Message):
+    args = message.text.split()
+    if not is_valid_numeric_input(args, 3):
+        await reply(message, "❌ Invalid Syntax: /set_loot_weights <common> <rare>", parse_mode=ParseMode.HTML)
+        logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
+        return
+
+    try:
+        common = int(args[1]) if args[1] != '-' else None
+        rare = int(args[2]) if args[2] != '-' else None
+
+        snapshot = await asyncio.to_thread(get_config_store().update, {
+            "loot.rarity_weights.common": common,
+            "loot.rarity_weights.rare": rare,
+        }, author=message.from_user.id)
+        weights = get_loot_tables().rarity_weights
+        await reply(message, f"<b>✅UPDATED</b>\n Loot weights set: Common = {weights.get('common')}, Rare = {weights.get('rare')}.\n <i>Config v{snapshot.version} is live.</i>", parse_mode=ParseMode.HTML)
+        logging.info(f"Loot weights updated by {message.from_user.id} at {datetime.now()}.")
+    except Exception as e:
+        await reply(message, "❌ An error occurred while setting loot weights.", parse_mode=ParseMode.HTML)
+        logging.error(f"Error setting loot weights by {message.from_user.id} at {datetime.now()}: {e}")
+
+# Command: /loot <location> - Show the drop chance of every item at a location
+@dev_only
+async def show_loot(client: Client, message: Message):
+    args = message.text.split(maxsplit=1)
+    if len(args) != 2:
+        await reply(message, "❌ Invalid Syntax: /loot <location>", parse_mode=ParseMode.HTML)
+        return
+
+    rates = get_loot_tables().drop_rates(args[1])
+    if not rates:
+        await reply(message, f"⚠️ <b>No loot table for {args[1]}.</b>", parse_mode=ParseMode.HTML)
+        return
+    lines = [f"<b>Loot in {args[1]}</b> (chance per item drawn)"]
+    lines.extend(f"• {name}: <code>{rate:.1%}</code>" for name, rate in sorted(rates.items(), key=lambda rate: -rate[1]))
+    await reply(message, "\n".join(lines), parse_mode=ParseMode.HTML)
+
+# Command: /config_versions - List the config versions available for rollback
+@dev_only
+async def config_versions(client: Client, message: Message):
+    """Show the live config version and the history kept in memory."""
+    store = get_config_store()
+    lines = ["<b>Config versions</b> (newest first)"]
+    for snapshot in store.versions():
+        live = " ← live" if snapshot is store.current else ""
+        author = f" by <code>{snapshot.author}</code>" if snapshot.author else ""
+        created = datetime.fromtimestamp(snapshot.created_at).strftime("%Y-%m-%d %H:%M:%S")
+        lines.append(f"• <b>v{snapshot.version}</b> {created}{author}: {snapshot.note}{live}")
+    await reply(message, "\n".join(lines), parse_mode=ParseMode.HTML)
+
+# Command: /config_rollback <version> - Make an earlier config version live again
+@dev_only
+async def config_rollback(client: Client, message: Message):
+    """Restore an earlier config version; the rollback itself becomes a new version."""
+    args = message.text.split()
+    if not is_valid_numeric_input(args, 2) or args[1] == '-':
+        await reply(message, "❌ Invalid Syntax: /config_rollback <version>", parse_mode=ParseMode.HTML)
+        logging.error(f"Invalid command usage by {message.from_user.id} at {datetime.now()}: {message.text}")
+        return
+
+    try:
+        snapshot = await asyncio.to_thread(get_config_store().rollback, int(args[1]), author=message.from_user.id)
+    except KeyError:
+        await reply(message, f"❌ Config version {args[1]} is not in the history. See /config_versions.", parse_mode=ParseMode.HTML)
+        return
+    except Exception as e:
+        await reply(message, "❌ An error occurred while rolling back the config.", parse_mode=ParseMode.HTML)
+        logging.error(f"Error rolling back config by {message.from_user.id} at {datetime.now()}: {e}")
+        return
+    await reply(message, f"<b>✅ROLLED BACK</b>\n Config v{args[1]} is live again as v{snapshot.version}.", parse_mode=ParseMode.HTML)
+    logging.info(f"Config rolled back to v{args[1]} by {message.from_user.id} at {datetime.now()}.")
+
 # Command: /sconfig - Show current configuration
 @dev_only
 async def show_config(client: Client, message: Message):
     """Send a preview of current configurations with buttons to navigate."""
-    config = load_json(CONFIG_FILE)
+    config = get_config_store().current.to_dict()
     
     # Format config preview (you can format this better based on your needs)
     config_preview = json.dumps(config, indent=4)
@@ -283,7 +435,7 @@ async def show_config(client: Client, message: Message):
     ])
     
     # Send the first part of the configuration preview
-    await message.reply_text(
+    await reply(message,
         f"Current configurations:\n<pre>{config_chunks[0]}</pre>",
         parse_mode=ParseMode.HTML,
         reply_markup=keyboard
@@ -295,12 +447,12 @@ async def navigate_config(client: Client, callback_query: CallbackQuery):
     action = callback_query.data.split("_")
     if action[0] == "next" and action[1] == "config":
         chunk_number = int(action[2]) - 1
-        config = load_json(CONFIG_FILE)
+        config = get_config_store().current.to_dict()
         config_preview = json.dumps(config, indent=4)
         chunk_size = 3000  # Text size limit in Telegram
         config_chunks = [config_preview[i:i+chunk_size] for i in range(0, len(config_preview), chunk_size)]
         
-        await callback_query.message.edit_text(
+        await edit_text(callback_query.message,
             f"Current configurations:\n<pre>{config_chunks[chunk_number]}</pre>",
             parse_mode=ParseMode.HTML,
             reply_markup=InlineKeyboardMarkup([
@@ -324,17 +476,17 @@ async def view_commands(client: Client, callback_query: CallbackQuery):
 
     # Buttons for each command category
     keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton("Max Health", callback_data="command_1"),
-         InlineKeyboardButton("Max Stamina", callback_data="command_2")],
-        [InlineKeyboardButton("Stamina Usage", callback_data="command_3"),
-         InlineKeyboardButton("XP Gain", callback_data="command_4")],
-        [InlineKeyboardButton("XP Value", callback_data="command_5"),
-         InlineKeyboardButton("Level Requirements", callback_data="command_6")],
-        [InlineKeyboardButton("Space Per Item", callback_data="command_7"),
+        [InlineKeyboardButton("Max Health", callback_data=router.data("command", 1)),
+         InlineKeyboardButton("Max Stamina", callback_data=router.data("command", 2))],
+        [InlineKeyboardButton("Stamina Usage", callback_data=router.data("command", 3)),
+         InlineKeyboardButton("XP Gain", callback_data=router.data("command", 4))],
+        [InlineKeyboardButton("XP Value", callback_data=router.data("command", 5)),
+         InlineKeyboardButton("Level Requirements", callback_data=router.data("command", 6))],
+        [InlineKeyboardButton("Space Per Item", callback_data=router.data("command", 7)),
          InlineKeyboardButton("Show Config", callback_data="show_config")]
     ])
     # Send the message with buttons
-    await callback_query.message.edit_text(
+    await edit_text(callback_query.message,
         commands_message,
         parse_mode=ParseMode.HTML,
         reply_markup=keyboard
@@ -342,9 +494,8 @@ async def view_commands(client: Client, callback_query: CallbackQuery):
 
 # Command details with Next and Previous navigation
 @dev_only
-async def command_details(client: Client, callback_query: CallbackQuery):
-    """Provide details for the clicked command."""
-    command = callback_query.data.split("_")[1]  # Extract command index
+async def command_details(client: Client, callback_query: CallbackQuery, command: int):
+    """Provide details for the clicked command (route command:<index>)."""
     
     # Command descriptions
     command_descriptions = {
@@ -408,18 +559,18 @@ async def command_details(client: Client, callback_query: CallbackQuery):
 
     
     # Show command details with a "Next" button to view the next command
-    next_command = int(command) + 1 if int(command) < 7 else 1
-    previous_command = int(command) - 1 if int(command) > 1 else 7
+    next_command = command + 1 if command < 7 else 1
+    previous_command = command - 1 if command > 1 else 7
     
     keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton("Prev", callback_data=f"command_{previous_command}")],
-        [InlineKeyboardButton("Next", callback_data=f"command_{next_command}")],
+        [InlineKeyboardButton("Prev", callback_data=router.data("command", previous_command))],
+        [InlineKeyboardButton("Next", callback_data=router.data("command", next_command))],
         [InlineKeyboardButton("Cmds", callback_data="view_commands")]
     ])
     
     # Send the details message with buttons
-    await callback_query.message.edit_text(
-        command_descriptions.get(command, "Invalid command selected."),
+    await edit_text(callback_query.message,
+        command_descriptions.get(str(command), "Invalid command selected."),
         parse_mode=ParseMode.HTML,
         reply_markup=keyboard
     )
@@ -436,6 +587,8 @@ async def log_callback_data(client: Client, callback_query: CallbackQuery):
 def register(app: Client):
     app.add_handler(MessageHandler(dev, filters.command("dev")))
     app.add_handler(MessageHandler(delete_player_data, filters.command("delplayer")))
+    app.add_handler(MessageHandler(db_stats, filters.command("dbstats")))
+    app.add_handler(MessageHandler(migrate_player_inventories, filters.command("migrate_inventories")))
     app.add_handler(MessageHandler(set_max_health, filters.command("set_max_health")))
     app.add_handler(MessageHandler(set_max_stamina, filters.command("set_max_stamina")))
     app.add_handler(MessageHandler(set_stamina_usage, filters.command("set_stamina_usage")))
@@ -443,6 +596,13 @@ def register(app: Client):
     app.add_handler(MessageHandler(set_level_requirements, filters.command("set_level_requirements")))
     app.add_handler(MessageHandler(set_space_per_item, filters.command("set_space_per_item")))
     app.add_handler(MessageHandler(show_config, filters.command("sconfig")))
-    app.add_handler(CallbackQueryHandler(view_commands, filters.regex("view_commands")))  # Handle button click for commands
-    app.add_handler(CallbackQueryHandler(command_details, filters.regex("command_")))  # Handle button click for command details
+    app.add_handler(MessageHandler(set_loot_weights, filters.command("set_loot_weights")))
+    app.add_handler(MessageHandler(show_loot, filters.command("loot")))
+    app.add_handler(MessageHandler(config_versions, filters.command("config_versions")))
+    app.add_handler(MessageHandler(config_rollback, filters.command("config_rollback")))
+    router.add("dev_page", dev_page, str, int)
+    router.add("view_commands", view_commands)
+    router.add("command", command_details, int)
+    router.add_legacy("dev_", "dev_page")  # dev_next_<id> / dev_prev_<id> buttons
+    router.add_legacy("command_", "command")
 
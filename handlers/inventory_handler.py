@@ -1,22 +1,26 @@
 import logging
-import asyncio
-from client import app
 from pyrogram import Client, filters
 from pyrogram.types import (
     InlineKeyboardMarkup,
     InlineKeyboardButton,
     CallbackQuery,
 )
-from collections import Counter
 from pyrogram.handlers import MessageHandler
 from handlers.error_handler import error_handler_decorator
 from pyrogram.enums import ParseMode
-from utils.db_utils import load_player
-from utils.shared_utils import get_health_bar, get_stamina_bar
+from utils.db_utils import load_player_fields
 from handlers.error_handler import send_error
 from handlers.dev_handler import dev_only
-import json   
-from typing import Dict, List
+from models.player import Player
+from utils import exploration_rules
+from utils.game_data import get_config_store, get_game_data
+from utils.progression import get_progression
+from utils.callback_router import router
+from utils.templates import card_cache, render_bag, render_profile
+from utils.job_scheduler import jobs
+from utils.outbound import edit_text, reply
+from config import INVENTORY_LOADING_TTL
+from typing import Dict
 import traceback
 
 BOT_ID = 7882763921
@@ -28,50 +32,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Load configuration and item data once
-ITEMS_CONFIG_PATH = '/workspaces/island_gamebot/data/items.json'
-CONFIG_PATH = '/workspaces/island_gamebot/data/config.json'
-
-with open(ITEMS_CONFIG_PATH) as f:
-    items_data = json.load(f)["items"]
-
-with open(CONFIG_PATH) as f:
-    config = json.load(f)
+# Player fields each read-only view needs; only these are fetched from Mongo
+PROFILE_FIELDS = ("name", "stats", "location", "level", "experience", "state_version")
+BAG_FIELDS = ("name", "inventory", "level", "location", "state_version")
+
+def get_used_space(player, config: dict) -> int:
+    """Inventory space taken. A Player keeps a running total; a read-only PlayerView is summed once."""
+    if isinstance(player, Player):
+        return player.used_space
+    catalog = get_game_data().catalog
+    return sum(
+        config["space_per_item"].get((catalog.get(item_id) or {}).get("type", "common"), 5) * count
+        for item_id, count in player.inventory.items()
+    )
 
-def get_inventory_capacity(player, location: str, config: dict, items_config: List[dict]) -> int:
-    """Calculate the player's total inventory capacity, considering item types and level-based adjustments."""
-    # Base capacity considering current inventory items and their types
-    base_capacity = 0
-    for item in player.inventory:
-        item_type = item.get("type", "common")  # Default to "common" if no type specified
-        # Retrieve space usage per item type (common: 5, rare: 7)
-        space_per_item = config["space_per_item"].get(item_type, 5)  # Default to 5 space for common items
-        base_capacity += space_per_item
-    
-    # Calculate capacity based on player's level (hardcore survival theme)
-    level_capacity = (player.level * config["level_requirements"].get("xp_per_level")
-                      + (config["level_requirements"].get("xp_increment_per_level") * player.level))
+def card_version(player) -> tuple:
+    """Cards depend on the player's saved state and on the balance config."""
+    return player.state_version, get_config_store().current.version
 
-    # Location-specific bonuses/penalties
-    location_bonus = 0
-    if isinstance(location, str):
-        if location.lower() == "mountain":
-            location_bonus = -1  # Reduces capacity in challenging biomes like mountains
-    
-    # Final inventory capacity calculation
-    total_capacity = base_capacity + level_capacity + location_bonus
-    return max(total_capacity, 0)  # Ensure inventory space doesn't go below 0
+def get_inventory_capacity(player, location: str, config: dict) -> int:
+    """Calculate the player's total inventory capacity from level-based and location adjustments."""
+    # The inventory is full once the used space reaches this; it does not depend on what is carried
+    return exploration_rules.inventory_capacity(player.level, location, config)
 
 @error_handler_decorator
-async def get_inventory_space(player, config, items_config) -> Dict[str, int]:
-    total_capacity = get_inventory_capacity(player, player.location, config, items_config)
-    used_space = sum(
-        config["space_per_item"].get(item.get("type", "common")) for item in player.inventory
-    )
+async def get_inventory_space(player, config) -> Dict[str, int]:
+    total_capacity = get_inventory_capacity(player, player.location, config)
+    used_space = get_used_space(player, config)
     remaining_space = total_capacity - used_space
     return {"used": used_space, "remaining": remaining_space, "capacity": total_capacity}
 
-
 @error_handler_decorator
 async def display_inventory(client: Client, message):
     user_id = message.from_user.id
@@ -79,35 +69,19 @@ async def display_inventory(client: Client, message):
         logger.info(f"Displaying inventory for user_id={user_id}")
 
         # Load player data
-        player = await load_player(user_id)
+        player = await load_player_fields(user_id, PROFILE_FIELDS)
         if not player:
             logger.warning(f"Player data not found for user_id={user_id}")
-            await message.reply("Player not found. Please register first.")
+            await reply(message, "Player not found. Please register first.")
             return
 
-        # Health and stamina bars
-        health_bar = get_health_bar(player.stats["health"], player.stats["max_health"])
-        stamina_bar = get_stamina_bar(player.stats["stamina"], player.stats["max_stamina"])
-    
-        # Maximum experience for the next level
-        next_level_experience = player.get_max_experience()
-
-        # Inventory message
-        inventory_message = (
-            f"━━━━━━━━━━━━━━━━━\n"
-            f"<b>{player.name}</b>\n"
-            f"━━━━━━━━━━━━━━━━━\n"
-            f"<b>• HP:</b>\n"
-            f"{health_bar}\n"
-            f"    <b>[{player.stats['health']}/{player.stats['max_health']}]</b>\n"
-            f"<b>• Stamina:</b>\n"
-            f"{stamina_bar}\n"
-            f"    <b>[{player.stats['stamina']}/{player.stats['max_stamina']}]</b>\n"
-            f"━━━━━━━━━━━━━━━━━\n"
-            f"📍 <b>Location:</b> {player.location}\n"
-            f"🏆 <b>Level:</b> {player.level} | <b>XP:</b> ({player.experience}/{next_level_experience})\n"
-            f"━━━━━━━━━━━━━━━━━"
-        )
+        # Re-render only when the player or the config changed since the last card;
+        # regeneration changes the stats without a save, so they are part of the version
+        version = (*card_version(player), player.stats["health"], player.stats["stamina"])
+        inventory_message = card_cache.get(user_id, "profile", version)
+        if inventory_message is None:
+            inventory_message = render_profile(player, get_progression().xp_to_next(player.level))
+            card_cache.set(user_id, "profile", version, inventory_message)
 
         # Inline button for Bag
         keyboard = InlineKeyboardMarkup(
@@ -116,9 +90,9 @@ async def display_inventory(client: Client, message):
 
         # Check if it's a CallbackQuery or a Message
         if isinstance(message, CallbackQuery):
-            await message.message.reply(inventory_message, reply_markup=keyboard, parse_mode=ParseMode.HTML)
+            await reply(message.message, inventory_message, reply_markup=keyboard, parse_mode=ParseMode.HTML)
         else:
-            await message.reply(inventory_message, reply_markup=keyboard, parse_mode=ParseMode.HTML)
+            await reply(message, inventory_message, reply_markup=keyboard, parse_mode=ParseMode.HTML)
 
     except Exception as e:
         error_message = "".join(traceback.format_exception(type(e), e, e.__traceback__))
@@ -128,7 +102,6 @@ async def display_inventory(client: Client, message):
         else:
             await send_error(client, message.chat.id, error_message)
 
-@app.on_callback_query(filters.regex("show_inventory"))
 async def handle_inventory_button(client: Client, callback_query: CallbackQuery):
     """
     Handle button clicks to display the inventory.
@@ -142,32 +115,24 @@ async def handle_inventory_button(client: Client, callback_query: CallbackQuery)
 
     try:
         # Load player data
-        player = await load_player(user_id)
+        player = await load_player_fields(user_id, BAG_FIELDS)
         if not player:
             logger.warning(f"Player data not found for user_id={user_id}")
-            await callback_query.message.reply("Player not found. Please register first.")
+            await reply(callback_query.message, "Player not found. Please register first.")
             return
         
-        # Inventory space
-        inventory_space = await get_inventory_space(player, config, items_data)
-        used_space = inventory_space["used"]
-        total_capacity = inventory_space["capacity"]
-
-        # Group and count inventory items by their names
-        item_counts = Counter(item['name'] for item in player.inventory)
-
-        # Format the inventory items with correct counts
-        inventory_items = "\n".join([f"{item} : {count}" for item, count in item_counts.items()])
-
-        # Inventory message with items
-        inventory_message = (
-            f"━━━━━━━━━━━━━━━━━\n"
-            f"<b>{player.name}'s Inventory</b>\n"
-            f"━━━━━━━━━━━━━━━━━\n"
-            f"<b>Inventory Space: {used_space}/{total_capacity}</b>\n\n"
-            f"{inventory_items}\n"
-            f"━━━━━━━━━━━━━━━━━"
-        )
+        version = card_version(player)
+        inventory_message = card_cache.get(user_id, "bag", version)
+        if inventory_message is None:
+            # Inventory space
+            game_data = get_game_data()
+            inventory_space = await get_inventory_space(player, game_data.config)
+
+            # Inventory already holds a count per item id
+            catalog = game_data.catalog
+            item_counts = {catalog.name(item_id): count for item_id, count in player.inventory.items()}
+            inventory_message = render_bag(player.name, inventory_space["used"], inventory_space["capacity"], item_counts)
+            card_cache.set(user_id, "bag", version, inventory_message)
 
         # Inline button for Back to Inventory
         keyboard = InlineKeyboardMarkup(
@@ -175,7 +140,7 @@ async def handle_inventory_button(client: Client, callback_query: CallbackQuery)
         )
 
         # Smoothly edit the existing message with new inventory content
-        await callback_query.message.edit_text(inventory_message, reply_markup=keyboard, parse_mode=ParseMode.HTML)
+        await edit_text(callback_query.message, inventory_message, reply_markup=keyboard, parse_mode=ParseMode.HTML)
         await callback_query.answer()
 
     except Exception as e:
@@ -184,20 +149,19 @@ async def handle_inventory_button(client: Client, callback_query: CallbackQuery)
         await send_error(client, callback_query.message.chat.id, error_message)
 
 
-@app.on_callback_query(filters.regex("display_inventory"))
 async def handle_back_to_inventory_button(client: Client, callback_query: CallbackQuery):
     """
     Handle button clicks to go back to the main inventory display.
     """
     try:
         # Show loading message to smooth the transition
-        await callback_query.message.edit_text("Loading your inventory... Please wait.", parse_mode=ParseMode.HTML)
+        await edit_text(callback_query.message, "Loading your inventory... Please wait.", parse_mode=ParseMode.HTML)
 
         # Smooth transition to the main inventory view
         await display_inventory(client, callback_query)
-        # Wait for a short duration before deleting the loading message
-        await asyncio.sleep(10)
-        await callback_query.message.delete()
+        # Delete the loading message a little later, without holding this handler
+        jobs.schedule("delete_message", INVENTORY_LOADING_TTL,
+                      chat_id=callback_query.message.chat.id, message_id=callback_query.message.id)
 
     except Exception as e:
         error_message = "".join(traceback.format_exception(type(e), e, e.__traceback__))
@@ -208,21 +172,20 @@ async def handle_back_to_inventory_button(client: Client, callback_query: Callba
 async def handle_items_command(client: Client, message):
     try:
         command_parts = message.text.split()
+        catalog = get_game_data().catalog
         if len(command_parts) == 1:
             # /items - Show number of items, places name with count of rare and common items
-            item_counts = Counter(item['type'] for item in items_data)
-            place_counts = Counter(item['location'] for item in items_data)
             response = (
-                f"<b>Total Items:</b> {len(items_data)}\n"
-                f"<b>Common Items:</b> {item_counts['common']}\n"
-                f"<b>Rare Items:</b> {item_counts['rare']}\n"
+                f"<b>Total Items:</b> {len(catalog.items)}\n"
+                f"<b>Common Items:</b> {catalog.rarity_counts.get('common', 0)}\n"
+                f"<b>Rare Items:</b> {catalog.rarity_counts.get('rare', 0)}\n"
                 f"<b>Places:</b>\n"
-                + "\n".join([f"<b>{place}</b>: {count} items" for place, count in place_counts.items()])
+                + "\n".join([f"<b>{place}</b>: {count} items" for place, count in catalog.location_counts.items()])
             )
-        elif len(command_parts) == 2:
+        elif len(command_parts) == 2 and catalog.in_location(command_parts[1]):
             place_name = command_parts[1]
             # /items place_name - Show total count of items of the place and names of items
-            place_items = [item for item in items_data if item['location'] == place_name]
+            place_items = catalog.in_location(place_name)
             response = (
                 f"<b>Total Items in {place_name}:</b> {len(place_items)}\n"
                 + "\n".join([f"<b>{item['name']}</b>" for item in place_items])
@@ -230,7 +193,7 @@ async def handle_items_command(client: Client, message):
         elif len(command_parts) == 3 and command_parts[2] == 'c':
             place_name = command_parts[1]
             # /items place_name c - Show count of common items and names of items
-            place_items = [item for item in items_data if item['location'] == place_name and item['type'] == 'common']
+            place_items = catalog.in_location(place_name, 'common')
             response = (
                 f"<b>Common Items in {place_name}:</b> {len(place_items)}\n"
                 + "\n".join([f"<b>{item['name']}</b> (Space: {item['space_per_item']})" for item in place_items])
@@ -239,16 +202,16 @@ async def handle_items_command(client: Client, message):
         elif len(command_parts) == 3 and command_parts[2] == 'r':
             place_name = command_parts[1]
             # /items place_name r - Show count of rare items and names of items
-            place_items = [item for item in items_data if item['location'] == place_name and item['type'] == 'rare']
+            place_items = catalog.in_location(place_name, 'rare')
             response = (
                 f"<b>Rare Items in {place_name}:</b> {len(place_items)}\n"
                 + "\n".join([f"<b>{item['name']}</b> (Space: {item['space_per_item']})" for item in place_items])
                 + f"\n<b>Total Space Covered:</b> {sum(item['space_per_item'] for item in place_items)}"
             )
-        elif len(command_parts) == 2:
-            item_name = command_parts[1]
+        elif len(command_parts) >= 2:
+            item_name = " ".join(command_parts[1:])
             # /items name_of_item - Show details of the item
-            item_details = next((item for item in items_data if item['name'].lower() == item_name.lower()), None)
+            item_details = catalog.find(item_name)
             if item_details:
                 response = (
                     f"<b>Name:</b> {item_details['name']}\n"
@@ -261,10 +224,8 @@ async def handle_items_command(client: Client, message):
                 )
             else:
                 response = f"<b>Item '{item_name}' not found.</b>"
-        else:
-            response = "<b>Invalid command format.</b>"
 
-        await message.reply(response, parse_mode=ParseMode.HTML)
+        await reply(message, response, parse_mode=ParseMode.HTML)
 
     except Exception as e:
         error_message = "".join(traceback.format_exception(type(e), e, e.__traceback__))
@@ -276,3 +237,5 @@ async def handle_items_command(client: Client, message):
 def register(app: Client):
     app.add_handler(MessageHandler(display_inventory, filters.command("inv")))
     app.add_handler(MessageHandler(handle_items_command, filters.command("items")))
+    router.add("show_inventory", handle_inventory_button)
+    router.add("display_inventory", handle_back_to_inventory_button)
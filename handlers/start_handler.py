@@ -1,12 +1,16 @@
-import asyncio
+import logging
 from pyrogram import Client, filters
 from pyrogram.handlers import MessageHandler, CallbackQueryHandler
 from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, CallbackQuery, Message
 from pyrogram.enums import ParseMode
 from models.player import Player
 from handlers.error_handler import error_handler_decorator
-from utils.db_utils import load_player, save_player
-from handlers.adventure_handler import explore  # Import the explore command
+from utils.db_utils import load_player_fields, save_player
+from handlers.adventure_handler import explore_button
+from utils.animation import animator
+from utils.callback_router import router
+from utils.media import media
+from utils.outbound import edit_text, reply
 
 # Constants for messages
 START_MESSAGE = (
@@ -27,6 +31,9 @@ RESTART_MESSAGE = (
 
 SETTINGS_MESSAGE = "⚙️ <b>Settings</b>\n\nThis section is under development. Stay tuned!"
 
+# /start only needs to know whether the player exists
+START_FIELDS = ("user_id",)
+
 @error_handler_decorator
 async def start(_, message: Message):
     """Handles the /start command."""
@@ -36,7 +43,7 @@ async def start(_, message: Message):
     logging.info(f"User {user_name} ({user_id}) issued /start command.")
 
     # Load player data or create a new player
-    player = await load_player(user_id)
+    player = await load_player_fields(user_id, START_FIELDS)
     if player:
         # Existing player: prompt to continue or start a new adventure
         keyboard = [
@@ -45,44 +52,29 @@ async def start(_, message: Message):
             [InlineKeyboardButton("💬 Support", url='https://t.me/SurvivalSupportbot')]
         ]
         reply_markup = InlineKeyboardMarkup(keyboard)
-        await message.reply_text(RESTART_MESSAGE, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
+        await reply(message, RESTART_MESSAGE, reply_markup=reply_markup, parse_mode=ParseMode.HTML)
     else:
         # New player: create and prompt to start adventure
         player = Player(user_id=user_id, name=user_name)
         await save_player(player.user_id, player)
 
         # Send image first, without the caption
-        sent_message = await message.reply_photo(
-            photo='https://files.catbox.moe/pei3tl.jpg'
-        )
-
-        # Now type out the text with the typing effect
-        typing_text = (
-            "🌴🏝️ <b>Welcome to Island Survival Bot!</b> 🏝️🌴\n\n"
-            "You're marooned on a mysterious, untamed island where adventure awaits at every turn! 🌊🐚\n\n"
-            "💡 <b>Your Goal:</b> Survive, thrive, and uncover the island's secrets. 🌟\n\n"
-            "🌟 Will you explore the dense jungles, brave the wild animals, or uncover hidden treasures?\n\n"
-            "🧭 <b>Your journey begins now.</b> Are you ready to face the unknown? Let's get started!"
-        )
+        sent_message = await media.reply_photo(message, "welcome")
 
-        # Send the message word by word with a delay
-        message_text = ""
-        for word in typing_text.split():
-            message_text += word + " "
-            await sent_message.edit_caption(message_text, parse_mode=ParseMode.HTML)
-            await asyncio.sleep(0.3)  # Typing delay
+        # Type out the welcome text in a few frames
+        await animator.type_out(user_id, sent_message, START_MESSAGE, caption=True, parse_mode=ParseMode.HTML)
 
         # Once the text is fully typed, send the "Explore" button
         keyboard = [
             [InlineKeyboardButton("🌿 Explore", callback_data="explore")]
         ]
-        await sent_message.reply_text(
+        await reply(sent_message,
             "What will you do next?",
             reply_markup=InlineKeyboardMarkup(keyboard)
         )
 
 @error_handler_decorator
-async def start_adventure(query: CallbackQuery):
+async def start_adventure(_, query: CallbackQuery):
     """Handles the start of the adventure with a typing effect."""
     
     # Text to simulate typing effect
@@ -97,33 +89,34 @@ async def start_adventure(query: CallbackQuery):
         "Are", "you", "ready", "to", "survive?", "🏝️"
     ]
 
-    message = ""
-
-    # Send the message word by word with a delay
-    for word in typing_text:
-        message += word + " "
-        await query.message.edit_text(message, parse_mode=ParseMode.HTML)
-        await asyncio.sleep(0.3)  # Typing delay
+    await animator.type_out(query.from_user.id, query.message, " ".join(typing_text), parse_mode=ParseMode.HTML)
 
     # After typing is done, send the image and the Explore button
     keyboard = [
         [InlineKeyboardButton("🌿 Explore", callback_data="explore")]
     ]
-    await query.message.reply_photo(
-        photo='https://files.catbox.moe/3gbv36.jpg',
+    await media.reply_photo(query.message, "adventure_start",
         caption="Welcome to your adventure... The island awaits!",
         reply_markup=InlineKeyboardMarkup(keyboard)
     )
 
+async def cancel_animation(_, update):
+    """A new command or button press finishes the user's running animation at once."""
+    if update.from_user:
+        animator.cancel(update.from_user.id)
+
 @error_handler_decorator
-async def show_settings(query: CallbackQuery):
+async def show_settings(_, query: CallbackQuery):
     """Displays settings options (currently just a placeholder)."""
     # Just a basic settings message with no options for now
-    await query.message.edit_text(SETTINGS_MESSAGE, parse_mode=ParseMode.HTML)
+    await edit_text(query.message, SETTINGS_MESSAGE, parse_mode=ParseMode.HTML)
 
 # Register handlers
 def register(app: Client):
+    # Group -1 runs before the command handlers and lets the update through to them
+    app.add_handler(MessageHandler(cancel_animation, filters.regex(r"^/")), group=-1)
+    app.add_handler(CallbackQueryHandler(cancel_animation), group=-1)
     app.add_handler(MessageHandler(start, filters.command("start")))
-    app.add_handler(CallbackQueryHandler(start_adventure, filters.regex('^start_adventure$')))
-    app.add_handler(CallbackQueryHandler(show_settings, filters.regex('^settings$')))
-    app.add_handler(CallbackQueryHandler(explore, filters.regex('^explore$')))  # Add the explore handler
+    router.add("start_adventure", start_adventure)
+    router.add("settings", show_settings)
+    router.add("explore", explore_button)
@@ -2,6 +2,14 @@ import asyncio
 import logging
 from pyrogram import idle
 from client import app, setup_mongo  # Import client and MongoDB setup
+from config import STORAGE_BACKEND
+from utils.db_utils import ensure_indexes, shutdown_db_executor, start_write_behind, stop_write_behind
+from utils.game_data import get_game_data
+from utils.loot import get_loot_tables
+from utils.callback_router import router
+from utils.job_scheduler import jobs
+from utils.media import media
+from utils.outbound import outbound
 from handlers import (
     start_handler,
     inventory_handler,
@@ -37,7 +45,13 @@ async def on_startup():
     This function runs tasks needed during bot startup.
     """
     logger.info("Executing bot startup tasks...")
+    get_game_data()  # Parse the static data files once, before the first update arrives
+    get_loot_tables()  # Compile the per-location loot tables for the live config
     await fetch_bot_id()  # Ensure bot's ID is fetched before starting handlers
+    start_write_behind()  # Batch player saves in the background
+    outbound.start()  # Pace replies and edits per chat and overall
+    media.load()  # Reuse file_ids of media uploaded by earlier runs
+    jobs.start(app)  # Deferred deletions and follow-ups, restored from JOBS_FILE if set
     logger.info("Bot startup tasks completed successfully.")
 
 def register_handlers(app):
@@ -51,6 +65,7 @@ def register_handlers(app):
         inventory_handler.register(app)  # Register inventory handler
         dev_handler.register(app)
         callback_handler.register(app)
+        router.install(app)  # One CallbackQueryHandler dispatching every route the modules added
         logger.info("Handlers registered successfully.")
     except Exception as e:
         logger.error("Error while registering handlers.", exc_info=True)
@@ -66,10 +81,14 @@ async def run_bot():
     loop = asyncio.get_event_loop()
     loop.set_exception_handler(global_exception_handler)
 
-    # Setup MongoDB connection
-    logger.info("Setting up MongoDB...")
-    setup_mongo()
-    logger.info("MongoDB setup completed.")
+    # Setup MongoDB connection (skipped when running on a local storage backend)
+    if STORAGE_BACKEND == "mongo":
+        logger.info("Setting up MongoDB...")
+        setup_mongo()
+        logger.info("MongoDB setup completed.")
+    else:
+        logger.info(f"Using local {STORAGE_BACKEND} storage backend.")
+    await ensure_indexes()
 
     try:
         async with app:  # Start the bot context here
@@ -77,12 +96,16 @@ async def run_bot():
             register_handlers(app)  # Register handlers after bot ID is fetched
             logger.info("Bot is now running.")
             await idle()  # Keeps the bot running
+            await jobs.stop()  # Persist pending jobs before the queue they send through stops
+            await outbound.stop()  # Let queued replies go out while the client is still connected
     except KeyboardInterrupt:
         logger.warning("Bot stopped manually.")
     except Exception as e:
         logger.critical("Critical error occurred during bot startup.", exc_info=True)
     finally:
         logger.info("Shutting down bot...")
+        await stop_write_behind()  # Flush buffered player saves before the pool goes away
+        shutdown_db_executor()
         asyncio.get_event_loop().stop()
 
 def main():
@@ -1,22 +1,44 @@
-from typing import List, Dict, Optional
+from typing import Any, Iterable, Dict, Optional, Tuple
+import copy
 import json
 import os
+import time
+from config import DATA_DIR, INVENTORY_DEBUG_CHECKS
+from utils.game_data import get_game_data
+from utils.item_catalog import compact_inventory
+from utils.progression import ProgressionTable, get_progression
+from utils import regeneration
 
 class Player:
     _default_config = {
-        "base_health": 60,
-        "base_stamina": 50,
-        "health_per_level": 10,
-        "stamina_per_level": 3,
-        "xp_multiplier": 1.5,
-        "xp_per_item": 2,
-        "xp_per_encounter": 5,
-        "level_cap": 10,
+        "max_health": {
+            "base": 60,
+            "per_level": 10
+        },
+        "max_stamina": {
+            "base": 50,
+            "per_level": 3
+        },
+        "xp_gain": {
+            "per_item": 2,
+            "per_encounter": 5,
+            "level_multiplier": 1.5
+        },
+        "level_requirements": {
+            "xp_per_level": 100,
+            "xp_increment_per_level": 50,
+            "level_cap": 10
+        },
         "biome_effects": {
-            "beach": 0,
-            "mountain": 5,
-            "caves": -5,
-            "desert": -10,
+            "beach": {"stamina_bonus": 0, "health_recovery_bonus": 5},
+            "mountain": {"stamina_bonus": 5, "health_recovery_bonus": 5},
+            "caves": {"stamina_penalty": -5, "health_recovery_penalty": -5},
+            "desert": {"stamina_penalty": -10, "health_recovery_penalty": -10},
+        },
+        "regeneration": {
+            "stamina_per_hour": 30,
+            "health_per_hour": 20,
+            "rest_multiplier": 10
         },
         "endurance_effects": {
             "low_stamina_penalty": {
@@ -42,11 +64,15 @@ class Player:
         experience: int = 0,
         location: str = "Beach",
         stats: Optional[Dict[str, int]] = None,
-        inventory: Optional[List[Dict]] = None,
+        inventory: Optional[Dict[str, int]] = None,
         exploration_progress: int = 0,
         started_adventure: bool = False,
         arc_type: Optional[str] = None,
-        config_path: str = '/workspaces/island_gamebot/data/config.json'
+        config_path: Optional[str] = None,
+        state_version: int = 0,
+        last_updated: Optional[float] = None,
+        resting: bool = False,
+        regen_carry: Optional[Dict[str, float]] = None
     ):
         # Basic Attributes
         self.user_id = user_id
@@ -57,18 +83,54 @@ class Player:
         self.exploration_progress = exploration_progress
         self.started_adventure = started_adventure
         self.arc_type = arc_type
+        # Bumped on every save; rendered cards are cached per version
+        self.state_version = state_version
+
+        # Regeneration is worked out from the time since last_updated when the player is loaded
+        self.last_updated = last_updated if last_updated is not None else time.time()
+        self.resting = resting
+        self.regen_carry = regen_carry if regen_carry is not None else {}
 
-        # Inventory
-        self.inventory = inventory if inventory is not None else []
+        # Inventory: item id -> count, item definitions live in the item catalog.
+        # Change it through add_item/remove_item/clear_inventory so the running totals stay right.
+        self.inventory = inventory if inventory is not None else {}
+        self._item_count = 0
+        self._used_space = 0
+        self._space_table: Optional[dict] = None
 
-        # Load configuration
-        self.config = self._load_config(config_path)
+        # Configuration: None follows the live shared config, see the config property
+        self._config = self._load_config(config_path)
+        self._progression: Optional[ProgressionTable] = None
 
         # Initialize stats
         self.stats = stats if stats else self._initialize_stats()
 
-    def _load_config(self, config_path: str) -> dict:
-        """Load the configuration from a JSON file or use a default config."""
+        # Last state known to be in the database (None until loaded or saved)
+        self._saved_state: Optional[Dict] = None
+
+    @property
+    def config(self) -> dict:
+        """Config of this player; the shared one is re-read so dev changes apply immediately."""
+        return self._config if self._config is not None else get_game_data().config
+
+    @property
+    def progression(self) -> ProgressionTable:
+        """Level table for this player's config, shared per config version."""
+        if self._config is None:
+            return get_progression()
+        if self._progression is None:
+            self._progression = ProgressionTable(self._config)
+        return self._progression
+
+    def _load_config(self, config_path: Optional[str]) -> Optional[dict]:
+        """Return None to use the shared game config, else a specific JSON file or the default config."""
+        if config_path is None:
+            try:
+                get_game_data()
+                return None
+            except (OSError, ValueError) as e:
+                print(f"Warning: Game data could not be loaded from {DATA_DIR}: {e}. Using default configuration.")
+                return self._default_config
         if not os.path.exists(config_path):
             print(f"Warning: Config file not found: {config_path}. Using default configuration.")
             return self._default_config
@@ -80,17 +142,14 @@ class Player:
             return self._default_config
 
     def _initialize_stats(self) -> Dict[str, int]:
-        """Initialize player stats dynamically based on level and configuration."""
-        base_health = self.config.get("base_health", 60)
-        base_stamina = self.config.get("base_stamina", 50)
-        health_per_level = self.config.get("health_per_level", 10)
-        stamina_per_level = self.config.get("stamina_per_level", 3)
-
+        """Initialize player stats from the progression table for the current level."""
+        max_health = self.progression.max_health(self.level)
+        max_stamina = self.progression.max_stamina(self.level)
         return {
-            "health": base_health + (self.level * health_per_level),
-            "max_health": base_health + (self.level * health_per_level),
-            "stamina": base_stamina + (self.level * stamina_per_level),
-            "max_stamina": base_stamina + (self.level * stamina_per_level),
+            "health": max_health,
+            "max_health": max_health,
+            "stamina": max_stamina,
+            "max_stamina": max_stamina,
         }
 
     @property
@@ -114,42 +173,64 @@ class Player:
         return max(min_value, min(value, max_value))
     
     def change_location(self, new_location: str):
-        """Change the player's location and apply the new biome effects."""
+        """Change the player's location; time spent so far regenerates at the old biome's rates."""
         if new_location != self.location:
             print(f"{self.name} is moving to {new_location}.")
+            self.regenerate()
             self.location = new_location
-            self.apply_biome_effect()
+
+    def regenerate(self, now: Optional[float] = None) -> bool:
+        """Apply the stamina and health regained since last_updated. Returns whether any stat changed."""
+        state = {
+            "stats": self.stats,
+            "location": self.location,
+            "resting": self.resting,
+            "last_updated": self.last_updated,
+            "regen_carry": self.regen_carry,
+        }
+        changed = regeneration.regenerate(state, self.config, now)
+        self.last_updated = state["last_updated"]
+        self.regen_carry = state["regen_carry"]
+        return changed
+
+    def regen_rates(self) -> Dict[str, float]:
+        """Stamina and health regained per hour right now."""
+        return regeneration.regen_rates(self.location, self.config, self.resting, regeneration.is_low_health(self.stats))
+
+    def set_resting(self, resting: bool):
+        """Start or stop resting; regeneration up to now is settled at the old rate first."""
+        if resting != self.resting:
+            self.regenerate()
+            self.resting = resting
 
     def gain_experience(self, amount: int):
-        """Add experience to the player and handle leveling up."""
-        self.experience += amount
-        max_xp = self.get_max_experience()
-        while self.experience >= max_xp:
-            self.experience -= max_xp
-            self.level_up()
-            max_xp = self.get_max_experience()  # Recalculate max XP for the new level
+        """Add experience, applying every level-up it earns in one table lookup."""
+        old_level = self.level
+        self.level, self.experience = self.progression.apply_experience(self.level, self.experience, amount)
+        if self.level != old_level:
+            self._apply_level_stats()
+            print(f"{self.name} leveled up to level {self.level}!")
 
     def get_max_experience(self) -> int:
-        """Calculate the maximum experience for the current level."""
-        # Increase XP requirement per level more steeply to make leveling harder
-        multiplier = self.config.get("xp_multiplier", 2.0)  # Hardcore survival: steeper multiplier
-        base_xp = 100  # Base XP for level 1
-        return int(base_xp * (self.level ** multiplier))  # Exponentially increasing XP requirement
+        """XP needed to reach the next level (0 at the level cap)."""
+        return self.progression.xp_to_next(self.level)
 
     def level_up(self):
-        """Increase the player's level and update stats."""
-        if self.level >= self.config.get("level_cap", 20):  # Increased level cap for hardcore survival
+        """Increase the player's level by one and update stats."""
+        if self.level >= self.progression.level_cap:
             print(f"{self.name} has reached the level cap!")
             return
 
         self.level += 1
-        # Increase stats more aggressively per level
-        self.stats["max_health"] += self.config.get("health_per_level")  # More health per level
-        self.stats["max_stamina"] += self.config.get("stamina_per_level")  # More stamina per level
-        self.health = self.stats["max_health"]
-        self.stamina = self.stats["max_stamina"]
+        self._apply_level_stats()
         print(f"{self.name} leveled up to level {self.level}!")
 
+    def _apply_level_stats(self):
+        """Set max health/stamina for the current level and refill both."""
+        self.stats["max_health"] = self.progression.max_health(self.level)
+        self.stats["max_stamina"] = self.progression.max_stamina(self.level)
+        self.health = self.stats["max_health"]
+        self.stamina = self.stats["max_stamina"]
 
     def take_damage(self, amount: int):
         """Reduce health by the damage amount."""
@@ -167,18 +248,82 @@ class Player:
         if self.stamina == 0:
             print(f"{self.name} is exhausted!")
 
+    def _item_space(self, item_id: str, space_table: dict) -> int:
+        """Space one unit of an item takes, by its catalog type (common if unknown)."""
+        try:
+            item = get_game_data().catalog.get(item_id)
+        except (OSError, ValueError):
+            item = None
+        item_type = item.get("type", "common") if item else "common"
+        return space_table.get(item_type, 5)
+
+    def _recount_inventory(self) -> Tuple[int, int]:
+        """(item count, used space) summed over the whole inventory: the slow path."""
+        space_table = self.config.get("space_per_item", {})
+        count = sum(self.inventory.values())
+        used = sum(self._item_space(item_id, space_table) * held for item_id, held in self.inventory.items())
+        return count, used
+
+    def _refresh_totals(self):
+        """Recount when first needed or when space_per_item changed in a new config version."""
+        space_table = self.config.get("space_per_item", {})
+        if self._space_table is not space_table:
+            self._item_count, self._used_space = self._recount_inventory()
+            self._space_table = space_table
+
+    def _check_totals(self):
+        if INVENTORY_DEBUG_CHECKS:
+            expected = self._recount_inventory()
+            if expected != (self._item_count, self._used_space):
+                raise AssertionError(
+                    f"Inventory totals of {self.user_id} drifted: running (count, space) "
+                    f"{(self._item_count, self._used_space)} != recount {expected}"
+                )
+
+    def add_item(self, item_id: str, count: int = 1):
+        """Add `count` units of an item to the inventory."""
+        self._refresh_totals()
+        self.inventory[item_id] = self.inventory.get(item_id, 0) + count
+        self._item_count += count
+        self._used_space += self._item_space(item_id, self._space_table) * count
+        self._check_totals()
+
+    def remove_item(self, item_id: str, count: int = 1) -> bool:
+        """Remove `count` units of an item. Returns False if the player has fewer than that."""
+        held = self.inventory.get(item_id, 0)
+        if held < count:
+            return False
+        self._refresh_totals()
+        if held == count:
+            del self.inventory[item_id]
+        else:
+            self.inventory[item_id] = held - count
+        self._item_count -= count
+        self._used_space -= self._item_space(item_id, self._space_table) * count
+        self._check_totals()
+        return True
+
+    def clear_inventory(self):
+        """Drop every item (e.g. on death)."""
+        self.inventory.clear()
+        self._item_count = self._used_space = 0
+        self._space_table = self.config.get("space_per_item", {})
+
+    def item_count(self) -> int:
+        """Total number of item units carried."""
+        self._refresh_totals()
+        return self._item_count
+
+    @property
+    def used_space(self) -> int:
+        """Inventory space taken, by space_per_item of each item's type."""
+        self._refresh_totals()
+        return self._used_space
+
     def heal(self, amount: int):
         """Heal the player by a specific amount."""
         self.health += amount
 
-    def apply_biome_effect(self):
-        """Apply biome effects to the player based on their location."""
-        biome = self.location.lower()
-        biome_effect = self.config["biome_effects"].get(biome, 0)
-        self.stats["max_stamina"] += biome_effect
-        self.stamina = self.stats["max_stamina"]
-        print(f"Biome effect applied: {biome}.")
-
     def apply_endurance_penalties(self):
         """Apply penalties based on stamina and health levels."""
         if self.stamina < self.stats["max_stamina"] * 0.2:
@@ -204,8 +349,72 @@ class Player:
             "exploration_progress": self.exploration_progress,
             "started_adventure": self.started_adventure,
             "arc_type": self.arc_type,
+            "state_version": self.state_version,
+            "last_updated": self.last_updated,
+            "resting": self.resting,
+            "regen_carry": self.regen_carry,
         }
 
+    @property
+    def is_new(self) -> bool:
+        """True for a player created in memory that was never loaded from or written to the database."""
+        return self._saved_state is None
+
+    def mark_saved(self, state: Optional[Dict] = None):
+        """Record `state` (default: the current state) as what the database holds."""
+        self._saved_state = state if state is not None else copy.deepcopy(self.to_dict())
+
+    def get_changes(self) -> Tuple[Dict[str, Any], Dict]:
+        """
+        Build the smallest Mongo update document for what changed since the last save.
+
+        Returns the update document (empty when nothing changed, or when only
+        the regeneration clock moved) and the state it was computed from; pass
+        that state to mark_saved() once the write succeeded.
+        """
+        state = copy.deepcopy(self.to_dict())
+        saved = self._saved_state
+        if saved is None:
+            return {"$set": state}, state
+
+        set_fields: Dict[str, Any] = {}
+        unset_fields: Dict[str, str] = {}
+        for field, value in state.items():
+            old_value = saved.get(field)
+            if field == "stats" and isinstance(value, dict) and isinstance(old_value, dict):
+                for key, stat in value.items():
+                    if old_value.get(key) != stat:
+                        set_fields[f"stats.{key}"] = stat
+                for key in old_value.keys() - value.keys():
+                    unset_fields[f"stats.{key}"] = ""
+            elif field == "inventory" and isinstance(value, dict) and isinstance(old_value, dict):
+                self._diff_inventory(old_value, value, set_fields, unset_fields)
+            elif old_value != value:
+                set_fields[field] = value
+
+        if not unset_fields and set_fields.keys() <= set(regeneration.CLOCK_FIELDS):
+            return {}, state  # Only the regeneration clock moved
+        update: Dict[str, Any] = {}
+        if set_fields:
+            update["$set"] = set_fields
+        if unset_fields:
+            update["$unset"] = unset_fields
+        return update, state
+
+    @staticmethod
+    def _diff_inventory(old: Dict[str, int], new: Dict[str, int], set_fields: Dict, unset_fields: Dict):
+        """
+        Express an inventory change as $set of each changed count, dropping items that ran out.
+
+        Absolute counts rather than $inc deltas, so an update applied twice (a
+        retried batch, overlapping saves) leaves the same inventory.
+        """
+        for item_id, count in new.items():
+            if count != old.get(item_id):
+                set_fields[f"inventory.{item_id}"] = count
+        for item_id in old.keys() - new.keys():
+            unset_fields[f"inventory.{item_id}"] = ""
+
     def save_to_json(self, file_path: str):
         """Save the player object to a JSON file."""
         try:
@@ -215,24 +424,41 @@ class Player:
             print(f"Error saving player data: {e}")
 
     @classmethod
-    def from_dict(cls, data: Dict, config_path: str = '/workspaces/island_gamebot/data/config.json') -> "Player":
+    def from_dict(cls, data: Dict, config_path: Optional[str] = None) -> "Player":
         """Create a Player object from a dictionary."""
-        return cls(
+        inventory = data.get("inventory", {})
+        # Online migration: documents from before item ids stored one dict per unit
+        migrated = isinstance(inventory, list)
+        if migrated:
+            inventory = compact_inventory(inventory)
+
+        player = cls(
             user_id=data["user_id"],
             name=data["name"],
             level=data.get("level", 1),
             experience=data.get("experience", 0),
             stats=data.get("stats", {}),
-            inventory=data.get("inventory", []),
+            inventory=inventory,
             location=data.get("location"),
             exploration_progress=data.get("exploration_progress", 0),
             started_adventure=data.get("started_adventure", False),
             arc_type=data.get("arc_type"),
-            config_path=config_path
+            config_path=config_path,
+            state_version=data.get("state_version", 0),
+            last_updated=data.get("last_updated"),
+            resting=data.get("resting", False),
+            regen_carry=data.get("regen_carry")
         )
+        # Fields missing from the stored document (or migrated) are left out so the next save writes them
+        state = player.to_dict()
+        stored = {field: value for field, value in state.items() if field in data}
+        if migrated:
+            stored.pop("inventory")
+        player.mark_saved(copy.deepcopy(stored))
+        return player
 
     @classmethod
-    def load_from_json(cls, file_path: str, config_path: str = '/workspaces/island_gamebot/data/config.json') -> "Player":
+    def load_from_json(cls, file_path: str, config_path: Optional[str] = None) -> "Player":
         """Load a Player object from a JSON file."""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Player file not found: {file_path}")
@@ -242,3 +468,43 @@ class Player:
             return cls.from_dict(data, config_path)
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse player file: {e}")
+
+
+class PlayerView:
+    """
+    Read-only subset of a player's fields, as returned by a projected load.
+
+    Only the requested fields are available; reading any other attribute raises
+    AttributeError so a handler that forgot to declare a field fails loudly.
+    """
+    __slots__ = ("_fields",)
+
+    def __init__(self, fields: Dict[str, Any]):
+        object.__setattr__(self, "_fields", fields)
+
+    def __getattr__(self, name: str):
+        try:
+            return self._fields[name]
+        except KeyError:
+            raise AttributeError(f"Field '{name}' was not loaded for this player view") from None
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError("PlayerView is read-only; load the full Player to modify it")
+
+    @classmethod
+    def from_player(cls, player: Player, fields: Iterable[str]) -> "PlayerView":
+        """
+        Build a view over an already loaded Player without touching the database.
+
+        Dict and list fields (stats, inventory) are copied, so the view neither
+        changes nor follows the state of a cached or not yet written Player.
+        """
+        view_fields = {}
+        for field in fields:
+            value = getattr(player, field)
+            if isinstance(value, dict):
+                value = dict(value)
+            elif isinstance(value, list):
+                value = list(value)
+            view_fields[field] = value
+        return cls(view_fields)
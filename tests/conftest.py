@@ -0,0 +1,10 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules under test read the game data from DATA_DIR at import/first use
+os.environ.setdefault("DATA_DIR", os.path.join(ROOT, "data"))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("WRITE_BEHIND_ENABLED", "false")
+sys.path.insert(0, ROOT)
@@ -0,0 +1,111 @@
+import asyncio
+import pytest
+
+pytest.importorskip("pyrogram")
+
+from utils.callback_router import EXPIRED_MESSAGE, MAX_DATA_BYTES, CallbackRouter
+
+
+async def handler(client, query, *args):
+    query.handled = args
+
+
+async def failing(client, query, *args):
+    raise RuntimeError("boom")
+
+
+class FakeUser:
+    id = 1
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+        self.from_user = FakeUser()
+        self.handled = None
+        self.answers = []
+
+    async def answer(self, text=None, **kwargs):
+        self.answers.append(text)
+
+
+@pytest.fixture
+def router():
+    router = CallbackRouter()
+    router.add("settings", handler)
+    router.add("use_item", handler, str)
+    router.add("dev_page", handler, str, int)
+    router.add("command", handler, int)
+    router.add_legacy("use_item_", "use_item")
+    router.add_legacy("dev_", "dev_page")
+    router.add_legacy("command_", "command")
+    return router
+
+
+def args_of(router, data):
+    resolved = router.resolve(data)
+    return None if resolved is None else (resolved[0].name, resolved[1])
+
+
+def test_routes_with_typed_arguments(router):
+    assert args_of(router, "settings") == ("settings", ())
+    assert args_of(router, "dev_page:next:42") == ("dev_page", ("next", 42))
+    assert args_of(router, "command:7") == ("command", (7,))
+
+
+def test_last_argument_keeps_separators(router):
+    assert args_of(router, "use_item:a:b") == ("use_item", ("a:b",))
+
+
+def test_legacy_prefixes(router):
+    assert args_of(router, "command_3") == ("command", (3,))
+    assert args_of(router, "dev_next_42") == ("dev_page", ("next", 42))
+    assert args_of(router, "use_item_iron_ore") == ("use_item", ("iron_ore",))
+
+
+def test_longest_legacy_prefix_wins(router):
+    router.add("command_list", handler)
+    router.add_legacy("command_list", "command_list")
+    assert args_of(router, "command_list") == ("command_list", ())
+    assert args_of(router, "command_4") == ("command", (4,))
+
+
+def test_unmatched_and_invalid_data_are_counted(router):
+    assert router.resolve("nothing_here") is None
+    assert router.resolve("command:x") is None
+    assert router.resolve("dev_page:next") is None
+    assert router.resolve("settings:extra") is None
+    assert (router.unmatched, router.invalid) == (1, 3)
+
+
+def test_data_builds_and_checks_length(router):
+    assert router.data("dev_page", "next", 42) == "dev_page:next:42"
+    assert args_of(router, router.data("use_item", "fish")) == ("use_item", ("fish",))
+    with pytest.raises(KeyError):
+        router.data("missing")
+    with pytest.raises(ValueError):
+        router.data("use_item", "x" * MAX_DATA_BYTES)
+
+
+def test_add_rejects_bad_names(router):
+    with pytest.raises(ValueError):
+        router.add("settings", handler)
+    with pytest.raises(ValueError):
+        router.add("a:b", handler)
+
+
+def test_dispatch_runs_route_and_answers_expired_buttons(router):
+    query = FakeQuery("command_5")
+    asyncio.run(router.dispatch(None, query))
+    assert query.handled == (5,)
+    assert router.stats()["command"].startswith("1 calls, 0 errors")
+
+    expired = FakeQuery("gone")
+    asyncio.run(router.dispatch(None, expired))
+    assert expired.answers == [EXPIRED_MESSAGE]
+
+
+def test_dispatch_counts_handler_errors(router):
+    router.add("broken", failing)
+    asyncio.run(router.dispatch(None, FakeQuery("broken")))
+    assert router.stats()["broken"].startswith("1 calls, 1 errors")
@@ -0,0 +1,63 @@
+import random
+from collections import Counter
+import pytest
+from utils.item_catalog import ItemCatalog
+from utils.loot import AliasTable, LootTables, item_weight
+
+DRAWS = 100_000
+
+
+def frequencies(table: AliasTable, seed: int = 7) -> Counter:
+    return Counter(table.sample_many(DRAWS, random.Random(seed)))
+
+
+def test_draw_frequencies_follow_weights():
+    weights = [5, 3, 1, 1]
+    table = AliasTable(["a", "b", "c", "d"], weights)
+    counts = frequencies(table)
+    for outcome, weight in zip(table.outcomes, weights):
+        assert counts[outcome] / DRAWS == pytest.approx(weight / sum(weights), abs=0.01)
+
+
+def test_sample_matches_sample_many():
+    table = AliasTable(["a", "b", "c"], [1, 2, 7])
+    rng = random.Random(3)
+    assert [table.sample(rng) for _ in range(50)] == table.sample_many(50, random.Random(3))
+
+
+def test_zero_weight_is_never_drawn():
+    table = AliasTable(["a", "b", "c"], [1, 0, 1])
+    assert "b" not in frequencies(table)
+
+
+def test_single_outcome():
+    table = AliasTable(["only"], [2.5])
+    assert table.probabilities == (1.0,)
+    assert set(table.sample_many(100)) == {"only"}
+
+
+@pytest.mark.parametrize("outcomes, weights", [([], []), (["a"], [1, 2]), (["a", "b"], [0, 0]), (["a", "b"], [1, -1])])
+def test_invalid_tables(outcomes, weights):
+    with pytest.raises(ValueError):
+        AliasTable(outcomes, weights)
+
+
+def test_item_weight_prefers_drop_weight():
+    rarity_weights = {"common": 4, "rare": 1}
+    assert item_weight({"type": "rare", "drop_weight": 9}, rarity_weights) == 9
+    assert item_weight({"type": "rare"}, rarity_weights) == 1
+    assert item_weight({"type": "legendary"}, rarity_weights) == 4
+
+
+def test_loot_tables_per_location():
+    catalog = ItemCatalog([
+        {"id": "fish", "name": "Fish", "type": "common", "location": "Beach"},
+        {"id": "pearl", "name": "Pearl", "type": "rare", "location": "Beach"},
+        {"id": "ghost", "name": "Ghost", "type": "rare", "location": "Beach", "drop_weight": 0},
+        {"id": "moss", "name": "Moss", "type": "common", "location": "Forest"},
+    ])
+    tables = LootTables(catalog, {"loot": {"rarity_weights": {"common": 3, "rare": 1}}})
+    assert tables.drop_rates("BEACH") == {"Fish": 0.75, "Pearl": 0.25}
+    assert tables.drop_rates("forest") == {"Moss": 1.0}
+    assert tables.for_location("cave") is None
+    assert tables.drop_rates("cave") == {}
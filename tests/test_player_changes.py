@@ -0,0 +1,106 @@
+import copy
+import pytest
+from models.player import Player
+
+
+def saved_player(**kwargs) -> Player:
+    player = Player(user_id=1, name="Tester", last_updated=1000.0, **kwargs)
+    player.mark_saved()
+    return player
+
+
+def apply(document, update):
+    """Apply an update the way the storage backends do."""
+    storage_backends = pytest.importorskip("utils.storage_backends")
+    return storage_backends.apply_update(document, update)
+
+
+def test_new_player_sets_whole_document():
+    player = Player(user_id=1, name="Tester")
+    update, state = player.get_changes()
+    assert update == {"$set": state}
+    assert player.is_new
+
+
+def test_no_changes_gives_empty_update():
+    player = saved_player()
+    update, _ = player.get_changes()
+    assert update == {}
+
+
+def test_clock_only_change_is_not_written():
+    player = saved_player(stats={"health": 10, "max_health": 10, "stamina": 5, "max_stamina": 5})
+    player.last_updated = 5000.0
+    player.regen_carry = {"stamina": 0.5}
+    update, _ = player.get_changes()
+    assert update == {}
+
+
+def test_clock_goes_out_with_a_real_change():
+    player = saved_player()
+    player.last_updated = 5000.0
+    player.location = "Forest"
+    update, _ = player.get_changes()
+    assert update == {"$set": {"last_updated": 5000.0, "location": "Forest"}}
+
+
+def test_stats_are_set_per_key():
+    player = saved_player(stats={"health": 10, "max_health": 10, "stamina": 5, "max_stamina": 5})
+    player.stats["stamina"] = 3
+    update, _ = player.get_changes()
+    assert update == {"$set": {"stats.stamina": 3}}
+
+
+def test_inventory_diff_sets_counts_and_unsets_removed_items():
+    player = saved_player(inventory={"fish": 2, "clam": 1})
+    player.add_item("fish", 3)
+    player.remove_item("clam")
+    player.add_item("seaweed")
+    update, _ = player.get_changes()
+    assert update == {
+        "$set": {"inventory.fish": 5, "inventory.seaweed": 1},
+        "$unset": {"inventory.clam": ""},
+    }
+
+
+def test_diff_inventory_without_changes_adds_nothing():
+    set_fields, unset_fields = {}, {}
+    Player._diff_inventory({"fish": 2}, {"fish": 2}, set_fields, unset_fields)
+    assert set_fields == {} and unset_fields == {}
+
+
+def test_mark_saved_with_returned_state():
+    player = saved_player()
+    player.add_item("fish")
+    update, state = player.get_changes()
+    assert update
+    player.mark_saved(state)
+    assert player.get_changes()[0] == {}
+
+
+def test_update_applied_twice_gives_same_document():
+    player = saved_player(inventory={"fish": 2, "clam": 1})
+    document = copy.deepcopy(player.to_dict())
+    player.add_item("fish")
+    player.remove_item("clam")
+    update, _ = player.get_changes()
+
+    apply(document, update)
+    apply(document, update)
+    assert document["inventory"] == {"fish": 3}
+
+
+def test_overlapping_saves_do_not_double_count():
+    # A second save computed before the first one is marked saved repeats its changes
+    player = saved_player(inventory={"fish": 1})
+    document = copy.deepcopy(player.to_dict())
+    player.add_item("fish")
+    first, _ = player.get_changes()
+    player.add_item("seaweed")
+    second, state = player.get_changes()
+
+    apply(document, first)
+    apply(document, second)
+    player.mark_saved(state)
+    assert document["inventory"] == {"fish": 2, "seaweed": 1}
+    assert document["inventory"] == player.inventory
@@ -0,0 +1,52 @@
+from utils.progression import ProgressionTable
+
+CONFIG = {
+    "level_requirements": {"xp_per_level": 100, "xp_increment_per_level": 50, "level_cap": 5},
+    "max_health": {"base": 60, "per_level": 10},
+    "max_stamina": {"base": 50, "per_level": 3},
+}
+
+
+def table() -> ProgressionTable:
+    return ProgressionTable(CONFIG)
+
+
+def test_xp_to_next_and_cumulative_totals():
+    progression = table()
+    assert [progression.xp_to_next(level) for level in range(1, 6)] == [100, 150, 200, 250, 0]
+    assert [progression.total_xp(level) for level in range(1, 6)] == [0, 100, 250, 450, 700]
+
+
+def test_levels_outside_the_table_are_clamped():
+    progression = table()
+    assert progression.max_health(0) == progression.max_health(1) == 60
+    assert progression.max_stamina(99) == progression.max_stamina(5) == 62
+    assert progression.total_xp(99) == 700
+
+
+def test_just_short_of_a_level():
+    assert table().apply_experience(1, 0, 99) == (1, 99)
+
+
+def test_exactly_on_a_level_boundary():
+    assert table().apply_experience(1, 0, 100) == (2, 0)
+    assert table().apply_experience(2, 50, 100) == (3, 0)
+
+
+def test_several_levels_at_once():
+    assert table().apply_experience(1, 10, 500) == (4, 60)
+
+
+def test_reaching_the_cap_keeps_the_rest():
+    assert table().apply_experience(1, 0, 800) == (5, 100)
+
+
+def test_at_the_cap_xp_accumulates():
+    assert table().apply_experience(5, 100, 40) == (5, 140)
+
+
+def test_defaults_without_config():
+    progression = ProgressionTable({})
+    assert progression.level_cap == 20
+    assert progression.xp_to_next(1) == progression.xp_to_next(19) == 100
+    assert progression.max_health(1) == 60
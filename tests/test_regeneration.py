@@ -0,0 +1,83 @@
+import pytest
+from utils.regeneration import regen_rates, regenerate, seconds_until_full
+
+CONFIG = {"regeneration": {"stamina_per_hour": 10, "health_per_hour": 6, "rest_multiplier": 3}}
+HOUR = 3600.0
+
+
+def state(health=50, stamina=20, **kwargs):
+    return {
+        "stats": {"health": health, "max_health": 100, "stamina": stamina, "max_stamina": 50},
+        "location": "Beach",
+        "resting": False,
+        "last_updated": 0.0,
+        "regen_carry": {},
+        **kwargs,
+    }
+
+
+def test_regenerates_whole_points_and_carries_fractions():
+    player = state()
+    assert regenerate(player, CONFIG, now=0.25 * HOUR)
+    assert player["stats"]["stamina"] == 22
+    assert player["stats"]["health"] == 51
+    assert player["regen_carry"] == pytest.approx({"stamina": 0.5, "health": 0.5})
+    assert player["last_updated"] == 0.25 * HOUR
+
+
+def test_load_frequency_does_not_change_the_rate():
+    often, once = state(), state()
+    for minute in range(1, 61):
+        regenerate(often, CONFIG, now=minute * 60.0)
+    regenerate(once, CONFIG, now=HOUR)
+    assert often["stats"] == once["stats"] == {"health": 56, "max_health": 100, "stamina": 30, "max_stamina": 50}
+
+
+def test_capped_at_max_and_carry_dropped():
+    player = state(stamina=48, regen_carry={"stamina": 0.9})
+    regenerate(player, CONFIG, now=HOUR)
+    assert player["stats"]["stamina"] == 50
+    assert "stamina" not in player["regen_carry"]
+
+
+def test_full_player_only_moves_the_clock():
+    player = state(health=100, stamina=50, regen_carry={"stamina": 0.3})
+    assert not regenerate(player, CONFIG, now=HOUR)
+    assert player["stats"]["health"] == 100 and player["stats"]["stamina"] == 50
+    assert player["last_updated"] == HOUR
+    assert player["regen_carry"] == {}
+
+
+def test_time_going_backwards_changes_nothing():
+    player = state(last_updated=HOUR)
+    assert not regenerate(player, CONFIG, now=0.0)
+    assert player["stats"]["stamina"] == 20
+
+
+def test_resting_multiplies_both_rates():
+    assert regen_rates("Beach", CONFIG, resting=True, low_health=False) == {"stamina": 30, "health": 18}
+    player = state(resting=True)
+    regenerate(player, CONFIG, now=HOUR)
+    assert player["stats"]["stamina"] == 50
+    assert player["stats"]["health"] == 68
+
+
+def test_biome_and_low_health_effects():
+    config = {
+        **CONFIG,
+        "biome_effects": {"jungle": {"stamina_penalty": -4, "health_recovery_bonus": 2}},
+        "endurance_effects": {"low_health_penalty": {"recovery_rate": -50}},
+    }
+    assert regen_rates("Jungle", config, resting=False, low_health=True) == {"stamina": 6, "health": 4}
+
+
+def test_rates_never_negative():
+    config = {**CONFIG, "biome_effects": {"desert": {"stamina_penalty": -20}}}
+    assert regen_rates("desert", config, resting=False, low_health=False)["stamina"] == 0.0
+
+
+def test_seconds_until_full():
+    stats = {"stamina": 20, "max_stamina": 50}
+    assert seconds_until_full(stats, {"stamina": 10}, {"stamina": 0.5}) == pytest.approx(2.95 * HOUR)
+    assert seconds_until_full({"stamina": 50, "max_stamina": 50}, {"stamina": 10}) == 0.0
+    assert seconds_until_full(stats, {"stamina": 0}) is None
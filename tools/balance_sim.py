@@ -0,0 +1,217 @@
+"""
+Offline Monte Carlo balance simulator for the /explore economy.
+
+Simulates a population of players doing explore/rest sequences under a
+candidate config.json, vectorized over players with NumPy, and reports how
+long reaching the level cap takes, how often players die and how often an
+explore is blocked by a full inventory.
+
+The rules come from utils.exploration_rules (item counts, XP per item,
+exhaustion damage, capacity), utils.progression (XP and stat tables) and
+utils.loot (rarity-weighted drop rates). The per-explore flow mirrors
+adventure_handler.explore: rewards, then stamina cost, then death check,
+then XP. Not modelled: biome and endurance effects, encounters, item use,
+and the time regeneration takes (utils.regeneration).
+
+Player policy, per step:
+  - rest until stamina is back to max when it is below --rest-below
+    (default: the minimum stamina cost);
+  - when the inventory is full the explore is blocked and counted; the
+    player then empties the bag (--keep-full-bags to keep it full instead);
+  - otherwise explore at the location given by --location.
+
+Requires numpy (not needed by the bot itself): pip install -r requirements-dev.txt
+
+Usage:
+  python tools/balance_sim.py [--config data/config.json] [--players 10000]
+                              [--steps 120] [--location Beach] [--seed 1]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("balance_sim needs numpy: pip install -r requirements-dev.txt")
+
+from utils import exploration_rules as rules  # noqa: E402
+from utils.config_utils import freeze  # noqa: E402
+from utils.item_catalog import ItemCatalog  # noqa: E402
+from utils.loot import LootTables  # noqa: E402
+from utils.progression import ProgressionTable  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+class Population:
+    """State of every simulated player, one array element per player."""
+
+    def __init__(self, players: int, table: ProgressionTable):
+        self.level = np.ones(players, dtype=np.int64)
+        self.experience = np.zeros(players)
+        self.max_health = np.full(players, table.max_health(1), dtype=np.int64)
+        self.max_stamina = np.full(players, table.max_stamina(1), dtype=np.int64)
+        self.health = self.max_health.copy()
+        self.stamina = self.max_stamina.copy()
+        self.used_space = np.zeros(players, dtype=np.int64)
+
+        self.explores = np.zeros(players, dtype=np.int64)
+        self.rests = np.zeros(players, dtype=np.int64)
+        self.blocked = np.zeros(players, dtype=np.int64)
+        self.deaths = np.zeros(players, dtype=np.int64)
+        self.explores_to_cap = np.full(players, -1, dtype=np.int64)
+
+
+class Simulator:
+    def __init__(self, config: dict, catalog: ItemCatalog, location: str, rest_below: int,
+                 empty_full_bags: bool, seed: int):
+        self.config = config
+        self.location = location
+        self.rest_below = rest_below
+        self.empty_full_bags = empty_full_bags
+        self.rng = np.random.default_rng(seed)
+
+        self.table = ProgressionTable(config)
+        cap = self.table.level_cap
+        levels = np.arange(cap + 1)
+        # Lookup arrays indexed by level (index 0 unused), as in ProgressionTable
+        self.cumulative_xp = np.array([self.table.total_xp(level) for level in levels], dtype=np.float64)
+        self.max_health = np.array([self.table.max_health(level) for level in levels], dtype=np.int64)
+        self.max_stamina = np.array([self.table.max_stamina(level) for level in levels], dtype=np.int64)
+        self.capacity = np.array([rules.inventory_capacity(level, location, config) for level in levels], dtype=np.int64)
+
+        # Loot is drawn with replacement from the location's rarity-weighted table
+        space_table = config["space_per_item"]
+        loot_table = LootTables(catalog, config).for_location(location)
+        loot = loot_table.outcomes if loot_table else ()
+        self.item_space = np.array([space_table.get(item["type"], 5) for item in loot], dtype=np.int64)
+        self.item_probabilities = np.array(loot_table.probabilities if loot_table else (), dtype=np.float64)
+        weights = np.array(rules.ITEM_COUNT_WEIGHTS, dtype=np.float64)
+        self.count_weights = weights / weights.sum()
+        self.xp_per_item = rules.xp_for_items(1, config)
+        self.stamina_min, self.stamina_max = rules.stamina_cost_range(config)
+
+    def _pick_spaces(self, players: int) -> np.ndarray:
+        """Space of up to 4 items per player, drawn like LootTables sample_many."""
+        slots = len(rules.ITEM_COUNTS)
+        if len(self.item_space) == 0:
+            return np.zeros((players, slots), dtype=np.int64)
+        picks = self.rng.choice(len(self.item_space), size=(players, slots), p=self.item_probabilities)
+        return self.item_space[picks]
+
+    def step(self, pop: Population):
+        players = len(pop.level)
+        cap = self.table.level_cap
+
+        resting = pop.stamina < self.rest_below
+        pop.stamina[resting] = pop.max_stamina[resting]
+        pop.rests += resting
+
+        capacity = self.capacity[pop.level]
+        full = ~resting & (pop.used_space >= capacity)
+        pop.blocked += full
+        if self.empty_full_bags:
+            pop.used_space[full] = 0
+        exploring = ~resting & ~full
+        pop.explores += exploring
+
+        # Rewards: items are picked up one by one until the bag is full
+        wanted = self.rng.choice(rules.ITEM_COUNTS, size=players, p=self.count_weights)
+        if len(self.item_space) == 0:
+            wanted[:] = 0
+        spaces = self._pick_spaces(players)
+        added = np.zeros(players, dtype=np.int64)
+        for slot in range(spaces.shape[1]):
+            takes = exploring & (slot < wanted) & (pop.used_space < capacity)
+            pop.used_space += np.where(takes, spaces[:, slot], 0)
+            added += takes
+
+        # Stamina cost, then exhaustion damage
+        cost = self.rng.integers(self.stamina_min, self.stamina_max + 1, size=players)
+        pop.stamina = np.where(exploring, np.maximum(pop.stamina - cost, 0), pop.stamina)
+        exhausted = exploring & (pop.stamina == 0)
+        low, high = rules.EXHAUSTION_DAMAGE
+        damage = self.rng.integers(low, high + 1, size=players)
+        pop.health = np.where(exhausted, np.maximum(pop.health - damage, 0), pop.health)
+
+        # Death: items lost, health and stamina restored, no XP for this explore
+        dead = exploring & (pop.health <= 0)
+        pop.deaths += dead
+        pop.used_space[dead] = 0
+        pop.health[dead] = pop.max_health[dead]
+        pop.stamina[dead] = pop.max_stamina[dead]
+
+        # XP and level-ups, as ProgressionTable.apply_experience
+        gaining = exploring & ~dead
+        total = self.cumulative_xp[pop.level] + pop.experience + np.where(gaining, added * self.xp_per_item, 0.0)
+        new_level = np.searchsorted(self.cumulative_xp[1:], total, side="right")
+        new_level = np.where(pop.level >= cap, pop.level, np.minimum(new_level, cap))
+        pop.experience = total - self.cumulative_xp[new_level]
+        leveled = new_level > pop.level
+        pop.level = new_level
+        pop.max_health[leveled] = self.max_health[new_level[leveled]]
+        pop.max_stamina[leveled] = self.max_stamina[new_level[leveled]]
+        pop.health[leveled] = pop.max_health[leveled]
+        pop.stamina[leveled] = pop.max_stamina[leveled]
+
+        reached = (pop.level >= cap) & (pop.explores_to_cap < 0)
+        pop.explores_to_cap[reached] = pop.explores[reached]
+
+    def run(self, players: int, steps: int) -> Population:
+        pop = Population(players, self.table)
+        for _ in range(steps):
+            self.step(pop)
+        return pop
+
+
+def report(pop: Population, level_cap: int, elapsed: float):
+    explores = int(pop.explores.sum())
+    attempts = explores + int(pop.blocked.sum())
+    players = len(pop.level)
+    reached = pop.explores_to_cap[pop.explores_to_cap >= 0]
+
+    print(f"simulated {explores:,} explores and {int(pop.rests.sum()):,} rests for {players:,} players "
+          f"in {elapsed:.2f} s ({explores / max(elapsed, 1e-9):,.0f} explores/s)")
+    print(f"level cap {level_cap}: reached by {len(reached) / players:.1%} of players")
+    if len(reached):
+        p10, p50, p90 = np.percentile(reached, [10, 50, 90])
+        print(f"  explores to cap: p10 {p10:.0f}, median {p50:.0f}, p90 {p90:.0f}")
+    levels = np.bincount(pop.level, minlength=level_cap + 1)[1:]
+    print("  final level distribution: " + ", ".join(f"L{level}: {count}" for level, count in enumerate(levels, 1) if count))
+    print(f"deaths: {pop.deaths.sum() / max(explores, 1) * 1000:.2f} per 1k explores, "
+          f"{(pop.deaths > 0).mean():.1%} of players died at least once")
+    print(f"inventory full: {pop.blocked.sum() / max(attempts, 1):.2%} of explore attempts blocked, "
+          f"{(pop.blocked > 0).mean():.1%} of players hit it")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", default=os.path.join(DATA_DIR, "config.json"), help="candidate config.json")
+    parser.add_argument("--items", default=os.path.join(DATA_DIR, "items.json"))
+    parser.add_argument("--players", type=int, default=10_000)
+    parser.add_argument("--steps", type=int, default=120, help="explore/rest decisions per player")
+    parser.add_argument("--location", default="Beach")
+    parser.add_argument("--rest-below", type=int, default=None, help="rest when stamina is below this")
+    parser.add_argument("--keep-full-bags", action="store_true", help="do not empty full inventories")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = json.load(f)
+    with open(args.items) as f:
+        catalog = ItemCatalog(freeze(json.load(f)["items"]))
+
+    rest_below = args.rest_below if args.rest_below is not None else config["stamina_usage"]["min"]
+    simulator = Simulator(config, catalog, args.location, rest_below, not args.keep_full_bags, args.seed)
+    start = time.perf_counter()
+    population = simulator.run(args.players, args.steps)
+    report(population, simulator.table.level_cap, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import re
+from typing import Dict, List, Optional
+from config import ANIMATION_MAX_EDITS, ANIMATION_MAX_SECONDS, ANIMATION_SKIP_DEPTH
+from utils.outbound import edit_caption, edit_text, outbound
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\S+")
+_TAG = re.compile(r"<(/?)(\w+)[^>]*>")
+
+
+def _close_tags(html: str) -> str:
+    """Close the tags a cut-off HTML prefix left open, so Telegram accepts the frame."""
+    open_tags: List[str] = []
+    for closing, tag in _TAG.findall(html):
+        if not closing:
+            open_tags.append(tag)
+        elif tag in open_tags:
+            del open_tags[len(open_tags) - 1 - open_tags[::-1].index(tag)]
+    return html + "".join(f"</{tag}>" for tag in reversed(open_tags))
+
+
+def typing_frames(text: str, frames: int) -> List[str]:
+    """
+    Up to `frames` evenly spaced prefixes of `text`, cut after whole words.
+
+    Line breaks of the final text are kept and the last frame is the full text.
+    """
+    ends = [match.end() for match in _WORD.finditer(text)]
+    if frames <= 1 or len(ends) <= 1:
+        return [text]
+    frames = min(frames, len(ends))
+    cuts = [ends[round((index + 1) * len(ends) / frames) - 1] for index in range(frames - 1)]
+    return [_close_tags(text[:cut]) for cut in cuts] + [text]
+
+
+class _Animation:
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+
+
+def _frame_done(future: asyncio.Future):
+    """Retrieve a failed intermediate frame's error (e.g. MessageNotModified, message deleted); the final edit is awaited."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug(f"Animation frame failed: {future.exception()}")
+
+
+class Animator:
+    """
+    Typing-effect animations with a bounded number of edits and a bounded duration.
+
+    A text is shown in at most `max_edits` evenly spaced frames over
+    `max_seconds`, the last frame being the full text. A frame is skipped
+    while the previous one is still waiting in the outbound queue, and every
+    intermediate frame is skipped when that queue is deeper than
+    `skip_depth`. One animation runs per user: starting another one, or
+    cancel(user_id) (called when the user sends a command or presses a
+    button), jumps straight to the final text.
+    """
+
+    def __init__(self, max_edits: int, max_seconds: float, skip_depth: int):
+        self.max_edits = max_edits
+        self.max_seconds = max_seconds
+        self.skip_depth = skip_depth
+        self._active: Dict[int, _Animation] = {}
+
+        # Counters
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.frames_queued = 0
+        self.frames_skipped = 0
+
+    def cancel(self, user_id: int) -> bool:
+        """Finish the user's running animation now. Returns whether there was one."""
+        animation = self._active.get(user_id)
+        if animation is None:
+            return False
+        animation.cancelled.set()
+        return True
+
+    async def type_out(self, user_id: int, message, text: str, caption: bool = False,
+                       max_edits: Optional[int] = None, max_seconds: Optional[float] = None, **kwargs) -> bool:
+        """
+        Animate `text` into `message` (its caption when `caption` is set).
+
+        Extra keyword arguments (parse_mode, reply_markup...) go to every edit.
+        Returns False when the animation was cut short; the full text is
+        always sent either way.
+        """
+        self.cancel(user_id)
+        animation = self._active[user_id] = _Animation()
+        self.started += 1
+
+        edit = edit_caption if caption else edit_text
+        frames = typing_frames(text, max_edits or self.max_edits)
+        interval = (max_seconds if max_seconds is not None else self.max_seconds) / len(frames)
+        pending = None
+        completed = True
+        try:
+            for frame in frames[:-1]:
+                if outbound.depth > self.skip_depth or (pending is not None and not pending.done()):
+                    self.frames_skipped += 1
+                else:
+                    pending = await edit(message, frame, wait=False, **kwargs)
+                    pending.add_done_callback(_frame_done)
+                    self.frames_queued += 1
+                try:
+                    await asyncio.wait_for(animation.cancelled.wait(), timeout=interval)
+                    completed = False
+                    break
+                except asyncio.TimeoutError:
+                    pass
+            await edit(message, text, **kwargs)
+            self.frames_queued += 1
+        finally:
+            if self._active.get(user_id) is animation:
+                del self._active[user_id]
+        if completed:
+            self.completed += 1
+        else:
+            self.cancelled += 1
+        return completed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": len(self._active),
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "frames_queued": self.frames_queued,
+            "frames_skipped": self.frames_skipped,
+        }
+
+
+animator = Animator(ANIMATION_MAX_EDITS, ANIMATION_MAX_SECONDS, ANIMATION_SKIP_DEPTH)
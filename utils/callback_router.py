@@ -0,0 +1,155 @@
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from pyrogram.handlers import CallbackQueryHandler
+
+logger = logging.getLogger(__name__)
+
+# callback_data is "route" or "route:arg:arg"; Telegram caps it at 64 bytes
+SEPARATOR = ":"
+MAX_DATA_BYTES = 64
+EXPIRED_MESSAGE = "This button is no longer valid."
+
+# A handler gets the client, the CallbackQuery and the route's arguments, converted to its types
+Handler = Callable[..., Awaitable[Any]]
+
+
+class _Route:
+    __slots__ = ("name", "handler", "types", "calls", "errors", "total_ms", "max_ms")
+
+    def __init__(self, name: str, handler: Handler, types: Tuple[type, ...]):
+        self.name = name
+        self.handler = handler
+        self.types = types
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def parse(self, args: Tuple[str, ...]) -> Optional[Tuple[Any, ...]]:
+        """Arguments converted to the route's types; None when they do not fit."""
+        if len(args) != len(self.types):
+            return None
+        try:
+            return tuple(kind(arg) for kind, arg in zip(self.types, args))
+        except ValueError:
+            return None
+
+
+def _split(rest: str, separator: str, route: _Route) -> Tuple[str, ...]:
+    """Split into at most as many arguments as the route takes; the last one keeps any further separators."""
+    return tuple(rest.split(separator, max(len(route.types) - 1, 0))) if rest else ()
+
+
+class CallbackRouter:
+    """
+    One dispatcher for every inline button, installed as a single CallbackQueryHandler.
+
+    Routes are looked up by name in a dict after one split of the callback
+    data, instead of Pyrogram trying a regex filter per handler. Buttons sent
+    before the "route:arg" format keep working through legacy prefixes
+    ("command_3", "dev_next_42"), matched longest-first in a character trie.
+    Data that matches nothing, or whose arguments do not convert, is answered
+    with EXPIRED_MESSAGE so the button does not spin. Calls, errors and
+    latency are counted per route.
+    """
+
+    def __init__(self):
+        self._routes: Dict[str, _Route] = {}
+        self._legacy: Dict[str, Any] = {}  # Trie of legacy prefixes; "" marks the end of one
+        self.unmatched = 0
+        self.invalid = 0
+
+    def add(self, name: str, handler: Handler, *types: type):
+        """Route `name` to `handler`, whose extra parameters take the arguments as `types`."""
+        if SEPARATOR in name:
+            raise ValueError(f"Route name '{name}' may not contain '{SEPARATOR}'.")
+        if name in self._routes:
+            raise ValueError(f"Route '{name}' is already registered.")
+        self._routes[name] = _Route(name, handler, types)
+
+    def add_legacy(self, prefix: str, name: str):
+        """Send old-style data starting with `prefix` to route `name`; the rest is split on "_" into its arguments."""
+        node = self._legacy
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[""] = name
+
+    def data(self, name: str, *args: Any) -> str:
+        """callback_data for a button that opens route `name` with `args`."""
+        if name not in self._routes:
+            raise KeyError(f"Unknown route '{name}'.")
+        data = SEPARATOR.join((name, *map(str, args)))
+        if len(data.encode()) > MAX_DATA_BYTES:
+            raise ValueError(f"callback_data '{data}' is longer than {MAX_DATA_BYTES} bytes.")
+        return data
+
+    def _match_legacy(self, data: str) -> Optional[Tuple[_Route, Tuple[str, ...]]]:
+        node, match = self._legacy, None
+        for index, char in enumerate(data):
+            node = node.get(char)
+            if node is None:
+                break
+            if "" in node:
+                match = (node[""], index + 1)
+        if match is None:
+            return None
+        route = self._routes[match[0]]
+        return route, _split(data[match[1]:], "_", route)
+
+    def resolve(self, data: str) -> Optional[Tuple[_Route, Tuple[Any, ...]]]:
+        """The route for `data` and its converted arguments; None when nothing fits."""
+        name, _, rest = data.partition(SEPARATOR)
+        route = self._routes.get(name)
+        if route is not None:
+            args = _split(rest, SEPARATOR, route)
+        else:
+            legacy = self._match_legacy(data)
+            if legacy is None:
+                self.unmatched += 1
+                return None
+            route, args = legacy
+        parsed = route.parse(args)
+        if parsed is None:
+            self.invalid += 1
+            return None
+        return route, parsed
+
+    async def dispatch(self, client, query):
+        """The CallbackQueryHandler callback: resolve the data once and run its route."""
+        resolved = self.resolve(query.data or "")
+        if resolved is None:
+            logger.info(f"No route for callback data '{query.data}' from user {query.from_user.id}.")
+            await query.answer(EXPIRED_MESSAGE)
+            return
+
+        route, args = resolved
+        start = time.perf_counter()
+        try:
+            await route.handler(client, query, *args)
+        except Exception as e:
+            route.errors += 1
+            logger.error(f"Callback route '{route.name}' failed for user {query.from_user.id}: {e}", exc_info=True)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            route.calls += 1
+            route.total_ms += elapsed_ms
+            route.max_ms = max(route.max_ms, elapsed_ms)
+
+    def install(self, app):
+        """Register the dispatcher with Pyrogram; call once, after every module added its routes."""
+        app.add_handler(CallbackQueryHandler(self.dispatch))
+        logger.info(f"Callback router installed with {len(self._routes)} routes.")
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"routes": len(self._routes), "unmatched": self.unmatched, "invalid": self.invalid}
+        for route in sorted(self._routes.values(), key=lambda route: -route.calls):
+            if route.calls:
+                stats[route.name] = (
+                    f"{route.calls} calls, {route.errors} errors, "
+                    f"avg {route.total_ms / route.calls:.1f} ms, max {route.max_ms:.1f} ms"
+                )
+        return stats
+
+
+router = CallbackRouter()
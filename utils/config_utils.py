@@ -1,4 +1,14 @@
 import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional
+
+logger = logging.getLogger(__name__)
 
 def load_config(file_path):
     """
@@ -49,4 +59,120 @@ def load_items_config(file_path: str) -> dict:
         return None
     except json.JSONDecodeError:
         print(f"Error: The file {file_path} is not a valid JSON.")
-        return None
\ No newline at end of file
+        return None
+
+
+def freeze(value: Any) -> Any:
+    """Recursively turn dicts into read-only mappings and lists into tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of freeze: plain, mutable dicts and lists (e.g. for json.dump)."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def write_json_atomic(file_path: str, data: Any):
+    """
+    Write JSON next to the target and rename it into place.
+
+    os.replace is atomic, so readers see either the old file or the complete
+    new one, never a half-written file.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".config-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            json.dump(data, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class ConfigSnapshot:
+    """One immutable version of config.json."""
+
+    __slots__ = ("version", "data", "created_at", "author", "note")
+
+    def __init__(self, version: int, data: Mapping, author: Optional[int] = None, note: str = ""):
+        self.version = version
+        self.data = data
+        self.created_at = time.time()
+        self.author = author
+        self.note = note
+
+    def to_dict(self) -> Dict:
+        return thaw(self.data)
+
+
+class ConfigStore:
+    """
+    Versioned, hot-reloadable config.json.
+
+    Readers take `current` (a plain attribute read, no disk access) and keep
+    using that snapshot for the rest of their request. Writers build a new
+    frozen snapshot, write it to disk atomically and only then swap it in, so
+    a failed write leaves both the file and the live config untouched. The
+    last `history` versions are kept in memory for rollback.
+
+    update() and rollback() write and fsync the file, so async callers run
+    them with asyncio.to_thread; the lock makes that safe.
+    """
+
+    def __init__(self, file_path: str, history: int = 20):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        with open(file_path, "r") as file:
+            self.current = ConfigSnapshot(1, freeze(json.load(file)), note="loaded from disk")
+        self._history = deque([self.current], maxlen=history)
+
+    def _commit(self, data: Dict, author: Optional[int], note: str) -> ConfigSnapshot:
+        # Caller holds the lock
+        snapshot = ConfigSnapshot(self.current.version + 1, freeze(data), author, note)
+        write_json_atomic(self.file_path, data)
+        self._history.append(snapshot)
+        self.current = snapshot
+        logger.info(f"Config v{snapshot.version} is live ({note}).")
+        return snapshot
+
+    def update(self, changes: Dict[str, Any], author: Optional[int] = None) -> ConfigSnapshot:
+        """
+        Apply dotted-path changes ({"max_health.base": 70}) as a new version.
+
+        None values are skipped, matching the "-" placeholder of the dev commands.
+        """
+        changes = {path: value for path, value in changes.items() if value is not None}
+        with self._lock:
+            data = self.current.to_dict()
+            for path, value in changes.items():
+                *parents, key = path.split(".")
+                target = data
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                target[key] = value
+            note = ", ".join(f"{path}={value}" for path, value in changes.items()) or "no changes"
+            return self._commit(data, author, note)
+
+    def rollback(self, version: int, author: Optional[int] = None) -> ConfigSnapshot:
+        """Make the content of an earlier version live again, as a new version."""
+        with self._lock:
+            target = next((snapshot for snapshot in self._history if snapshot.version == version), None)
+            if target is None:
+                raise KeyError(f"Config version {version} is not in the history.")
+            return self._commit(target.to_dict(), author, f"rollback to v{version}")
+
+    def versions(self) -> List[ConfigSnapshot]:
+        """Known versions, newest first."""
+        with self._lock:
+            return list(reversed(self._history))
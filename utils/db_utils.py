@@ -1,18 +1,221 @@
+import asyncio
+import contextlib
+import functools
 import logging
-from typing import Optional
-from pymongo import MongoClient, UpdateOne
-from config import MONGO_URI
-from models.player import Player
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Union
+from config import (
+    STORAGE_BACKEND,
+    SQLITE_PATH,
+    DB_MAX_WORKERS,
+    PLAYER_CACHE_SIZE,
+    PLAYER_CACHE_TTL,
+    WRITE_BEHIND_ENABLED,
+    WRITE_BEHIND_MAX_STALENESS,
+    WRITE_BEHIND_MAX_BATCH,
+)
+from models.player import Player, PlayerView
 from pyrogram import Client
+from utils.cache_utils import LRUTTLCache
+from utils import regeneration
+from utils.game_data import get_game_data
+from utils.item_catalog import compact_inventory
+from utils.storage_backends import create_backend
+from utils.templates import card_cache
 
 # Set up logging for better error tracking
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Assuming you have a MongoDB client and database setup
-mongo_client = MongoClient(MONGO_URI)
-db = mongo_client.get_database()
-players_collection = db.get_collection("players")
+# Player storage (Mongo in production, memory or SQLite for local runs), chosen by config
+storage = create_backend(STORAGE_BACKEND, sqlite_path=SQLITE_PATH)
+
+# Storage calls are blocking, so every call goes through a bounded thread pool instead of
+# running on the event loop. The pool size caps concurrent database round-trips.
+db_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking database call in the DB thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, functools.partial(func, *args, **kwargs))
+
+def shutdown_db_executor():
+    """Wait for in-flight database calls, stop the DB thread pool and close storage."""
+    db_executor.shutdown(wait=True)
+    storage.close()
+    logger.info("Database executor shut down.")
+
+async def ensure_indexes() -> Dict[str, float]:
+    """Create the player storage indexes if missing. Returns seconds spent per index."""
+    start = time.perf_counter()
+    timings = await run_db(storage.ensure_indexes)
+    for name, elapsed in timings.items():
+        logger.info(f"Index {name} ready in {elapsed * 1000:.1f} ms")
+    logger.info(f"{len(timings)} {storage.name} player indexes ready in {time.perf_counter() - start:.2f}s")
+    return timings
+
+class PlayerWriteBehind:
+    """
+    Keeps dirty players in memory and writes them to storage in batches.
+
+    Repeated saves of the same player between two flushes collapse into one
+    update, and each flush sends a single bulk write. A flush runs
+    every `max_staleness` seconds, as soon as `max_batch` players are dirty, and
+    once more on shutdown.
+    """
+
+    def __init__(self, max_staleness: float, max_batch: int):
+        self.max_staleness = max_staleness
+        self.max_batch = max_batch
+        self._dirty: Dict[int, Player] = {}
+        self._wakeup = asyncio.Event()
+        self._lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.writes_requested = 0
+        self.writes_coalesced = 0
+        self.writes_flushed = 0
+        self.writes_skipped = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def mark_dirty(self, user_id: int, player: Player):
+        """Queue a player for the next flush, replacing any pending copy."""
+        self.writes_requested += 1
+        if user_id in self._dirty:
+            self.writes_coalesced += 1
+        self._dirty[user_id] = player
+        if len(self._dirty) >= self.max_batch:
+            self._wakeup.set()
+
+    def get(self, user_id: int) -> Optional[Player]:
+        """Return the pending (not yet flushed) player, if any."""
+        return self._dirty.get(user_id)
+
+    def discard(self, user_id: int):
+        """Drop a pending write, e.g. because the player is being deleted."""
+        self._dirty.pop(user_id, None)
+
+    async def flush(self) -> int:
+        """Write every dirty player with one bulk_write. Returns the number of players written."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+            # Diff on the loop; handlers may mutate the players while the pool encodes
+            operations = []
+            written = []
+            for user_id, player in batch.items():
+                update, state = player.get_changes()
+                if not update:
+                    self.writes_skipped += 1
+                    continue
+                operations.append((user_id, update))
+                written.append((player, state))
+            if not operations:
+                return 0
+            try:
+                await run_db(storage.bulk_update_players, operations)
+            except Exception as e:
+                # Requeue everything that was not saved again in the meantime
+                for user_id, player in batch.items():
+                    self._dirty.setdefault(user_id, player)
+                self.failed_flushes += 1
+                logger.error(f"Error flushing {len(operations)} player writes: {e}")
+                return 0
+            for player, state in written:
+                player.mark_saved(state)
+            self.flushes += 1
+            self.writes_flushed += len(operations)
+            logger.debug(f"Flushed {len(operations)} player writes.")
+            return len(operations)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.max_staleness)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def start(self):
+        """Start the background flush task on the running loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop())
+            logger.info(f"Write-behind started (max staleness {self.max_staleness}s, max batch {self.max_batch}).")
+
+    async def stop(self):
+        """Stop the flush task and write out everything still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        flushed = await self.flush()
+        logger.info(f"Write-behind stopped, {flushed} pending player writes flushed.")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": len(self._dirty),
+            "writes_requested": self.writes_requested,
+            "writes_coalesced": self.writes_coalesced,
+            "writes_flushed": self.writes_flushed,
+            "writes_skipped": self.writes_skipped,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+        }
+
+write_behind = PlayerWriteBehind(WRITE_BEHIND_MAX_STALENESS, WRITE_BEHIND_MAX_BATCH)
+
+# Read-through cache in front of load_player; saves refresh it and deletes drop it
+player_cache = LRUTTLCache(PLAYER_CACHE_SIZE, PLAYER_CACHE_TTL)
+# Concurrent misses for the same user share one database read
+_pending_loads: Dict[int, asyncio.Future] = {}
+# Handlers for the same user take turns on the shared cached Player; entries go when unused
+_player_locks: Dict[int, asyncio.Lock] = {}
+_player_lock_holders: Dict[int, int] = {}
+
+@contextlib.asynccontextmanager
+async def player_lock(user_id: int) -> AsyncIterator[None]:
+    """
+    Hold the user's lock for a load -> modify -> save cycle.
+
+    Every load of a user returns the same cached Player, so two handlers
+    changing it at once would interleave their edits and their saves. Not
+    reentrant: do not take it again inside a locked section.
+    """
+    lock = _player_locks.get(user_id)
+    if lock is None:
+        lock = _player_locks[user_id] = asyncio.Lock()
+    _player_lock_holders[user_id] = _player_lock_holders.get(user_id, 0) + 1
+    try:
+        async with lock:
+            yield
+    finally:
+        holders = _player_lock_holders[user_id] - 1
+        if holders:
+            _player_lock_holders[user_id] = holders
+        else:
+            del _player_lock_holders[user_id]
+            del _player_locks[user_id]
+
+def start_write_behind():
+    if WRITE_BEHIND_ENABLED:
+        write_behind.start()
+
+async def stop_write_behind():
+    await write_behind.stop()
 
 async def save_player(user_id: int, player_data: Player):
     try:
@@ -20,45 +223,216 @@ async def save_player(user_id: int, player_data: Player):
         if not isinstance(player_data, Player):
             raise TypeError(f"Expected Player object, got {type(player_data)}")
 
-        # Convert Player object to dictionary
-        player_data_dict = player_data.to_dict()
-        
+        # Only send the fields that changed since the player was loaded or last saved
+        update, state = player_data.get_changes()
+        if not update:
+            logger.debug(f"No changes to save for user_id={user_id}")
+            return
+
+        # Any card rendered from the previous state is now out of date. A new Player
+        # (first start, or a replacement such as a new solo arc) restarts its
+        # state_version, so cards of the player it replaces are dropped outright.
+        if player_data.is_new:
+            card_cache.invalidate(user_id)
+        player_data.state_version += 1
+        player_cache.set(user_id, player_data)
+
+        # Buffer the write when write-behind is running; it is flushed in batches
+        if write_behind.running:
+            write_behind.mark_dirty(user_id, player_data)
+            return
+
+        update.setdefault("$set", {})["state_version"] = state["state_version"] = player_data.state_version
+
         # Using upsert to insert or update the player data in one operation
-        result = players_collection.update_one(
-            {"user_id": user_id},
-            {"$set": player_data_dict},
-            upsert=True
-        )
-        if result.upserted_id:
+        inserted = await run_db(storage.update_player, user_id, update)
+        player_data.mark_saved(state)
+        if inserted:
             logger.info(f"Player data inserted for user_id={user_id}")
         else:
             logger.info(f"Player data updated for user_id={user_id}")
     except Exception as e:
         logger.error(f"Error saving player data for user_id={user_id}: {e}")
 
+def _load_player_sync(user_id: int) -> Optional[Player]:
+    # Runs in the DB pool: the find blocks, and decoding the document (legacy inventory
+    # migration, item totals) runs alongside it. Config comes from the in-memory GameData.
+    player_data = storage.find_player(user_id)
+    if player_data:
+        return Player.from_dict(player_data)  # Ensure this returns a Player object
+    return None
+
 async def load_player(user_id: int) -> Optional[Player]:
+    """Load a player, with the stamina and health regenerated since they were last updated."""
+    player = await _get_player(user_id)
+    if player is not None:
+        player.regenerate()
+    return player
+
+async def _get_player(user_id: int) -> Optional[Player]:
     try:
-        player_data = players_collection.find_one({'user_id': user_id})
-        if player_data:
-            return Player.from_dict(player_data)  # Ensure this returns a Player object
-        return None
+        # A pending write is newer than whatever Mongo has
+        pending = write_behind.get(user_id)
+        if pending is not None:
+            return pending
+
+        cached = player_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        in_flight = _pending_loads.get(user_id)
+        if in_flight is not None:
+            try:
+                return await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise  # This waiter was cancelled itself
+                return await _get_player(user_id)  # The loading task was cancelled; load again
+
+        in_flight = asyncio.get_running_loop().create_future()
+        _pending_loads[user_id] = in_flight
+        try:
+            player = await run_db(_load_player_sync, user_id)
+            if player is not None:
+                player_cache.set(user_id, player)
+            in_flight.set_result(player)
+            return player
+        except Exception as e:
+            in_flight.set_exception(e)
+            in_flight.exception()  # Mark as retrieved when nobody else was waiting
+            raise
+        finally:
+            if not in_flight.done():
+                in_flight.cancel()  # Cancelled mid-load: release the waiters
+            _pending_loads.pop(user_id, None)
     except Exception as e:
         logger.error(f"An error occurred while loading the player {user_id}: {e}")
         return None
 
 
+# Same defaults Player.from_dict applies to documents that predate a field
+_FIELD_DEFAULTS = {
+    "level": 1,
+    "experience": 0,
+    "exploration_progress": 0,
+    "started_adventure": False,
+    "state_version": 0,
+    "resting": False,
+}
+
+# Extra fields needed to regenerate the stats of a projected view
+_REGEN_FIELDS = ("stats", "location", "resting", "last_updated", "regen_carry")
+
+def _view_from_document(document: dict, fields: tuple) -> PlayerView:
+    view_fields = {field: document.get(field, _FIELD_DEFAULTS.get(field)) for field in fields}
+    if "inventory" in view_fields:
+        inventory = view_fields["inventory"]
+        if inventory is None:
+            view_fields["inventory"] = {}
+        elif isinstance(inventory, list):
+            view_fields["inventory"] = compact_inventory(inventory)  # Not yet migrated
+    return PlayerView(view_fields)
+
+def _load_player_fields_sync(user_id: int, fields: tuple) -> Optional[PlayerView]:
+    regenerates = "stats" in fields
+    projection = tuple(dict.fromkeys(fields + _REGEN_FIELDS)) if regenerates else fields
+    player_data = storage.find_player(user_id, projection)
+    if player_data is None:
+        return None
+    if regenerates:
+        # Same result Player.regenerate would give; nothing is written back
+        regeneration.regenerate(player_data, get_game_data().config)
+    return _view_from_document(player_data, fields)
+
+async def load_player_fields(user_id: int, fields: Iterable[str]) -> Optional[PlayerView]:
+    """
+    Load only `fields` of a player as a read-only PlayerView.
+
+    Meant for handlers that just display data. A player already in memory is
+    served from there; otherwise storage is asked for the projected fields only.
+    """
+    fields = tuple(fields)
+    try:
+        player = write_behind.get(user_id) or player_cache.get(user_id)
+        if player is not None:
+            player.regenerate()
+            return PlayerView.from_player(player, fields)
+        return await run_db(_load_player_fields_sync, user_id, fields)
+    except Exception as e:
+        logger.error(f"An error occurred while loading fields {fields} of player {user_id}: {e}")
+        return None
+
+def _get_players_page_sync(after: Optional[int], before: Optional[int], limit: int, fields: Optional[tuple]):
+    documents = storage.players_page(after, before, limit, fields)
+    if fields is None:
+        return [Player.from_dict(document) for document in documents]
+    return [_view_from_document(document, fields) for document in documents]
+
+async def get_players_page(
+    after: Optional[int] = None,
+    before: Optional[int] = None,
+    limit: int = 20,
+    fields: Optional[Iterable[str]] = None,
+) -> List[Union[Player, PlayerView]]:
+    """
+    Fetch one page of players ordered by user_id using keyset pagination.
+
+    `after` returns the players following that user_id, `before` the ones
+    preceding it. With `fields` only those are projected and PlayerViews are
+    returned instead of full Players; user_id is always included.
+    """
+    if fields is not None:
+        fields = tuple(dict.fromkeys(("user_id", *fields)))
+    try:
+        return await run_db(_get_players_page_sync, after, before, limit, fields)
+    except Exception as e:
+        logger.error(f"An error occurred while retrieving a page of players: {e}")
+        return []
+
+async def iter_players(batch_size: int = 100, fields: Optional[Iterable[str]] = None) -> AsyncIterator[Union[Player, PlayerView]]:
+    """Stream every player in user_id order, holding at most one batch in memory."""
+    await write_behind.flush()
+    after = None
+    while True:
+        page = await get_players_page(after=after, limit=batch_size, fields=fields)
+        for player in page:
+            yield player
+        if len(page) < batch_size:
+            return
+        after = page[-1].user_id
+
+async def migrate_inventories(batch_size: int = 500) -> int:
+    """
+    Convert every stored list inventory to {item_id: count} in batches.
+
+    Players are also migrated lazily when loaded; this finishes the job for
+    players that have not been seen since. Returns the number of documents changed.
+    """
+    await write_behind.flush()
+    migrated = await run_db(storage.migrate_legacy_inventories, compact_inventory, batch_size)
+    logger.info(f"Migrated {migrated} player inventories to item counts.")
+    return migrated
+
+async def count_players() -> int:
+    try:
+        return await run_db(storage.count_players)
+    except Exception as e:
+        logger.error(f"An error occurred while counting players: {e}")
+        return 0
+
 async def get_all_players():
     try:
-        players = list(players_collection.find())
-        return [Player.from_dict(player) for player in players]
+        return [player async for player in iter_players()]
     except Exception as e:
         logger.error(f"An error occurred while retrieving all players: {e}")
         return []
 
 async def delete_player(user_id: int) -> bool:
     try:
-        result = players_collection.delete_one({'user_id': user_id})
-        if result.deleted_count > 0:
+        write_behind.discard(user_id)
+        player_cache.invalidate(user_id)
+        card_cache.invalidate(user_id)
+        if await run_db(storage.delete_player, user_id):
             logger.info(f"Player with user_id={user_id} deleted successfully.")
             return True
         logger.warning(f"No player found with user_id={user_id} to delete.")
@@ -71,8 +445,10 @@ async def delete_player_progress(user_id: int, arc_type: str = 'survival', conte
     try:
         # Handle different types of arc deletions
         if arc_type == 'solo':
-            result = players_collection.delete_one({'user_id': user_id})
-            if result.deleted_count > 0:
+            write_behind.discard(user_id)
+            player_cache.invalidate(user_id)
+            card_cache.invalidate(user_id)
+            if await run_db(storage.delete_player, user_id):
                 logger.info(f"Solo player progress for user_id={user_id} deleted.")
             else:
                 logger.warning(f"No solo progress found for user_id={user_id} to delete.")
@@ -2,7 +2,7 @@ from functools import wraps
 import logging
 from pyrogram import Client
 from pyrogram.types import Message, CallbackQuery
-from utils.db_utils import load_player
+from utils.db_utils import load_player, player_lock
 
 # Define a global variable to manage maintenance mode status
 MAINTENANCE_MODE = False
@@ -103,3 +103,11 @@ def maintenance_mode_only(*args, **kwargs):
             raise e  # Re-raise the exception to ensure it's not silently ignored
 
     return wrapped
+
+def player_locked(func):
+    """Run a handler that loads, changes and saves the user's player under that user's player_lock."""
+    @wraps(func)
+    async def wrapped(client: Client, update, *args, **kwargs):
+        async with player_lock(update.from_user.id):
+            return await func(client, update, *args, **kwargs)
+    return wrapped
@@ -0,0 +1,66 @@
+import random
+from typing import Dict, Mapping, Tuple
+
+# Rules of /explore shared by the handlers and tools/balance_sim.py. The
+# simulator re-implements these formulas on NumPy arrays, so keep both in step.
+
+# Locations unlocked by exploration progress; past the last threshold it is the desert
+LOCATION_THRESHOLDS = ((10, "Beach"), (20, "Mountain"), (30, "Caves"), (40, "Dark Forest"))
+FINAL_LOCATION = "Desert"
+
+# Items found per explore and how likely each count is
+ITEM_COUNTS = (1, 2, 3, 4)
+ITEM_COUNT_WEIGHTS = (0.1, 0.2, 0.3, 0.4)
+
+# XP per item is scaled down twice for the hardcore survival feel
+ITEM_XP_FACTOR = 0.75
+LEVEL_XP_FACTOR = 0.5
+
+# Health lost on an explore that leaves the player with no stamina (inclusive range)
+EXHAUSTION_DAMAGE = (5, 12)
+
+# Capacity change by location
+LOCATION_CAPACITY_BONUS = {"mountain": -1}
+
+
+def location_for_progress(progress: int) -> str:
+    for threshold, location in LOCATION_THRESHOLDS:
+        if progress < threshold:
+            return location
+    return FINAL_LOCATION
+
+
+def roll_item_count(rng=random) -> int:
+    return rng.choices(ITEM_COUNTS, weights=ITEM_COUNT_WEIGHTS)[0]
+
+
+def roll_stamina_cost(config: Mapping, rng=random) -> int:
+    return rng.randint(config["stamina_usage"]["min"], config["stamina_usage"]["max"])
+
+
+def xp_for_items(items: int, config: Mapping) -> float:
+    """XP for the items actually picked up on one explore."""
+    xp_gain = config["xp_gain"]
+    return items * xp_gain["per_item"] * ITEM_XP_FACTOR * xp_gain["level_multiplier"] * LEVEL_XP_FACTOR
+
+
+def apply_exploration_cost(stats: Dict[str, int], stamina_cost: int, rng=random) -> int:
+    """Spend stamina; an explore that ends exhausted costs health. Returns the health lost."""
+    stats["stamina"] = max(0, stats["stamina"] - stamina_cost)
+    if stats["stamina"] > 0:
+        return 0
+    damage = rng.randint(*EXHAUSTION_DAMAGE)
+    stats["health"] = max(0, stats["health"] - damage)
+    return damage
+
+
+def inventory_capacity(level: int, location: str, config: Mapping) -> int:
+    """Inventory space available at a level and location."""
+    requirements = config["level_requirements"]
+    level_capacity = level * requirements.get("xp_per_level") + requirements.get("xp_increment_per_level") * level
+    location_bonus = LOCATION_CAPACITY_BONUS.get(location.lower(), 0) if isinstance(location, str) else 0
+    return max(level_capacity + location_bonus, 0)
+
+
+def stamina_cost_range(config: Mapping) -> Tuple[int, int]:
+    return config["stamina_usage"]["min"], config["stamina_usage"]["max"]
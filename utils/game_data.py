@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Mapping, Optional, Tuple
+from config import CONFIG_HISTORY_SIZE, DATA_DIR
+from utils.config_utils import ConfigStore, freeze
+from utils.item_catalog import ItemCatalog
+
+logger = logging.getLogger(__name__)
+
+
+def _load_json(data_dir: str, name: str) -> Any:
+    with open(os.path.join(data_dir, name)) as f:
+        return json.load(f)
+
+
+class GameData:
+    """
+    Static game definitions from the data directory, parsed once per process.
+
+    Everything is frozen: handlers and Player instances share the same objects
+    and must never mutate them. Attributes:
+        config     current balance settings from config.json (see ConfigStore)
+        catalog    ItemCatalog over items.json
+        events     location -> tuple of events
+        areas      location -> area description
+        resources  location -> gatherable resources
+    """
+
+    def __init__(self, config_store: ConfigStore, items: Tuple[Mapping, ...], events: Mapping,
+                 areas: Mapping, resources: Mapping, load_seconds: float = 0.0, memory_bytes: int = 0):
+        self.config_store = config_store
+        self.catalog = ItemCatalog(items)
+        self.events = events
+        self.areas = areas
+        self.resources = resources
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes
+
+    @property
+    def config(self) -> Mapping:
+        """Snapshot that is live right now; dev commands can swap it at runtime."""
+        return self.config_store.current.data
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR) -> "GameData":
+        """Read and freeze every data file, measuring time and traced allocations."""
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            game_data = cls(
+                config_store=ConfigStore(os.path.join(data_dir, "config.json"), history=CONFIG_HISTORY_SIZE),
+                items=freeze(_load_json(data_dir, "items.json")["items"]),
+                events=freeze(_load_json(data_dir, "events.json")),
+                areas=freeze(_load_json(data_dir, "areas.json")),
+                resources=freeze(_load_json(data_dir, "resources.json")),
+            )
+            game_data.load_seconds = time.perf_counter() - start
+            game_data.memory_bytes = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            if not tracing:
+                tracemalloc.stop()
+        return game_data
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "items": len(self.catalog.items),
+            "locations": len(self.areas),
+            "config_version": self.config_store.current.version,
+            "events": sum(len(events) for events in self.events.values()),
+            "load_ms": round(self.load_seconds * 1000, 2),
+            "memory_kb": round(self.memory_bytes / 1024, 1),
+        }
+
+
+_game_data: Optional[GameData] = None
+_load_lock = threading.Lock()
+
+
+def get_game_data() -> GameData:
+    """Return the shared registry, loading it on first use."""
+    global _game_data
+    if _game_data is None:
+        with _load_lock:
+            if _game_data is None:
+                _game_data = GameData.load()
+                stats = _game_data.stats()
+                logger.info(
+                    f"Game data loaded from {DATA_DIR}: {stats['items']} items, {stats['locations']} locations "
+                    f"in {stats['load_ms']} ms, {stats['memory_kb']} KiB."
+                )
+    return _game_data
+
+
+def get_config_store() -> ConfigStore:
+    return get_game_data().config_store
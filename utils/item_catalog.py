@@ -0,0 +1,76 @@
+import re
+from collections import Counter, defaultdict
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+
+def item_id_for_name(name: str) -> str:
+    """Derive the catalog id of an item from its display name ("Iron Ore" -> "iron_ore")."""
+    return re.sub(r'[^a-z0-9]+', '_', name.lower()).strip('_')
+
+
+def compact_inventory(items: List[Dict]) -> Dict[str, int]:
+    """
+    Convert a legacy inventory (one full item dict per unit) into {item_id: count}.
+
+    Items saved before ids existed are matched by name, which is how their ids
+    were derived.
+    """
+    return dict(Counter(item.get("id") or item_id_for_name(item["name"]) for item in items))
+
+
+class ItemCatalog:
+    """
+    Static item definitions from items.json. Built by GameData.
+
+    Every lookup the handlers need is indexed once here: by id, by case-folded
+    name, by case-folded location and by (location, rarity), plus per-location
+    counts for the /items summary. Rarity is the item "type" (common/rare).
+    """
+
+    def __init__(self, items: Sequence[Mapping]):
+        self.items = items
+        by_name: Dict[str, Mapping] = {}
+        by_location: Dict[str, List[Mapping]] = defaultdict(list)
+        by_location_rarity: Dict[Tuple[str, str], List[Mapping]] = defaultdict(list)
+        for item in items:
+            location = item["location"].casefold()
+            by_name.setdefault(item["name"].casefold(), item)
+            by_location[location].append(item)
+            by_location_rarity[(location, item["type"])].append(item)
+
+        self.by_id: Mapping[str, Mapping] = MappingProxyType({item["id"]: item for item in items})
+        self.by_name: Mapping[str, Mapping] = MappingProxyType(by_name)
+        self.by_location: Mapping[str, Tuple[Mapping, ...]] = MappingProxyType(
+            {location: tuple(location_items) for location, location_items in by_location.items()})
+        self.by_location_rarity: Mapping[Tuple[str, str], Tuple[Mapping, ...]] = MappingProxyType(
+            {key: tuple(location_items) for key, location_items in by_location_rarity.items()})
+        self.rarity_counts: Mapping[str, int] = MappingProxyType(dict(Counter(item["type"] for item in items)))
+        self.location_counts: Mapping[str, int] = MappingProxyType(
+            {location: len(location_items) for location, location_items in self.by_location.items()})
+
+    def get(self, item_id: str) -> Optional[Mapping]:
+        return self.by_id.get(item_id)
+
+    def find(self, name: str) -> Optional[Mapping]:
+        """Item with this display name, ignoring case."""
+        return self.by_name.get(name.casefold())
+
+    def in_location(self, location: str, rarity: Optional[str] = None) -> Tuple[Mapping, ...]:
+        """Items found at a location, optionally only one rarity. Location case is ignored."""
+        location = location.casefold()
+        if rarity is None:
+            return self.by_location.get(location, ())
+        return self.by_location_rarity.get((location, rarity), ())
+
+    def name(self, item_id: str) -> str:
+        """Display name of an item; unknown ids are shown as-is."""
+        item = self.by_id.get(item_id)
+        return item["name"] if item else item_id
+
+    def id_for_name(self, name: str) -> Optional[str]:
+        item = self.find(name)
+        if item is not None:
+            return item["id"]
+        item_id = item_id_for_name(name)
+        return item_id if item_id in self.by_id else None
@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from config import JOBS_CONCURRENCY, JOBS_FILE, JOBS_PERSIST_INTERVAL
+from utils.config_utils import write_json_atomic
+from utils.outbound import outbound
+
+logger = logging.getLogger(__name__)
+
+# An action gets the Pyrogram client and the job's keyword arguments
+Action = Callable[..., Awaitable[Any]]
+
+
+class _Job:
+    __slots__ = ("job_id", "action", "due_at", "kwargs")
+
+    def __init__(self, job_id: str, action: str, due_at: float, kwargs: Dict[str, Any]):
+        self.job_id = job_id
+        self.action = action
+        self.due_at = due_at
+        self.kwargs = kwargs
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"job_id": self.job_id, "action": self.action, "due_at": self.due_at, "kwargs": self.kwargs}
+
+
+class JobScheduler:
+    """
+    Deferred actions (delete-after, expiring buttons, reminders) run by one background task.
+
+    Jobs name a registered action and carry JSON-serialisable keyword
+    arguments, so they can be written to `persist_path` and picked up again
+    after a restart; jobs that fell due while the bot was down run right
+    away. Pending jobs sit in a heap ordered by due time: scheduling and
+    running are O(log n), and cancelling is O(1) (the heap entry is skipped
+    when it comes up). Up to `concurrency` actions run at once.
+    """
+
+    def __init__(self, concurrency: int, persist_path: str = "", persist_interval: float = 5.0):
+        self.concurrency = concurrency
+        self.persist_path = persist_path
+        self.persist_interval = persist_interval
+        self._actions: Dict[str, Action] = {}
+        self._jobs: Dict[str, _Job] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._client = None
+        self._dirty = False
+        self._last_persist = 0.0
+
+        # Counters
+        self.scheduled = 0
+        self.ran = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.max_lateness = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def register(self, name: str, action: Action):
+        """Make `action` schedulable under `name`."""
+        self._actions[name] = action
+
+    def schedule(self, action: str, delay: float, **kwargs) -> str:
+        """Run `action` in `delay` seconds with `kwargs`. Returns the job id for cancel()."""
+        if action not in self._actions:
+            raise KeyError(f"Unknown job action '{action}'.")
+        job = _Job(uuid.uuid4().hex, action, time.time() + delay, kwargs)
+        self._push(job)
+        self.scheduled += 1
+        return job.job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """Forget a pending job. Returns whether it was still pending."""
+        if self._jobs.pop(job_id, None) is None:
+            return False
+        self.cancelled += 1
+        self._dirty = True
+        if len(self._heap) > 2 * len(self._jobs) + 1024:
+            # Mostly cancelled entries: rebuild from the pending jobs
+            self._heap = [(job.due_at, next(self._sequence), job.job_id) for job in self._jobs.values()]
+            heapq.heapify(self._heap)
+        return True
+
+    def _push(self, job: _Job):
+        self._jobs[job.job_id] = job
+        heapq.heappush(self._heap, (job.due_at, next(self._sequence), job.job_id))
+        self._dirty = True
+        if self._heap[0][2] == job.job_id:
+            self._wakeup.set()  # New earliest job
+
+    def _pop_due(self, now: float) -> List[_Job]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(self._running) + len(due) < self.concurrency:
+            _, _, job_id = heapq.heappop(self._heap)
+            job = self._jobs.pop(job_id, None)
+            if job is not None:  # Cancelled jobs leave their heap entry behind
+                due.append(job)
+        if due:
+            self._dirty = True
+        return due
+
+    async def _run(self, job: _Job):
+        lateness = time.time() - job.due_at
+        self.max_lateness = max(self.max_lateness, lateness)
+        try:
+            await self._actions[job.action](self._client, **job.kwargs)
+            self.ran += 1
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Job {job.action} {job.kwargs} failed: {e}")
+
+    async def _run_loop(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            for job in self._pop_due(now):
+                task = asyncio.get_running_loop().create_task(self._run(job))
+                self._running.add(task)
+                task.add_done_callback(self._on_done)
+            if self._dirty and self.persist_path and time.monotonic() - self._last_persist >= self.persist_interval:
+                await self.persist()
+
+            timeout = self.persist_interval if self._dirty and self.persist_path else None
+            if self._heap and len(self._running) < self.concurrency:
+                wait = max(self._heap[0][0] - time.time(), 0.0)
+                timeout = wait if timeout is None else min(timeout, wait)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        self._wakeup.set()  # A slot is free for the next due job
+
+    async def persist(self):
+        """Write the pending jobs to persist_path (off the event loop)."""
+        if not self.persist_path:
+            return
+        self._dirty = False
+        self._last_persist = time.monotonic()
+        jobs = [job.to_dict() for job in self._jobs.values()]
+        try:
+            await asyncio.to_thread(write_json_atomic, self.persist_path, {"jobs": jobs})
+        except OSError as e:
+            self._dirty = True
+            logger.error(f"Could not persist {len(jobs)} pending jobs to {self.persist_path}: {e}")
+
+    def _restore(self):
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path) as file:
+                stored = json.load(file).get("jobs", [])
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read pending jobs from {self.persist_path}: {e}")
+            return
+        restored = 0
+        for entry in stored:
+            if entry.get("action") not in self._actions:
+                logger.warning(f"Dropping stored job with unknown action: {entry}")
+                continue
+            self._push(_Job(entry["job_id"], entry["action"], entry["due_at"], entry.get("kwargs", {})))
+            restored += 1
+        logger.info(f"Restored {restored} pending jobs from {self.persist_path}.")
+
+    def start(self, client):
+        """Start running jobs with `client`, after restoring persisted ones."""
+        if not self.running:
+            self._client = client
+            self._restore()
+            self._task = asyncio.get_running_loop().create_task(self._run_loop())
+            logger.info(f"Job scheduler started ({len(self._jobs)} pending, persistence {'on' if self.persist_path else 'off'}).")
+
+    async def stop(self):
+        """Stop taking due jobs, let running ones finish and persist what is still pending."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.wait(set(self._running), timeout=5)
+        await self.persist()
+        logger.info(f"Job scheduler stopped, {len(self._jobs)} jobs pending.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._jobs),
+            "heap_entries": len(self._heap),
+            "running": len(self._running),
+            "scheduled": self.scheduled,
+            "ran": self.ran,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "max_lateness_s": round(self.max_lateness, 2),
+        }
+
+
+# Built-in actions; Telegram calls go through the outbound queue like handler replies
+async def delete_message(client, chat_id: int, message_id: int):
+    await outbound.submit(chat_id, lambda: client.delete_messages(chat_id, message_id))
+
+
+async def expire_buttons(client, chat_id: int, message_id: int):
+    await outbound.submit(chat_id, lambda: client.edit_message_reply_markup(chat_id, message_id, reply_markup=None))
+
+
+async def send_reminder(client, chat_id: int, text: str):
+    await outbound.submit(chat_id, lambda: client.send_message(chat_id, text))
+
+
+jobs = JobScheduler(JOBS_CONCURRENCY, JOBS_FILE, JOBS_PERSIST_INTERVAL)
+jobs.register("delete_message", delete_message)
+jobs.register("expire_buttons", expire_buttons)
+jobs.register("send_reminder", send_reminder)
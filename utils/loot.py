@@ -0,0 +1,103 @@
+import functools
+import random
+from typing import Dict, Generic, List, Mapping, Optional, Sequence, TypeVar
+from utils.config_utils import ConfigSnapshot
+from utils.game_data import get_config_store, get_game_data
+from utils.item_catalog import ItemCatalog
+
+T = TypeVar("T")
+
+# Used when config.json has no loot section: commons drop four times as often as rares
+DEFAULT_RARITY_WEIGHTS = {"common": 4, "rare": 1}
+
+
+class AliasTable(Generic[T]):
+    """
+    Weighted sampling in O(1) per draw (Vose's alias method).
+
+    Building is O(n). Each draw picks a column uniformly and keeps it or
+    takes its alias, using a single random number.
+    """
+
+    def __init__(self, outcomes: Sequence[T], weights: Sequence[float]):
+        if not outcomes or len(outcomes) != len(weights):
+            raise ValueError("AliasTable needs one weight per outcome and at least one outcome.")
+        total = float(sum(weights))
+        if total <= 0 or any(weight < 0 for weight in weights):
+            raise ValueError("AliasTable weights must be non-negative and not all zero.")
+
+        count = len(outcomes)
+        self.outcomes = tuple(outcomes)
+        self.probabilities = tuple(weight / total for weight in weights)
+        scaled = [probability * count for probability in self.probabilities]
+        self._keep = [1.0] * count
+        self._alias = list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self._keep[low] = scaled[low]
+            self._alias[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Whatever is left is 1.0 up to rounding and keeps its own column
+
+    def __len__(self) -> int:
+        return len(self.outcomes)
+
+    def sample(self, rng=random) -> T:
+        draw = rng.random() * len(self.outcomes)
+        column = int(draw)
+        return self.outcomes[column if draw - column < self._keep[column] else self._alias[column]]
+
+    def sample_many(self, k: int, rng=random) -> List[T]:
+        """k independent draws (with replacement)."""
+        outcomes, keep, alias, count = self.outcomes, self._keep, self._alias, len(self.outcomes)
+        drawn = []
+        for _ in range(k):
+            draw = rng.random() * count
+            column = int(draw)
+            drawn.append(outcomes[column if draw - column < keep[column] else alias[column]])
+        return drawn
+
+
+def item_weight(item: Mapping, rarity_weights: Mapping[str, float]) -> float:
+    """Drop weight of an item: its own drop_weight in items.json, else the weight of its rarity."""
+    if "drop_weight" in item:
+        return item["drop_weight"]
+    return rarity_weights.get(item["type"], rarity_weights.get("common", 1))
+
+
+class LootTables:
+    """One alias table per location, over the items found there."""
+
+    def __init__(self, catalog: ItemCatalog, config: Mapping):
+        rarity_weights = config.get("loot", {}).get("rarity_weights", DEFAULT_RARITY_WEIGHTS)
+        self.rarity_weights = dict(rarity_weights)
+        self._tables: Dict[str, AliasTable] = {}
+        for location, items in catalog.by_location.items():
+            weighted = [(item, item_weight(item, rarity_weights)) for item in items]
+            weighted = [(item, weight) for item, weight in weighted if weight > 0]
+            if weighted:
+                self._tables[location] = AliasTable([item for item, _ in weighted], [weight for _, weight in weighted])
+
+    def for_location(self, location: str) -> Optional[AliasTable]:
+        return self._tables.get(location.casefold())
+
+    def drop_rates(self, location: str) -> Dict[str, float]:
+        """Item name -> chance per draw, for the /loot dev view."""
+        table = self.for_location(location)
+        if table is None:
+            return {}
+        return {item["name"]: probability for item, probability in zip(table.outcomes, table.probabilities)}
+
+
+@functools.lru_cache(maxsize=8)
+def loot_tables_for(snapshot: ConfigSnapshot) -> LootTables:
+    """Tables for one config version; the catalog itself never changes at runtime."""
+    return LootTables(get_game_data().catalog, snapshot.data)
+
+
+def get_loot_tables() -> LootTables:
+    """Tables for the live config version."""
+    return loot_tables_for(get_config_store().current)
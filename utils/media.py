@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, Optional
+from pyrogram.errors import FileIdInvalid, FileReferenceExpired, MediaEmpty
+from config import MEDIA_FILE
+from utils.config_utils import write_json_atomic
+from utils.outbound import reply_photo
+
+logger = logging.getLogger(__name__)
+
+# Asset name -> where to upload it from (URL or local path); handlers send by name
+MEDIA_ASSETS = {
+    "welcome": "https://files.catbox.moe/pei3tl.jpg",
+    "adventure_start": "https://files.catbox.moe/3gbv36.jpg",
+}
+
+# Telegram no longer accepts a stored file_id
+STALE_FILE_ID_ERRORS = (FileIdInvalid, FileReferenceExpired, MediaEmpty)
+
+
+class MediaRegistry:
+    """
+    Sends named media by cached Telegram file_id, uploading each asset only once.
+
+    The first send of an asset goes out from its source and the file_id
+    Telegram returns is kept (and written to `persist_path`); every later
+    send reuses it, so Telegram neither downloads the URL nor receives the
+    file again. Concurrent first sends wait for the one upload. A stored id
+    is dropped when its source changes or Telegram rejects it, and the asset
+    is uploaded again.
+    """
+
+    def __init__(self, assets: Dict[str, str], persist_path: str = ""):
+        self.assets = assets
+        self.persist_path = persist_path
+        self._file_ids: Dict[str, Dict[str, str]] = {}  # name -> {"file_id", "source"}
+        self._upload_locks: Dict[str, asyncio.Lock] = {}
+
+        # Counters
+        self.uploads = 0
+        self.reused = 0
+        self.reuploads = 0
+
+    def load(self):
+        """Read the stored file_ids, keeping only those whose source is unchanged."""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path) as file:
+                stored = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read media file_ids from {self.persist_path}: {e}")
+            return
+        self._file_ids = {
+            name: entry for name, entry in stored.items()
+            if isinstance(entry, dict) and entry.get("file_id") and entry.get("source") == self.assets.get(name)
+        }
+        logger.info(f"Loaded {len(self._file_ids)} of {len(self.assets)} media file_ids from {self.persist_path}.")
+
+    def file_id(self, name: str) -> Optional[str]:
+        entry = self._file_ids.get(name)
+        return entry["file_id"] if entry else None
+
+    async def _remember(self, name: str, sent):
+        photo = getattr(sent, "photo", None)
+        if photo is None:
+            return
+        self._file_ids[name] = {"file_id": photo.file_id, "source": self.assets[name]}
+        if self.persist_path:
+            try:
+                await asyncio.to_thread(write_json_atomic, self.persist_path, self._file_ids)
+            except OSError as e:
+                logger.error(f"Could not persist media file_ids to {self.persist_path}: {e}")
+
+    async def _upload(self, name: str, message, **kwargs):
+        sent = await reply_photo(message, self.assets[name], **kwargs)
+        self.uploads += 1
+        await self._remember(name, sent)
+        return sent
+
+    async def _send_first(self, name: str, message, **kwargs):
+        """Upload `name` unless another send already did while this one waited for the lock."""
+        async with self._upload_locks.setdefault(name, asyncio.Lock()):
+            file_id = self.file_id(name)
+            if file_id is None:
+                return await self._upload(name, message, **kwargs)
+        self.reused += 1
+        return await reply_photo(message, file_id, **kwargs)
+
+    async def reply_photo(self, message, name: str, **kwargs):
+        """Reply to `message` with asset `name`; keyword arguments (caption, reply_markup...) go to the send."""
+        if name not in self.assets:
+            raise KeyError(f"Unknown media asset '{name}'.")
+
+        file_id = self.file_id(name)
+        if file_id is None:
+            return await self._send_first(name, message, **kwargs)
+        try:
+            sent = await reply_photo(message, file_id, **kwargs)
+        except STALE_FILE_ID_ERRORS as e:
+            logger.warning(f"Stored file_id of media '{name}' was rejected ({e}), uploading it again.")
+            if self.file_id(name) == file_id:
+                del self._file_ids[name]
+            self.reuploads += 1
+            return await self._send_first(name, message, **kwargs)
+        self.reused += 1
+        return sent
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "assets": len(self.assets),
+            "cached_ids": len(self._file_ids),
+            "uploads": self.uploads,
+            "reused": self.reused,
+            "reuploads": self.reuploads,
+        }
+
+
+media = MediaRegistry(MEDIA_ASSETS, MEDIA_FILE)
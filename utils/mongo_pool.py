@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from pymongo import MongoClient, monitoring
+from config import (
+    MONGO_URI,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool statistics collected from pymongo's CMAP events.
+
+    Events fire on the thread that checks a connection out, so the wait time
+    is measured per thread between check-out start and check-out completion.
+    """
+
+    # Window used for the recent connection creation rate
+    RATE_WINDOW = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created_at = deque()
+        self.started_at = time.monotonic()
+
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.connections_created = 0
+        self.connections_closed = 0
+        self.pool_clears = 0
+
+    def _finish_wait(self) -> float:
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def pool_created(self, event):
+        logger.info(f"Mongo connection pool created for {event.address}")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+        logger.warning(f"Mongo connection pool cleared for {event.address}")
+
+    def pool_closed(self, event):
+        logger.info(f"Mongo connection pool closed for {event.address}")
+
+    def connection_created(self, event):
+        now = time.monotonic()
+        with self._lock:
+            self.connections_created += 1
+            self._created_at.append(now)
+            while self._created_at and now - self._created_at[0] > self.RATE_WINDOW:
+                self._created_at.popleft()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_closed += 1
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        wait = self._finish_wait()
+        with self._lock:
+            self.checkout_failures += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def connection_checked_out(self, event):
+        wait = self._finish_wait()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            now = time.monotonic()
+            recent = sum(1 for created in self._created_at if now - created <= self.RATE_WINDOW)
+            attempts = self.checkouts + self.checkout_failures
+            return {
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_wait_ms": round(1000 * self.total_wait / attempts, 3) if attempts else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait, 3),
+                "connections_created": self.connections_created,
+                "connections_closed": self.connections_closed,
+                "created_per_min": round(recent * 60 / self.RATE_WINDOW, 2),
+                "pool_clears": self.pool_clears,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+# The one MongoClient of the process; every module shares its pool and monitor threads
+_mongo_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
+
+def get_mongo_client() -> MongoClient:
+    """Return the process-wide MongoClient, creating it on first use."""
+    global _mongo_client
+    if _mongo_client is None:
+        with _client_lock:
+            if _mongo_client is None:
+                _mongo_client = MongoClient(
+                    MONGO_URI,
+                    maxPoolSize=MONGO_MAX_POOL_SIZE,
+                    minPoolSize=MONGO_MIN_POOL_SIZE,
+                    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    event_listeners=[pool_metrics],
+                )
+                logger.info(f"MongoClient created (maxPoolSize={MONGO_MAX_POOL_SIZE}, minPoolSize={MONGO_MIN_POOL_SIZE}).")
+    return _mongo_client
+
+
+def close_mongo_client():
+    """Close the shared client; safe to call more than once."""
+    global _mongo_client
+    with _client_lock:
+        if _mongo_client is not None:
+            _mongo_client.close()
+            _mongo_client = None
+            logger.info("MongoDB connection closed.")
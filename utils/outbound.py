@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set
+from pyrogram.errors import FloodWait
+from config import (
+    SEND_CHAT_BURST,
+    SEND_CHAT_RATE,
+    SEND_CONCURRENCY,
+    SEND_FLOOD_RETRIES,
+    SEND_GLOBAL_RATE,
+    SEND_QUEUE_MAX,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """`rate` sends per second with bursts of up to `burst`; can be blocked for a while after a FloodWait."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a send is allowed (0 when it is allowed now)."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.blocked_until - now)
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, seconds: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def idle(self, now: float) -> bool:
+        """Full and not blocked, i.e. indistinguishable from a new bucket."""
+        return self.wait_time(now) == 0 and self.tokens >= self.burst
+
+
+class _Job:
+    __slots__ = ("chat_id", "call", "edit_key", "waiters", "attempts")
+
+    def __init__(self, chat_id: Hashable, call: Callable[[], Awaitable], edit_key: Optional[Hashable], waiter: asyncio.Future):
+        self.chat_id = chat_id
+        self.call = call
+        self.edit_key = edit_key
+        self.waiters: List[asyncio.Future] = [waiter]
+        self.attempts = 0
+
+
+class SendScheduler:
+    """
+    Single outbound queue for Telegram API calls.
+
+    Calls are queued per chat and sent in order, one at a time per chat, paced
+    by a per-chat and a global token bucket. A FloodWait blocks that chat for
+    the time Telegram asks and the call is retried from the head of its queue.
+    An edit of a message that already has an edit waiting replaces it, so only
+    the latest text is sent and every caller gets that result. When the queue
+    holds `max_queue` calls, new edits are dropped (they resolve to None);
+    replies and other sends are always queued.
+    """
+
+    def __init__(self, global_rate: float, chat_rate: float, chat_burst: float, max_queue: int, concurrency: int):
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._global = TokenBucket(global_rate, global_rate)
+        self._queues: Dict[Hashable, Deque[_Job]] = {}
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._pending_edits: Dict[Hashable, _Job] = {}
+        self._busy: Set[Hashable] = set()
+        self._in_flight: Set[asyncio.Task] = set()
+        self._depth = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = time.monotonic()
+
+        # Counters
+        self.queued = 0
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0.0
+        self.max_depth = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> int:
+        """Calls waiting to be sent (not counting the ones in flight)."""
+        return self._depth
+
+    async def submit(self, chat_id: Hashable, call: Callable[[], Awaitable], edit_key: Optional[Hashable] = None,
+                     wait: bool = True) -> Any:
+        """
+        Queue `call` (a zero-argument coroutine function) for `chat_id` and return its result.
+
+        Pass `edit_key` for edits, e.g. (chat_id, message_id, "text"), to let a
+        later edit of the same message supersede this one. With wait=False the
+        future is returned as soon as the call is queued, so a caller can queue
+        the next edit without waiting for this one. Without a running
+        scheduler the call is made straight away.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self.running:
+            future.set_result(await call())
+            return await future if wait else future
+
+        if edit_key is not None:
+            pending = self._pending_edits.get(edit_key)
+            if pending is not None:
+                pending.call = call
+                pending.waiters.append(future)
+                self.coalesced += 1
+                return await future if wait else future
+            if self._depth >= self.max_queue:
+                self.dropped += 1
+                logger.warning(f"Outbound queue full ({self._depth}), dropped an edit for chat {chat_id}.")
+                future.set_result(None)
+                return await future if wait else future
+
+        job = _Job(chat_id, call, edit_key, future)
+        self._queues.setdefault(chat_id, deque()).append(job)
+        if edit_key is not None:
+            self._pending_edits[edit_key] = job
+        self._depth += 1
+        self.queued += 1
+        self.max_depth = max(self.max_depth, self._depth)
+        self._wakeup.set()
+        return await future if wait else future
+
+    def _dispatch(self) -> Optional[float]:
+        """Start every call that may go now. Returns how long to sleep before the next one may (None: until woken)."""
+        now = time.monotonic()
+        next_wait: Optional[float] = None
+        for chat_id in list(self._queues):
+            if len(self._busy) >= self.concurrency:
+                return None  # A finishing call wakes the loop
+            if chat_id in self._busy:
+                continue
+            bucket = self._buckets.get(chat_id)
+            if bucket is None:
+                bucket = self._buckets[chat_id] = TokenBucket(self._chat_rate, self._chat_burst)
+            wait = bucket.wait_time(now)
+            if wait > 0:
+                next_wait = wait if next_wait is None else min(next_wait, wait)
+                continue
+            global_wait = self._global.wait_time(now)
+            if global_wait > 0:
+                return global_wait if next_wait is None else min(next_wait, global_wait)
+
+            queue = self._queues.pop(chat_id)
+            job = queue.popleft()
+            if queue:
+                self._queues[chat_id] = queue  # Back of the line, so busy chats take turns
+            if job.edit_key is not None and self._pending_edits.get(job.edit_key) is job:
+                del self._pending_edits[job.edit_key]
+            self._depth -= 1
+            bucket.take()
+            self._global.take()
+            self._busy.add(chat_id)
+            task = asyncio.get_running_loop().create_task(self._send(job, bucket))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+        if now - self._last_prune > 60:
+            self._prune(now)
+        return next_wait
+
+    def _prune(self, now: float):
+        """Forget buckets of chats that went quiet."""
+        self._last_prune = now
+        for chat_id in [chat_id for chat_id, bucket in self._buckets.items()
+                        if chat_id not in self._queues and chat_id not in self._busy and bucket.idle(now)]:
+            del self._buckets[chat_id]
+
+    async def _send(self, job: _Job, bucket: TokenBucket):
+        try:
+            job.attempts += 1
+            result = await job.call()
+        except FloodWait as e:
+            seconds = float(getattr(e, "value", None) or getattr(e, "x", 1))
+            self.flood_waits += 1
+            self.flood_wait_seconds += seconds
+            bucket.block(seconds)
+            logger.warning(f"FloodWait of {seconds}s for chat {job.chat_id} (attempt {job.attempts}).")
+            if job.attempts > SEND_FLOOD_RETRIES:
+                self.failed += 1
+                self._resolve(job, error=e)
+            else:
+                self._requeue(job)
+        except Exception as e:
+            self.failed += 1
+            self._resolve(job, error=e)
+        else:
+            self.sent += 1
+            self._resolve(job, result=result)
+        finally:
+            self._busy.discard(job.chat_id)
+            self._wakeup.set()
+
+    def _requeue(self, job: _Job):
+        """Put a call back at the head of its chat queue, unless a newer edit of the same message is waiting."""
+        if job.edit_key is not None:
+            newer = self._pending_edits.get(job.edit_key)
+            if newer is not None:
+                newer.waiters.extend(job.waiters)
+                self.coalesced += 1
+                return
+            self._pending_edits[job.edit_key] = job
+        self._queues.setdefault(job.chat_id, deque()).appendleft(job)
+        self._depth += 1
+
+    @staticmethod
+    def _resolve(job: _Job, result: Any = None, error: Optional[BaseException] = None):
+        for waiter in job.waiters:
+            if waiter.done():
+                continue  # The caller gave up waiting
+            if error is not None:
+                waiter.set_exception(error)
+            else:
+                waiter.set_result(result)
+
+    async def _dispatch_loop(self):
+        while True:
+            self._wakeup.clear()
+            wait = self._dispatch()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the dispatcher on the running loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._dispatch_loop())
+            logger.info(f"Outbound scheduler started (global {self._global.rate}/s, per chat {self._chat_rate}/s).")
+
+    async def stop(self, timeout: float = 5.0):
+        """Give queued calls up to `timeout` seconds to go out, then stop; whatever is left resolves to None."""
+        deadline = time.monotonic() + timeout
+        while (self._depth or self._busy) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        abandoned = 0
+        for queue in self._queues.values():
+            for job in queue:
+                self._resolve(job)
+                abandoned += 1
+        self._queues.clear()
+        self._pending_edits.clear()
+        self._depth = 0
+        logger.info(f"Outbound scheduler stopped, {abandoned} queued calls abandoned.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._depth,
+            "max_depth": self.max_depth,
+            "in_flight": len(self._busy),
+            "chats_waiting": len(self._queues),
+            "queued": self.queued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "coalesced_edits": self.coalesced,
+            "dropped_edits": self.dropped,
+            "flood_waits": self.flood_waits,
+            "flood_wait_seconds": round(self.flood_wait_seconds, 1),
+        }
+
+
+outbound = SendScheduler(SEND_GLOBAL_RATE, SEND_CHAT_RATE, SEND_CHAT_BURST, SEND_QUEUE_MAX, SEND_CONCURRENCY)
+
+
+# Helpers for the calls handlers make most; anything else can go through outbound.submit
+async def reply(message, text: str, **kwargs):
+    return await outbound.submit(message.chat.id, lambda: message.reply(text, **kwargs))
+
+
+async def reply_photo(message, photo, **kwargs):
+    return await outbound.submit(message.chat.id, lambda: message.reply_photo(photo, **kwargs))
+
+
+async def edit_text(message, text: str, wait: bool = True, **kwargs):
+    return await outbound.submit(message.chat.id, lambda: message.edit_text(text, **kwargs),
+                                 edit_key=(message.chat.id, message.id, "text"), wait=wait)
+
+
+async def edit_caption(message, caption: str, wait: bool = True, **kwargs):
+    return await outbound.submit(message.chat.id, lambda: message.edit_caption(caption, **kwargs),
+                                 edit_key=(message.chat.id, message.id, "caption"), wait=wait)
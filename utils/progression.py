@@ -0,0 +1,78 @@
+import functools
+from bisect import bisect_right
+from typing import Mapping, Tuple
+from utils.config_utils import ConfigSnapshot
+from utils.game_data import get_config_store
+
+
+class ProgressionTable:
+    """
+    Per-level XP, max health and max stamina for levels 1..level_cap.
+
+    XP to go from level L to L+1 is xp_per_level + (L - 1) * xp_increment_per_level;
+    max health/stamina are base + (L - 1) * per_level. Everything is computed
+    once per config version, so level-up logic is plain index lookups.
+    """
+
+    def __init__(self, config: Mapping):
+        requirements = config.get("level_requirements", {})
+        xp_per_level = requirements.get("xp_per_level", 100)
+        xp_increment = requirements.get("xp_increment_per_level", 0)
+        self.level_cap = max(1, requirements.get("level_cap", 20))
+
+        health = config.get("max_health", {})
+        stamina = config.get("max_stamina", {})
+        levels = range(1, self.level_cap + 1)
+
+        # Index 0 is unused so that table[level] reads naturally
+        self._level_xp: Tuple[int, ...] = (0,) + tuple(xp_per_level + (level - 1) * xp_increment for level in levels)
+        cumulative = [0, 0]
+        for level in range(1, self.level_cap):
+            cumulative.append(cumulative[-1] + self._level_xp[level])
+        self._cumulative_xp: Tuple[int, ...] = tuple(cumulative)
+        self._max_health: Tuple[int, ...] = (0,) + tuple(
+            health.get("base", 60) + (level - 1) * health.get("per_level", 10) for level in levels)
+        self._max_stamina: Tuple[int, ...] = (0,) + tuple(
+            stamina.get("base", 50) + (level - 1) * stamina.get("per_level", 3) for level in levels)
+
+    def _clamp(self, level: int) -> int:
+        return min(max(level, 1), self.level_cap)
+
+    def xp_to_next(self, level: int) -> int:
+        """XP needed to go from `level` to the next one; 0 at the level cap."""
+        return 0 if level >= self.level_cap else self._level_xp[self._clamp(level)]
+
+    def total_xp(self, level: int) -> int:
+        """Cumulative XP from level 1 to reach `level`."""
+        return self._cumulative_xp[self._clamp(level)]
+
+    def max_health(self, level: int) -> int:
+        return self._max_health[self._clamp(level)]
+
+    def max_stamina(self, level: int) -> int:
+        return self._max_stamina[self._clamp(level)]
+
+    def apply_experience(self, level: int, experience: float, gained: float) -> Tuple[int, float]:
+        """
+        Return (level, experience) after gaining XP, with any number of level-ups.
+
+        The level is found by binary search over the cumulative XP table instead
+        of subtracting one level at a time. XP past the cap is kept but never
+        levels the player further.
+        """
+        if level >= self.level_cap:
+            return level, experience + gained
+        total = self._cumulative_xp[self._clamp(level)] + experience + gained
+        new_level = bisect_right(self._cumulative_xp, total, lo=1) - 1
+        return new_level, total - self._cumulative_xp[new_level]
+
+
+@functools.lru_cache(maxsize=8)
+def progression_for(snapshot: ConfigSnapshot) -> ProgressionTable:
+    """Table for one config version; snapshots are immutable, so it never goes stale."""
+    return ProgressionTable(snapshot.data)
+
+
+def get_progression() -> ProgressionTable:
+    """Table for the live config version."""
+    return progression_for(get_config_store().current)
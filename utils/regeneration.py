@@ -0,0 +1,96 @@
+import time
+from typing import Dict, Mapping, MutableMapping, Optional
+
+# Used when config.json has no regeneration section; points per hour
+DEFAULT_REGENERATION = {"stamina_per_hour": 30, "health_per_hour": 20, "rest_multiplier": 10}
+
+REGEN_STATS = ("stamina", "health")
+
+# Fields regenerate() advances on every load. A change to these alone is not
+# worth a write: the stored older clock and carry regenerate to the same stats.
+CLOCK_FIELDS = ("last_updated", "regen_carry")
+
+
+def regen_rates(location: Optional[str], config: Mapping, resting: bool, low_health: bool) -> Dict[str, float]:
+    """
+    Stamina and health regained per hour at a location.
+
+    biome_effects add their stamina_bonus/stamina_penalty and
+    health_recovery_bonus/health_recovery_penalty to the base rates, low
+    health applies the endurance recovery_rate (a percentage) and resting
+    multiplies both.
+    """
+    settings = {**DEFAULT_REGENERATION, **config.get("regeneration", {})}
+    biome = config.get("biome_effects", {}).get(location.casefold(), {}) if isinstance(location, str) else {}
+    if not isinstance(biome, Mapping):
+        biome = {}
+
+    stamina = settings["stamina_per_hour"] + biome.get("stamina_bonus", 0) + biome.get("stamina_penalty", 0)
+    health = settings["health_per_hour"] + biome.get("health_recovery_bonus", 0) + biome.get("health_recovery_penalty", 0)
+    if low_health:
+        recovery_rate = config.get("endurance_effects", {}).get("low_health_penalty", {}).get("recovery_rate", 0)
+        health *= 1 + recovery_rate / 100
+    if resting:
+        stamina *= settings["rest_multiplier"]
+        health *= settings["rest_multiplier"]
+    return {"stamina": max(stamina, 0.0), "health": max(health, 0.0)}
+
+
+def is_low_health(stats: Mapping[str, int]) -> bool:
+    return stats["health"] < stats["max_health"] * 0.2
+
+
+def regenerate(state: MutableMapping, config: Mapping, now: Optional[float] = None) -> bool:
+    """
+    Bring stamina and health up to date with the time since state["last_updated"].
+
+    `state` is a player document or Player.to_dict()-shaped mapping with
+    stats, location, resting, last_updated and regen_carry; it is updated in
+    place. Fractions of a point are kept in regen_carry, so how often a
+    player is loaded never changes how fast they regenerate. Rates are taken
+    at the start of the interval. last_updated always moves to `now`, even
+    for a player at full stats, so a later drop starts a fresh interval.
+    Returns whether any stat changed.
+    """
+    now = time.time() if now is None else now
+    last_updated = state.get("last_updated")
+    state["last_updated"] = now
+    stats = state.get("stats")
+    if last_updated is None or not stats or now <= last_updated:
+        return False
+
+    hours = (now - last_updated) / 3600
+    rates = regen_rates(state.get("location"), config, state.get("resting", False), is_low_health(stats))
+    if all(stats[stat] >= stats[f"max_{stat}"] for stat in REGEN_STATS):
+        if state.get("regen_carry"):
+            state["regen_carry"] = {}
+        return False
+
+    carry = dict(state.get("regen_carry") or {})
+    changed = False
+    for stat in REGEN_STATS:
+        maximum = stats[f"max_{stat}"]
+        if stats[stat] >= maximum:
+            carry.pop(stat, None)
+            continue
+        gained = carry.get(stat, 0.0) + hours * rates[stat]
+        whole = int(gained + 1e-9)  # Sums of many small steps land just under whole points
+        if whole:
+            stats[stat] = min(stats[stat] + whole, maximum)
+            changed = True
+        if stats[stat] >= maximum:
+            carry.pop(stat, None)
+        else:
+            carry[stat] = max(gained - whole, 0.0)
+    state["regen_carry"] = carry
+    return changed
+
+
+def seconds_until_full(stats: Mapping[str, int], rates: Mapping[str, float], carry: Optional[Mapping] = None) -> Optional[float]:
+    """Time until stamina is full at these rates; None when it never refills."""
+    missing = stats["max_stamina"] - stats["stamina"] - (carry or {}).get("stamina", 0.0)
+    if missing <= 0:
+        return 0.0
+    if rates["stamina"] <= 0:
+        return None
+    return missing / rates["stamina"] * 3600
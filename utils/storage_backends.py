@@ -0,0 +1,362 @@
+import copy
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.database import Database
+from utils.mongo_pool import get_mongo_client
+
+logger = logging.getLogger(__name__)
+
+# (user_id, update document) pairs, as produced by Player.get_changes()
+PlayerUpdate = Tuple[int, Dict]
+
+
+def _project(document: Dict, fields: Optional[tuple]) -> Dict:
+    if fields is None:
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+
+def apply_update(document: Dict, update: Dict) -> Dict:
+    """
+    Apply a Mongo-style update document ($set, $unset, $inc) to a plain dict in place.
+
+    Dotted paths like "stats.stamina" address nested documents, which is all
+    the update documents built by Player.get_changes() need.
+    """
+    for operator, fields in update.items():
+        for path, value in fields.items():
+            *parents, key = path.split(".")
+            target = document
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            if operator == "$set":
+                target[key] = copy.deepcopy(value)
+            elif operator == "$unset":
+                target.pop(key, None)
+            elif operator == "$inc":
+                target[key] = target.get(key, 0) + value
+            else:
+                raise ValueError(f"Unsupported update operator: {operator}")
+    return document
+
+
+class StorageBackend(ABC):
+    """
+    Interface for player persistence.
+
+    Methods are blocking; db_utils runs them in its thread pool. Documents are
+    plain dicts shaped like Player.to_dict(). A backend missing one of the
+    abstract methods fails when it is instantiated, not on first use.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def find_player(self, user_id: int, fields: Optional[tuple] = None) -> Optional[Dict]:
+        ...
+
+    @abstractmethod
+    def update_player(self, user_id: int, update: Dict) -> bool:
+        """Upsert one player. Returns True if the player was inserted."""
+
+    @abstractmethod
+    def bulk_update_players(self, updates: List[PlayerUpdate]):
+        """Upsert many players in one round-trip where the backend allows it."""
+
+    @abstractmethod
+    def delete_player(self, user_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    def players_page(self, after: Optional[int], before: Optional[int], limit: int,
+                     fields: Optional[tuple] = None) -> List[Dict]:
+        """Up to `limit` players after/before a user_id, in ascending user_id order."""
+
+    @abstractmethod
+    def count_players(self) -> int:
+        ...
+
+    def ensure_indexes(self) -> Dict[str, float]:
+        """Create missing indexes. Returns seconds spent per index."""
+        return {}
+
+    @abstractmethod
+    def migrate_legacy_inventories(self, convert: Callable[[list], Dict[str, int]], batch_size: int) -> int:
+        """Rewrite list inventories with `convert`. Returns the number of players changed."""
+
+    def close(self):
+        pass
+
+
+class MongoBackend(StorageBackend):
+    """Production backend on the players collection."""
+
+    name = "mongo"
+
+    # Every lookup and upsert is by user_id, the rest serve admin and leaderboard queries
+    INDEXES = [
+        ([("user_id", ASCENDING)], {"name": "user_id_unique", "unique": True}),
+        ([("level", DESCENDING), ("experience", DESCENDING)], {"name": "level_experience"}),
+        ([("exploration_progress", DESCENDING)], {"name": "exploration_progress"}),
+        ([("arc_type", ASCENDING)], {"name": "arc_type"}),
+    ]
+
+    def __init__(self, database: Database):
+        self.collection = database.get_collection("players")
+
+    @staticmethod
+    def _projection(fields: Optional[tuple]) -> Optional[Dict]:
+        if fields is None:
+            return None
+        projection = {field: 1 for field in fields}
+        projection["_id"] = 0
+        return projection
+
+    def find_player(self, user_id, fields=None):
+        return self.collection.find_one({"user_id": user_id}, self._projection(fields))
+
+    def update_player(self, user_id, update):
+        result = self.collection.update_one({"user_id": user_id}, update, upsert=True)
+        return result.upserted_id is not None
+
+    def bulk_update_players(self, updates):
+        operations = [UpdateOne({"user_id": user_id}, update, upsert=True) for user_id, update in updates]
+        self.collection.bulk_write(operations, ordered=False)
+
+    def delete_player(self, user_id):
+        return self.collection.delete_one({"user_id": user_id}).deleted_count > 0
+
+    def players_page(self, after, before, limit, fields=None):
+        query = {}
+        direction = ASCENDING
+        if after is not None:
+            query["user_id"] = {"$gt": after}
+        elif before is not None:
+            query["user_id"] = {"$lt": before}
+            direction = DESCENDING  # Walk backwards from the cursor, then restore the order
+        documents = list(self.collection.find(query, self._projection(fields)).sort("user_id", direction).limit(limit))
+        if direction == DESCENDING:
+            documents.reverse()
+        return documents
+
+    def count_players(self):
+        return self.collection.estimated_document_count()
+
+    def ensure_indexes(self):
+        timings = {}
+        for keys, options in self.INDEXES:
+            start = time.perf_counter()
+            try:
+                # create_index is a no-op when an identical index already exists
+                self.collection.create_index(keys, **options)
+            except Exception as e:
+                logger.error(f"Failed to create index {options['name']}: {e}")
+                continue
+            timings[options["name"]] = time.perf_counter() - start
+        return timings
+
+    def migrate_legacy_inventories(self, convert, batch_size):
+        migrated = 0
+        legacy = {"inventory": {"$type": "array"}}
+        while True:
+            documents = list(self.collection.find(legacy, {"user_id": 1, "inventory": 1}).limit(batch_size))
+            if not documents:
+                return migrated
+            operations = [
+                # Matching on the array type again skips documents a save migrated meanwhile
+                UpdateOne({"_id": document["_id"], **legacy}, {"$set": {"inventory": convert(document["inventory"])}})
+                for document in documents
+            ]
+            migrated += self.collection.bulk_write(operations, ordered=False).modified_count
+
+    def close(self):
+        # The client is shared process-wide; utils.mongo_pool closes it
+        pass
+
+
+class MemoryBackend(StorageBackend):
+    """Process-local dict of documents, for tests, load tests and offline profiling."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._documents: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+
+    def find_player(self, user_id, fields=None):
+        with self._lock:
+            document = self._documents.get(user_id)
+            return copy.deepcopy(_project(document, fields)) if document is not None else None
+
+    def update_player(self, user_id, update):
+        with self._lock:
+            inserted = user_id not in self._documents
+            document = self._documents.setdefault(user_id, {"user_id": user_id})
+            apply_update(document, update)
+            return inserted
+
+    def bulk_update_players(self, updates):
+        for user_id, update in updates:
+            self.update_player(user_id, update)
+
+    def delete_player(self, user_id):
+        with self._lock:
+            return self._documents.pop(user_id, None) is not None
+
+    def players_page(self, after, before, limit, fields=None):
+        with self._lock:
+            user_ids = sorted(self._documents)
+            if after is not None:
+                user_ids = [user_id for user_id in user_ids if user_id > after][:limit]
+            elif before is not None:
+                user_ids = [user_id for user_id in user_ids if user_id < before][-limit:]
+            else:
+                user_ids = user_ids[:limit]
+            return [copy.deepcopy(_project(self._documents[user_id], fields)) for user_id in user_ids]
+
+    def count_players(self):
+        return len(self._documents)
+
+    def migrate_legacy_inventories(self, convert, batch_size):
+        migrated = 0
+        with self._lock:
+            for document in self._documents.values():
+                if isinstance(document.get("inventory"), list):
+                    document["inventory"] = convert(document["inventory"])
+                    migrated += 1
+        return migrated
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Single-file SQLite store in WAL mode, one JSON document per player.
+
+    Lets the whole bot run and be profiled on one machine without network
+    access. A single connection is shared behind a lock.
+    """
+
+    name = "sqlite"
+
+    # Expression indexes mirroring the Mongo secondary indexes; user_id is the primary key
+    INDEXES = {
+        "level_experience": "(json_extract(doc, '$.level') DESC, json_extract(doc, '$.experience') DESC)",
+        "exploration_progress": "(json_extract(doc, '$.exploration_progress') DESC)",
+        "arc_type": "(json_extract(doc, '$.arc_type'))",
+    }
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS players (user_id INTEGER PRIMARY KEY, doc TEXT NOT NULL)")
+        self._lock = threading.Lock()
+
+    def _read(self, user_id: int) -> Optional[Dict]:
+        row = self._connection.execute("SELECT doc FROM players WHERE user_id = ?", (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _upsert(self, user_id: int, update: Dict) -> bool:
+        document = self._read(user_id)
+        inserted = document is None
+        document = apply_update(document or {"user_id": user_id}, update)
+        self._connection.execute(
+            "INSERT INTO players (user_id, doc) VALUES (?, ?) ON CONFLICT(user_id) DO UPDATE SET doc = excluded.doc",
+            (user_id, json.dumps(document)),
+        )
+        return inserted
+
+    def find_player(self, user_id, fields=None):
+        with self._lock:
+            document = self._read(user_id)
+        return _project(document, fields) if document is not None else None
+
+    def update_player(self, user_id, update):
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                inserted = self._upsert(user_id, update)
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+            return inserted
+
+    def bulk_update_players(self, updates):
+        # One transaction for the whole batch, like a single bulk_write
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for user_id, update in updates:
+                    self._upsert(user_id, update)
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def delete_player(self, user_id):
+        with self._lock:
+            return self._connection.execute("DELETE FROM players WHERE user_id = ?", (user_id,)).rowcount > 0
+
+    def players_page(self, after, before, limit, fields=None):
+        with self._lock:
+            if after is not None:
+                rows = self._connection.execute(
+                    "SELECT doc FROM players WHERE user_id > ? ORDER BY user_id LIMIT ?", (after, limit)).fetchall()
+            elif before is not None:
+                rows = self._connection.execute(
+                    "SELECT doc FROM players WHERE user_id < ? ORDER BY user_id DESC LIMIT ?", (before, limit)).fetchall()
+                rows.reverse()
+            else:
+                rows = self._connection.execute(
+                    "SELECT doc FROM players ORDER BY user_id LIMIT ?", (limit,)).fetchall()
+        return [_project(json.loads(row[0]), fields) for row in rows]
+
+    def count_players(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def ensure_indexes(self):
+        timings = {}
+        with self._lock:
+            for name, expression in self.INDEXES.items():
+                start = time.perf_counter()
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON players {expression}")
+                timings[name] = time.perf_counter() - start
+        return timings
+
+    def migrate_legacy_inventories(self, convert, batch_size):
+        migrated = 0
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT user_id, doc FROM players WHERE json_type(doc, '$.inventory') = 'array'").fetchall()
+            for start in range(0, len(rows), batch_size):
+                self._connection.execute("BEGIN")
+                for user_id, raw in rows[start:start + batch_size]:
+                    document = json.loads(raw)
+                    document["inventory"] = convert(document["inventory"])
+                    self._connection.execute("UPDATE players SET doc = ? WHERE user_id = ?", (json.dumps(document), user_id))
+                    migrated += 1
+                self._connection.execute("COMMIT")
+        return migrated
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def create_backend(name: str, sqlite_path: str = None) -> StorageBackend:
+    """Build the storage backend selected in config (mongo, memory or sqlite)."""
+    if name == "mongo":
+        return MongoBackend(get_mongo_client().get_database())
+    if name == "memory":
+        return MemoryBackend()
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    raise ValueError(f"Unknown storage backend: {name}")
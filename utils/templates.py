@@ -0,0 +1,126 @@
+from typing import Any, Dict, Hashable, Optional, Tuple
+from config import CARD_CACHE_SIZE, PLAYER_CACHE_TTL
+from utils.cache_utils import LRUTTLCache
+
+SEPARATOR = "━━━━━━━━━━━━━━━━━"
+
+# Bar strings for every fill level, built once: index = number of filled blocks
+HEALTH_BLOCKS = 10
+STAMINA_BLOCKS = 7
+HEALTH_BARS: Tuple[str, ...] = tuple("█" * filled + "▒" * (HEALTH_BLOCKS - filled) for filled in range(HEALTH_BLOCKS + 1))
+STAMINA_BARS: Tuple[str, ...] = tuple("▮" * filled + "▯" * (STAMINA_BLOCKS - filled) for filled in range(STAMINA_BLOCKS + 1))
+
+
+def _fill(value: int, maximum: int, blocks: int) -> int:
+    """Filled blocks for value/maximum, rounded down, with integer math only."""
+    if maximum <= 0 or value <= 0:
+        return 0
+    if value >= maximum:
+        return blocks
+    return int(value * blocks // maximum)
+
+
+def health_bar(health: int, max_health: int) -> str:
+    return HEALTH_BARS[_fill(health, max_health, HEALTH_BLOCKS)]
+
+
+def stamina_bar(stamina: int, max_stamina: int) -> str:
+    return STAMINA_BARS[_fill(stamina, max_stamina, STAMINA_BLOCKS)]
+
+
+# One function per layout: each f-string compiles to a single string build, and the
+# bars come from the tables above instead of being assembled per call
+def render_exploration(stats: Dict[str, int], location: str, items: str, xp, encounter: str = "") -> str:
+    health, max_health, stamina, max_stamina = stats["health"], stats["max_health"], stats["stamina"], stats["max_stamina"]
+    text = (
+        f"<b>•HP•</b>\n<b>| {HEALTH_BARS[_fill(health, max_health, HEALTH_BLOCKS)]} |</b>\n"
+        f"              <b>(|{health}/{max_health}|)</b>\n"
+        f"<b>•Stamina•</b>\n<b>| {STAMINA_BARS[_fill(stamina, max_stamina, STAMINA_BLOCKS)]} |</b>\n"
+        f"                   <b>(|{stamina}/{max_stamina}|)</b>\n\n"
+        f"<b>You explored the {location}</b>\n"
+        f"<b>Items found:</b>\n{items}\n\n"
+        f"<b>Total XP gained: {xp} ✨</b>\n"
+    )
+    return f"{text}\n{encounter}\n" if encounter else text
+
+
+# Why an /explore <n> batch ended before running every round
+STOP_REASONS = {
+    "full": "🎒 Your inventory is full.",
+    "exhausted": "😩 You ran out of stamina. Rest before exploring again.",
+}
+
+
+def render_exploration_summary(stats: Dict[str, int], location: str, completed: int, requested: int,
+                               item_counts: Dict[str, int], xp, level_ups: int = 0,
+                               stop_reason: Optional[str] = None, encounter: str = "") -> str:
+    """One message for a whole /explore <n> batch."""
+    items = "\n".join([f"{item} (x{count})" for item, count in item_counts.items()]) or "None"
+    text = render_exploration(stats, f"{location} {completed}/{requested} times", items, xp, encounter)
+    if level_ups:
+        text += f"\n<b>🏆 Level up! +{level_ups}</b>\n"
+    if stop_reason in STOP_REASONS:
+        text += f"\n{STOP_REASONS[stop_reason]}\n"
+    return text
+
+
+def render_profile(player, next_level_experience: int) -> str:
+    stats = player.stats
+    health, max_health, stamina, max_stamina = stats["health"], stats["max_health"], stats["stamina"], stats["max_stamina"]
+    return (
+        f"{SEPARATOR}\n<b>{player.name}</b>\n{SEPARATOR}\n"
+        f"<b>• HP:</b>\n{HEALTH_BARS[_fill(health, max_health, HEALTH_BLOCKS)]}\n"
+        f"    <b>[{health}/{max_health}]</b>\n"
+        f"<b>• Stamina:</b>\n{STAMINA_BARS[_fill(stamina, max_stamina, STAMINA_BLOCKS)]}\n"
+        f"    <b>[{stamina}/{max_stamina}]</b>\n{SEPARATOR}\n"
+        f"📍 <b>Location:</b> {player.location}\n"
+        f"🏆 <b>Level:</b> {player.level} | <b>XP:</b> ({player.experience}/{next_level_experience})\n"
+        f"{SEPARATOR}"
+    )
+
+
+def render_bag(name: str, used_space: int, capacity: int, item_counts: Dict[str, int]) -> str:
+    items = "\n".join([f"{item} : {count}" for item, count in item_counts.items()])
+    return (
+        f"{SEPARATOR}\n<b>{name}'s Inventory</b>\n{SEPARATOR}\n"
+        f"<b>Inventory Space: {used_space}/{capacity}</b>\n\n"
+        f"{items}\n{SEPARATOR}"
+    )
+
+
+class CardCache:
+    """
+    Rendered cards per player and kind, valid for one state version.
+
+    The version is whatever the caller passes, normally the player's
+    state_version plus the config version: a save bumps state_version, so
+    an old card never matches again and is simply replaced on the next render.
+    """
+
+    KINDS = ("profile", "bag")
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cards = LRUTTLCache(maxsize, ttl)
+        self.stale = 0  # Cards found but rendered for an older version
+
+    def get(self, user_id: int, kind: str, version: Hashable) -> Optional[str]:
+        cached = self._cards.get((user_id, kind))
+        if cached is None:
+            return None
+        if cached[0] != version:
+            self.stale += 1
+            return None
+        return cached[1]
+
+    def set(self, user_id: int, kind: str, version: Hashable, text: str):
+        self._cards.set((user_id, kind), (version, text))
+
+    def invalidate(self, user_id: int):
+        for kind in self.KINDS:
+            self._cards.invalidate((user_id, kind))
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cards.stats(), "stale": self.stale}
+
+
+card_cache = CardCache(CARD_CACHE_SIZE * len(CardCache.KINDS), PLAYER_CACHE_TTL)